@@ -0,0 +1,28 @@
+"""Add composite index for active alerts summary aggregation
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_active_alerts_severity_ack_created',
+        'active_alerts',
+        ['severity', 'is_acknowledged', sa.text('created_at DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_active_alerts_severity_ack_created', table_name='active_alerts')
@@ -6,9 +6,8 @@ Forex Prediction System - Alerts Endpoints
 エンドポイント1.5: /api/alerts/active (GET) - アクティブアラート取得
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
 from typing import List
 
 from ...database import get_db
@@ -32,14 +31,8 @@ async def get_active_alerts(db: AsyncSession = Depends(get_db)):
     現在発生中のアラートを重要度別に整理して返却
     ダッシュボード表示用のサマリー情報も含む
     """
-    try:
-        service = AlertsService(db)
-        return await service.get_active_alerts()
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"アクティブアラート取得に失敗しました: {str(e)}"
-        )
+    service = AlertsService(db)
+    return await service.get_active_alerts()
 
 
 @router.post("/acknowledge")
@@ -52,12 +45,6 @@ async def acknowledge_alerts(
     
     指定されたアラートを確認済みにマークする
     """
-    try:
-        service = AlertsService(db)
-        return await service.acknowledge_alerts(request)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"アラート確認に失敗しました: {str(e)}"
-        )
+    service = AlertsService(db)
+    return await service.acknowledge_alerts(request)
 
@@ -4,7 +4,8 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from ...database import get_db
 from ...models import User
 from ...schemas.auth import (
@@ -13,13 +14,35 @@ from ...schemas.auth import (
     UserMe, AuthError
 )
 from ...core.auth import (
-    authenticate_user, create_user_token, create_user, change_user_password
+    authenticate_user, create_user_token, create_user, change_user_password,
+    get_user_by_id
 )
+from ...core.auth_cache import auth_cache, TTLCache
 from ...core.dependencies import get_current_active_user
 
 router = APIRouter()
 
 
+# ===================================================================
+# UserMe変換キャッシュ
+# ===================================================================
+
+_USER_ME_ADAPTER = TypeAdapter(UserMe)
+
+# (user_id, updated_at) → UserMe（更新があればupdated_atが変わるため自然に無効化される）
+_USER_ME_CACHE = TTLCache(maxsize=10_000, ttl=300)
+
+
+def _to_user_me(user: User) -> UserMe:
+    """UserからUserMeへの変換（キャッシュ付き）"""
+    key = (user.id, user.updated_at)
+    user_me = _USER_ME_CACHE.get(key)
+    if user_me is None:
+        user_me = _USER_ME_ADAPTER.validate_python(user, from_attributes=True)
+        _USER_ME_CACHE.set(key, user_me)
+    return user_me
+
+
 # ===================================================================
 # ユーザー登録エンドポイント
 # ===================================================================
@@ -28,7 +51,7 @@ router = APIRouter()
 async def register_user(
     user_data: UserRegister,
     response: Response,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     新規ユーザー登録
@@ -40,39 +63,30 @@ async def register_user(
     
     成功時、HttpOnly Cookieに認証トークンが設定されます。
     """
-    try:
-        # 新規ユーザー作成
-        user = create_user(
-            db=db,
-            username=user_data.username,
-            email=user_data.email,
-            password=user_data.password,
-            full_name=user_data.full_name
-        )
-        
-        # JWTトークン生成
-        access_token = create_user_token(user)
-        
-        # HttpOnly Cookieにトークン設定
-        response.set_cookie(
-            key="access_token",
-            value=access_token,
-            max_age=60 * 60 * 24 * 7,  # 7日間
-            httponly=True,
-            secure=False,  # 開発環境用（本番ではTrue）
-            samesite="lax"
-        )
-        
-        user_me = UserMe.from_orm(user)
-        return RegisterResponse(user=user_me)
-        
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="ユーザー登録中にエラーが発生しました"
-        )
+    # 新規ユーザー作成
+    user = await create_user(
+        db=db,
+        username=user_data.username,
+        email=user_data.email,
+        password=user_data.password,
+        full_name=user_data.full_name
+    )
+    
+    # JWTトークン生成
+    access_token = create_user_token(user)
+    
+    # HttpOnly Cookieにトークン設定
+    response.set_cookie(
+        key="access_token",
+        value=access_token,
+        max_age=60 * 60 * 24 * 7,  # 7日間
+        httponly=True,
+        secure=False,  # 開発環境用（本番ではTrue）
+        samesite="lax"
+    )
+    
+    user_me = _to_user_me(user)
+    return RegisterResponse(user=user_me)
 
 
 # ===================================================================
@@ -83,7 +97,7 @@ async def register_user(
 async def login_user(
     user_credentials: UserLogin,
     response: Response,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     ユーザーログイン
@@ -94,43 +108,34 @@ async def login_user(
     成功時、HttpOnly Cookieに認証トークンが設定されます。
     5回連続でログインに失敗すると、アカウントが無効化されます。
     """
-    try:
-        # ユーザー認証
-        user = authenticate_user(
-            db=db,
-            username=user_credentials.username,
-            password=user_credentials.password
-        )
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="ユーザー名またはパスワードが間違っています",
-            )
-        
-        # JWTトークン生成
-        access_token = create_user_token(user)
-        
-        # HttpOnly Cookieにトークン設定
-        response.set_cookie(
-            key="access_token",
-            value=access_token,
-            max_age=60 * 60 * 24 * 7,  # 7日間
-            httponly=True,
-            secure=False,  # 開発環境用（本番ではTrue）
-            samesite="lax"
-        )
-        
-        user_me = UserMe.from_orm(user)
-        return LoginResponse(user=user_me)
-        
-    except HTTPException as e:
-        raise e
-    except Exception as e:
+    # ユーザー認証
+    user = await authenticate_user(
+        db=db,
+        username=user_credentials.username,
+        password=user_credentials.password
+    )
+    
+    if not user:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="ログイン中にエラーが発生しました"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="ユーザー名またはパスワードが間違っています",
         )
+    
+    # JWTトークン生成
+    access_token = create_user_token(user)
+    
+    # HttpOnly Cookieにトークン設定
+    response.set_cookie(
+        key="access_token",
+        value=access_token,
+        max_age=60 * 60 * 24 * 7,  # 7日間
+        httponly=True,
+        secure=False,  # 開発環境用（本番ではTrue）
+        samesite="lax"
+    )
+    
+    user_me = _to_user_me(user)
+    return LoginResponse(user=user_me)
 
 
 # ===================================================================
@@ -138,23 +143,21 @@ async def login_user(
 # ===================================================================
 
 @router.post("/logout", response_model=LogoutResponse)
-async def logout_user(response: Response):
+async def logout_user(request: Request, response: Response):
     """
     ユーザーログアウト
     
     HttpOnly Cookieのトークンを削除します。
     """
-    try:
-        # Cookieを削除
-        response.delete_cookie(key="access_token", httponly=True, samesite="lax")
-        
-        return LogoutResponse()
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="ログアウト中にエラーが発生しました"
-        )
+    # 認証キャッシュからトークンを削除
+    token = request.cookies.get("access_token")
+    if token:
+        auth_cache.invalidate_token(token)
+    
+    # Cookieを削除
+    response.delete_cookie(key="access_token", httponly=True, samesite="lax")
+    
+    return LogoutResponse()
 
 
 # ===================================================================
@@ -170,7 +173,7 @@ async def get_current_user_info(
     
     認証が必要です。
     """
-    return UserMe.from_orm(current_user)
+    return _to_user_me(current_user)
 
 
 # ===================================================================
@@ -181,7 +184,7 @@ async def get_current_user_info(
 async def change_password(
     password_data: PasswordChange,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     パスワード変更
@@ -191,21 +194,20 @@ async def change_password(
     
     認証が必要です。
     """
-    try:
-        # パスワード変更処理
-        change_user_password(
-            db=db,
-            user=current_user,
-            current_password=password_data.current_password,
-            new_password=password_data.new_password
-        )
-        
-        return PasswordChangeResponse()
-        
-    except HTTPException as e:
-        raise e
-    except Exception as e:
+    # キャッシュ済みユーザーは切り離されているため、このセッションで再取得
+    user = await get_user_by_id(db, current_user.id)
+    if user is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="パスワード変更中にエラーが発生しました"
-        )
\ No newline at end of file
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="ユーザーが見つかりません",
+        )
+    
+    # パスワード変更処理
+    await change_user_password(
+        db=db,
+        user=user,
+        current_password=password_data.current_password,
+        new_password=password_data.new_password
+    )
+    
+    return PasswordChangeResponse()
\ No newline at end of file
@@ -7,6 +7,8 @@ Backtest API Endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -18,9 +20,16 @@ from app.schemas.backtest import (
     BacktestTradesResponse,
 )
 from app.services.backtest_service import BacktestService
+from app.core.responses import model_response
 
 router = APIRouter()
 
+# レスポンスモデルのシリアライザ（インポート時に一度だけ構築）
+_ADAPTERS = {
+    BacktestResultsResponse: TypeAdapter(BacktestResultsResponse),
+    BacktestMetricsResponse: TypeAdapter(BacktestMetricsResponse),
+}
+
 
 @router.post("/run", response_model=BacktestJobResponse)
 async def run_backtest(
@@ -47,11 +56,11 @@ async def run_backtest(
     return await service.start_backtest(config)
 
 
-@router.get("/results/{job_id}", response_model=BacktestResultsResponse)
+@router.get("/results/{job_id}", responses={200: {"model": BacktestResultsResponse}})
 async def get_backtest_results(
     job_id: str,
     db: AsyncSession = Depends(get_db)
-) -> BacktestResultsResponse:
+) -> Response:
     """
     バックテスト結果取得
     
@@ -75,14 +84,14 @@ async def get_backtest_results(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Backtest job {job_id} not found"
         )
-    return result
+    return model_response(_ADAPTERS[BacktestResultsResponse], result)
 
 
-@router.get("/metrics/{job_id}", response_model=BacktestMetricsResponse)
+@router.get("/metrics/{job_id}", responses={200: {"model": BacktestMetricsResponse}})
 async def get_backtest_metrics(
     job_id: str,
     db: AsyncSession = Depends(get_db)
-) -> BacktestMetricsResponse:
+) -> Response:
     """
     バックテスト評価指標取得
     
@@ -106,21 +115,22 @@ async def get_backtest_metrics(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Backtest metrics for job {job_id} not found or not completed"
         )
-    return metrics
+    return model_response(_ADAPTERS[BacktestMetricsResponse], metrics)
 
 
-@router.get("/trades/{job_id}", response_model=BacktestTradesResponse)
+@router.get("/trades/{job_id}", responses={200: {"model": BacktestTradesResponse}})
 async def get_backtest_trades(
     job_id: str,
     page: int = 1,
     page_size: int = 100,
     db: AsyncSession = Depends(get_db)
-) -> BacktestTradesResponse:
+) -> StreamingResponse:
     """
     バックテスト取引履歴取得
     
     指定されたジョブIDのバックテスト取引履歴を取得する。
     ページネーション対応で大量の取引データを効率的に取得可能。
+    取引記録はチャンク単位でストリーミング送信する。
     
     Args:
         job_id: バックテストジョブID
@@ -147,10 +157,10 @@ async def get_backtest_trades(
         )
     
     service = BacktestService(db)
-    trades = await service.get_trades(job_id, page, page_size)
-    if not trades:
+    trades = await service.stream_trades(job_id, page, page_size)
+    if trades is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Backtest trades for job {job_id} not found"
         )
-    return trades
\ No newline at end of file
+    return StreamingResponse(trades, media_type="application/json")
\ No newline at end of file
@@ -8,10 +8,11 @@ Phase B-2aの対象エンドポイント:
 仮実装でレスポンスを返し、後のサービス層実装で置き換え予定
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime, date, timedelta
 
 from ...database import get_db
 from ...schemas.charts import (
@@ -33,15 +34,46 @@ from ...schemas.charts import (
     ChartQueryParams
 )
 from ...services.charts_service import ChartsService
+from ...core.responses import orjson_dumps, precomputed_response, model_response, TimestampedJSON
 
 router = APIRouter()
 
+# レスポンスモデルのシリアライザ（インポート時に一度だけ構築）
+_ADAPTERS = {
+    HistoricalChartResponse: TypeAdapter(HistoricalChartResponse),
+}
+
+
+# 固定レスポンス（インポート時に一度だけシリアライズ）
+_SUPPORTED_INDICATORS_BODY = orjson_dumps({
+    "indicators": [indicator.value for indicator in TechnicalIndicatorType],
+    "timeframes": [timeframe.value for timeframe in ChartTimeframe],
+    "periods": [period.value for period in ChartPeriod]
+})
+
+_DEFAULT_CHART_CONFIG_BODY = orjson_dumps({
+    "period": ChartPeriod.THREE_MONTHS.value,
+    "timeframe": ChartTimeframe.DAILY.value,
+    "indicators": [
+        TechnicalIndicatorType.SMA.value,
+        TechnicalIndicatorType.RSI.value
+    ],
+    "include_volume": True,
+    "include_support_resistance": False
+})
+
+_HEALTH = TimestampedJSON({
+    "status": "healthy",
+    "service": "charts",
+    "version": "1.0.0"
+})
+
 
 # ===================================================================
 # 2.1: /api/charts/historical (GET) - 履歴チャートデータ取得
 # ===================================================================
 
-@router.get("/historical", response_model=HistoricalChartResponse)
+@router.get("/historical", responses={200: {"model": HistoricalChartResponse}})
 async def get_historical_chart(
     period: ChartPeriod = Query(ChartPeriod.THREE_MONTHS, description="表示期間"),
     timeframe: ChartTimeframe = Query(ChartTimeframe.DAILY, description="時間軸"),
@@ -50,8 +82,8 @@ async def get_historical_chart(
     include_support_resistance: bool = Query(False, description="サポート・レジスタンスレベル"),
     include_fibonacci: bool = Query(False, description="フィボナッチレベル"),
     include_trendlines: bool = Query(False, description="トレンドライン"),
-    db: Session = Depends(get_db)
-) -> HistoricalChartResponse:
+    db: AsyncSession = Depends(get_db)
+) -> Response:
     """
     指定期間の為替チャートとテクニカル指標を取得
     
@@ -65,18 +97,12 @@ async def get_historical_chart(
     - **returns**: 価格データとテクニカル指標の総合チャートデータ
     """
     
-    try:
-        service = ChartsService(db)
-        return await service.get_historical_chart(
-            period, timeframe, indicators, include_volume,
-            include_support_resistance, include_fibonacci, include_trendlines
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"履歴チャートデータの取得中にエラーが発生しました: {str(e)}"
-        )
+    service = ChartsService(db)
+    result = await service.get_historical_chart(
+        period, timeframe, indicators, include_volume,
+        include_support_resistance, include_fibonacci, include_trendlines
+    )
+    return model_response(_ADAPTERS[HistoricalChartResponse], result)
 
 
 # ===================================================================
@@ -86,26 +112,13 @@ async def get_historical_chart(
 @router.get("/config/supported-indicators")
 async def get_supported_indicators():
     """サポートされているテクニカル指標一覧を取得"""
-    return {
-        "indicators": [indicator.value for indicator in TechnicalIndicatorType],
-        "timeframes": [timeframe.value for timeframe in ChartTimeframe],
-        "periods": [period.value for period in ChartPeriod]
-    }
+    return precomputed_response(_SUPPORTED_INDICATORS_BODY)
 
 
 @router.get("/config/default")
 async def get_default_chart_config():
     """デフォルトのチャート設定を取得"""
-    return {
-        "period": ChartPeriod.THREE_MONTHS.value,
-        "timeframe": ChartTimeframe.DAILY.value,
-        "indicators": [
-            TechnicalIndicatorType.SMA.value,
-            TechnicalIndicatorType.RSI.value
-        ],
-        "include_volume": True,
-        "include_support_resistance": False
-    }
+    return precomputed_response(_DEFAULT_CHART_CONFIG_BODY)
 
 
 # ===================================================================
@@ -115,9 +128,4 @@ async def get_default_chart_config():
 @router.get("/health")
 async def charts_health_check():
     """チャートAPIのヘルスチェック"""
-    return {
-        "status": "healthy",
-        "service": "charts",
-        "timestamp": datetime.now(),
-        "version": "1.0.0"
-    }
\ No newline at end of file
+    return _HEALTH.response()
\ No newline at end of file
@@ -8,10 +8,11 @@ Phase B-2aの対象エンドポイント:
 仮実装でレスポンスを返し、後のサービス層実装で置き換え予定
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime, date, timedelta
 
 from ...database import get_db
 from ...schemas.metrics import (
@@ -27,21 +28,34 @@ from ...schemas.metrics import (
     TimeHorizon
 )
 from ...services.metrics_service import MetricsService
+from ...core.responses import model_response, TimestampedJSON
+from ...core.clock import now_cached
 
 router = APIRouter()
 
+# レスポンスモデルのシリアライザ（インポート時に一度だけ構築）
+_ADAPTERS = {
+    RiskMetricsResponse: TypeAdapter(RiskMetricsResponse),
+}
+
+_HEALTH = TimestampedJSON({
+    "status": "healthy",
+    "service": "metrics",
+    "version": "1.0.0"
+})
+
 
 # ===================================================================
 # 1.4: /api/metrics/risk (GET) - リスク指標取得
 # ===================================================================
 
-@router.get("/risk", response_model=RiskMetricsResponse)
+@router.get("/risk", responses={200: {"model": RiskMetricsResponse}})
 async def get_risk_metrics(
     time_horizon: Optional[TimeHorizon] = Query(TimeHorizon.DAILY, description="リスク評価期間"),
     confidence_level: float = Query(0.95, description="VaR信頼水準", ge=0.9, le=0.99),
     include_stress_test: bool = Query(True, description="ストレステストを含める"),
-    db: Session = Depends(get_db)
-) -> RiskMetricsResponse:
+    db: AsyncSession = Depends(get_db)
+) -> Response:
     """
     包括的なリスク指標を取得
     
@@ -51,15 +65,9 @@ async def get_risk_metrics(
     - **returns**: ボラティリティ、VaR、ドローダウン等の総合リスク分析
     """
     
-    try:
-        service = MetricsService(db)
-        return await service.get_risk_metrics(time_horizon, confidence_level, include_stress_test)
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"リスク指標の計算中にエラーが発生しました: {str(e)}"
-        )
+    service = MetricsService(db)
+    result = await service.get_risk_metrics(time_horizon, confidence_level, include_stress_test)
+    return model_response(_ADAPTERS[RiskMetricsResponse], result)
 
 
 # ===================================================================
@@ -67,24 +75,18 @@ async def get_risk_metrics(
 # ===================================================================
 
 @router.get("/risk/summary")
-async def get_risk_summary(db: Session = Depends(get_db)):
+async def get_risk_summary(db: AsyncSession = Depends(get_db)):
     """リスク指標のサマリーを取得"""
-    try:
-        return {
-            "overall_risk": "MEDIUM",
-            "key_risks": [
-                "中央銀行政策変更リスク",
-                "地政学的不確実性",
-                "市場ボラティリティ上昇"
-            ],
-            "risk_score": 45.8,
-            "last_updated": datetime.now()
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"リスクサマリーの取得中にエラーが発生しました: {str(e)}"
-        )
+    return {
+        "overall_risk": "MEDIUM",
+        "key_risks": [
+            "中央銀行政策変更リスク",
+            "地政学的不確実性",
+            "市場ボラティリティ上昇"
+        ],
+        "risk_score": 45.8,
+        "last_updated": now_cached()
+    }
 
 
 # ===================================================================
@@ -94,9 +96,4 @@ async def get_risk_summary(db: Session = Depends(get_db)):
 @router.get("/health")
 async def metrics_health_check():
     """メトリクスAPIのヘルスチェック"""
-    return {
-        "status": "healthy",
-        "service": "metrics",
-        "timestamp": datetime.now(),
-        "version": "1.0.0"
-    }
\ No newline at end of file
+    return _HEALTH.response()
\ No newline at end of file
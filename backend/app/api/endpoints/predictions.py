@@ -9,10 +9,11 @@ Phase B-2aの対象エンドポイント:
 仮実装でレスポンスを返し、後のサービス層実装で置き換え予定
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime, date, timedelta
 
 from ...database import get_db
 from ...schemas.predictions import (
@@ -29,19 +30,32 @@ from ...schemas.predictions import (
 )
 from ...models import Prediction
 from ...services.predictions_service import PredictionsService
+from ...core.responses import model_response, TimestampedJSON
 
 router = APIRouter()
 
+# レスポンスモデルのシリアライザ（インポート時に一度だけ構築）
+_ADAPTERS = {
+    LatestPredictionsResponse: TypeAdapter(LatestPredictionsResponse),
+    DetailedPredictionsResponse: TypeAdapter(DetailedPredictionsResponse),
+}
+
+_HEALTH = TimestampedJSON({
+    "status": "healthy",
+    "service": "predictions",
+    "version": "1.0.0"
+})
+
 
 # ===================================================================
 # 1.2: /api/predictions/latest (GET) - 最新予測取得
 # ===================================================================
 
-@router.get("/latest", response_model=LatestPredictionsResponse)
+@router.get("/latest", responses={200: {"model": LatestPredictionsResponse}})
 async def get_latest_predictions(
     periods: Optional[List[PredictionPeriod]] = Query(None, description="取得する予測期間"),
-    db: Session = Depends(get_db)
-) -> LatestPredictionsResponse:
+    db: AsyncSession = Depends(get_db)
+) -> Response:
     """
     最新の予測結果を取得
     
@@ -49,28 +63,22 @@ async def get_latest_predictions(
     - **returns**: 1週間〜1ヶ月の予測データと信頼区間
     """
     
-    try:
-        service = PredictionsService(db)
-        return await service.get_latest_predictions(periods)
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"予測データの取得中にエラーが発生しました: {str(e)}"
-        )
+    service = PredictionsService(db)
+    result = await service.get_latest_predictions(periods)
+    return model_response(_ADAPTERS[LatestPredictionsResponse], result)
 
 
 # ===================================================================
 # 2.2: /api/predictions/detailed (GET) - 詳細予測分析取得
 # ===================================================================
 
-@router.get("/detailed", response_model=DetailedPredictionsResponse)
+@router.get("/detailed", responses={200: {"model": DetailedPredictionsResponse}})
 async def get_detailed_predictions(
     period: Optional[PredictionPeriod] = Query(PredictionPeriod.ONE_WEEK, description="分析対象期間"),
     include_feature_importance: bool = Query(True, description="特徴量重要度を含める"),
     include_scenario_analysis: bool = Query(True, description="シナリオ分析を含める"),
-    db: Session = Depends(get_db)
-) -> DetailedPredictionsResponse:
+    db: AsyncSession = Depends(get_db)
+) -> Response:
     """
     詳細な予測分析データを取得
     
@@ -80,15 +88,9 @@ async def get_detailed_predictions(
     - **returns**: モデル別分析と詳細な不確実性評価
     """
     
-    try:
-        service = PredictionsService(db)
-        return await service.get_detailed_predictions(period, include_feature_importance, include_scenario_analysis)
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"詳細予測分析の取得中にエラーが発生しました: {str(e)}"
-        )
+    service = PredictionsService(db)
+    result = await service.get_detailed_predictions(period, include_feature_importance, include_scenario_analysis)
+    return model_response(_ADAPTERS[DetailedPredictionsResponse], result)
 
 
 # ===================================================================
@@ -98,9 +100,4 @@ async def get_detailed_predictions(
 @router.get("/health")
 async def predictions_health_check():
     """予測APIのヘルスチェック"""
-    return {
-        "status": "healthy",
-        "service": "predictions",
-        "timestamp": datetime.now(),
-        "version": "1.0.0"
-    }
\ No newline at end of file
+    return _HEALTH.response()
\ No newline at end of file
@@ -7,9 +7,13 @@ Forex Prediction System - Trading Signals Endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, date
+from datetime import datetime, timedelta
 from decimal import Decimal
+from functools import lru_cache
+import json
 
 from ...database import get_db
 from ...schemas.signals import (
@@ -19,73 +23,100 @@ from ...schemas.signals import (
 )
 from ...models import TradingSignal, SignalType
 from ...services.signals_service import SignalsService
+from ...core.responses import model_response
+from ...core.clock import now_cached
 
 router = APIRouter()
 
+# レスポンスモデルのシリアライザ（インポート時に一度だけ構築）
+_ADAPTERS = {
+    CurrentSignalResponse: TypeAdapter(CurrentSignalResponse),
+}
 
-@router.get("/current", response_model=CurrentSignalResponse)
-async def get_current_signal(db: AsyncSession = Depends(get_db)):
+
+# ===================================================================
+# モックデータ（データベース実装までの暫定処理）
+# ===================================================================
+
+_MOCK_SIGNAL_TYPE = "buy"
+
+_SIGNAL_DISPLAY = {
+    "strong_buy": ("強い買い", "#00d4ff", "↑↑"),
+    "buy": ("買い", "#00a0e9", "↑"),
+    "hold": ("中立", "#ffc107", "→"),
+    "sell": ("売り", "#ff9800", "↓"),
+    "strong_sell": ("強い売り", "#f44336", "↓↓")
+}
+
+_MOCK_REASONING = json.dumps({
+    "technical": "RSI: 45, MACD: 買いシグナル",
+    "prediction": "上昇トレンド予測",
+    "market": "リスクオン相場"
+})
+
+_MOCK_CURRENT_RATE = Decimal("150.25")
+
+# シグナル更新間隔
+_SIGNAL_UPDATE_INTERVAL = timedelta(minutes=30)
+
+
+@lru_cache(maxsize=2)
+def _build_mock_signal(minute_bucket: datetime) -> CurrentSignalResponse:
     """
-    現在の売買シグナル取得エンドポイント
+    分単位でキャッシュしたモックシグナルレスポンスを生成
     
-    5段階の売買判定（強い売り〜強い買い）を信頼度・強度付きで返却
-    前回シグナルからの変化とUI表示用の情報も含む
+    同一分内のリクエストは同じレスポンスオブジェクトを返す
     """
-    # TODO: データベース実装後に以下のコメントを外す
-    # try:
-    #     service = SignalsService(db)
-    #     return await service.get_current_signal()
-    # except Exception as e:
-    #     raise HTTPException(
-    #         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-    #         detail=f"売買シグナル取得に失敗しました: {str(e)}"
-    #     )
-    
-    # モックデータを返す（データベース実装までの暫定処理）
-    from datetime import datetime, timedelta
-    import random
-    import json
+    display_text, color_code, trend_arrow = _SIGNAL_DISPLAY[_MOCK_SIGNAL_TYPE]
     
-    signal_types = ["strong_buy", "buy", "hold", "sell", "strong_sell"]
-    current_signal = random.choice(signal_types)
-    
-    signal_display = {
-        "strong_buy": ("強い買い", "#00d4ff", "↑↑"),
-        "buy": ("買い", "#00a0e9", "↑"),
-        "hold": ("中立", "#ffc107", "→"),
-        "sell": ("売り", "#ff9800", "↓"),
-        "strong_sell": ("強い売り", "#f44336", "↓↓")
-    }
-    
-    display_text, color_code, trend_arrow = signal_display[current_signal]
-    
-    # TradingSignalResponseオブジェクトを作成
     mock_signal = TradingSignalResponse(
         id=1,
-        date=date.today(),
-        signal_type=current_signal,
-        confidence=random.uniform(0.6, 0.95),  # 0-1の範囲に修正
-        strength=random.uniform(0.3, 0.9),
-        reasoning=json.dumps({
-            "technical": "RSI: 45, MACD: 買いシグナル",
-            "prediction": "上昇トレンド予測",
-            "market": "リスクオン相場"
-        }),
-        technical_score=random.uniform(-1, 1),
-        prediction_score=random.uniform(-1, 1),
+        date=minute_bucket.date(),
+        signal_type=_MOCK_SIGNAL_TYPE,
+        confidence=0.78,
+        strength=0.62,
+        reasoning=_MOCK_REASONING,
+        technical_score=0.35,
+        prediction_score=0.42,
         prediction_id=None,
-        current_rate=Decimal("150.25"),
-        created_at=datetime.now()
+        current_rate=_MOCK_CURRENT_RATE,
+        created_at=minute_bucket
     )
     
     return CurrentSignalResponse(
         signal=mock_signal,
         previous_signal="hold",
-        signal_changed=current_signal != "hold",
+        signal_changed=_MOCK_SIGNAL_TYPE != "hold",
         display_text=display_text,
         color_code=color_code,
         trend_arrow=trend_arrow,
-        last_updated=datetime.now(),
-        next_update_at=datetime.now() + timedelta(minutes=30)
+        last_updated=minute_bucket,
+        next_update_at=minute_bucket + _SIGNAL_UPDATE_INTERVAL
     )
 
+
+@router.get("/current", responses={200: {"model": CurrentSignalResponse}})
+async def get_current_signal(db: AsyncSession = Depends(get_db)) -> Response:
+    """
+    現在の売買シグナル取得エンドポイント
+    
+    5段階の売買判定（強い売り〜強い買い）を信頼度・強度付きで返却
+    前回シグナルからの変化とUI表示用の情報も含む
+    """
+    # TODO: データベース実装後に以下のコメントを外す
+    # try:
+    #     service = SignalsService(db)
+    #     result = await service.get_current_signal()
+    #     return model_response(_ADAPTERS[CurrentSignalResponse], result)
+    # except Exception as e:
+    #     raise HTTPException(
+    #         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+    #         detail=f"売買シグナル取得に失敗しました: {str(e)}"
+    #     )
+    
+    # モックデータを返す（データベース実装までの暫定処理）
+    now = now_cached()
+    return model_response(
+        _ADAPTERS[CurrentSignalResponse],
+        _build_mock_signal(now.replace(second=0, microsecond=0))
+    )
@@ -3,24 +3,150 @@ JWT認証とセキュリティ機能
 """
 
 import os
+import orjson
+import time
+import asyncio
+import calendar
+import hashlib
+import hmac
+import multiprocessing
 import jwt
+from jwt.algorithms import HMACAlgorithm
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from ..models import User, UserRole
 from ..schemas.auth import UserMe
+from .auth_cache import auth_cache, hash_token, TTLCache
+from .login_attempts import login_attempts, MAX_FAILED_LOGIN_ATTEMPTS
+
+# argon2-cffiはオプション依存
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHash, VerificationError
+except ImportError:
+    PasswordHasher = None
 
 
 # パスワードハッシュ化設定
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Argon2id（OWASP推奨 46MiB / t=2 / p=1）を既定とし、既存のbcryptハッシュは
+# ログイン成功時にArgon2idへ再ハッシュする。argon2-cffi未導入時はbcryptのみ使用
+ARGON2_TIME_COST = 2
+ARGON2_MEMORY_COST = 46 * 1024
+ARGON2_PARALLELISM = 1
+
+if PasswordHasher is not None:
+    pwd_context = CryptContext(
+        schemes=["argon2", "bcrypt"],
+        deprecated=["bcrypt"],
+        argon2__type="ID",
+        argon2__time_cost=ARGON2_TIME_COST,
+        argon2__memory_cost=ARGON2_MEMORY_COST,
+        argon2__parallelism=ARGON2_PARALLELISM,
+    )
+    # Argon2idハッシュの検証はpasslibのスキーム判定を経由せず直接行う
+    _ARGON2_HASHER = PasswordHasher(
+        time_cost=ARGON2_TIME_COST,
+        memory_cost=ARGON2_MEMORY_COST,
+        parallelism=ARGON2_PARALLELISM,
+    )
+else:
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    _ARGON2_HASHER = None
+
+_ARGON2ID_PREFIX = "$argon2id$"
+
+# パスワードハッシュ計算用プロセスプール（ハッシュ計算のCPU負荷をイベントループから分離）
+# ワーカーは利用可能なCPUコア数だけ起動する。HASH_POOL_PIN_CORES=true の場合は各ワーカーを別々のコアに固定する
+# （複数のuvicornワーカーが同じコアに固定し合うため、単一プロセス構成以外では無効のままにする）
+HASH_POOL_PIN_CORES = os.getenv("HASH_POOL_PIN_CORES", "false").lower() == "true"
+_HASH_POOL_CORES = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+_HASH_POOL_WORKERS = len(_HASH_POOL_CORES) or os.cpu_count() or 1
+_hash_worker_counter = multiprocessing.Value("i", 0)
+
+
+def _pin_hash_worker(cores, counter) -> None:
+    """ワーカープロセスを起動順にCPUコアへ固定（ハッシュ計算中のキャッシュ移動を防ぐ）"""
+    if not cores:
+        return
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    try:
+        os.sched_setaffinity(0, {cores[index % len(cores)]})
+    except OSError:
+        pass
+
+
+_HASH_POOL = ProcessPoolExecutor(
+    max_workers=_HASH_POOL_WORKERS,
+    initializer=_pin_hash_worker if HASH_POOL_PIN_CORES else None,
+    initargs=(_HASH_POOL_CORES, _hash_worker_counter) if HASH_POOL_PIN_CORES else (),
+)
+
+# プールに投入できる同時実行数の上限（超過分は503で即時に拒否し、総当たり攻撃時のキュー肥大を防ぐ）
+MAX_PENDING_HASHES = _HASH_POOL_WORKERS * 2
+_pending_hashes = 0
 
 # JWT設定
 SECRET_KEY = os.getenv("SECRET_KEY", "forex-dev-secret-key-2024-very-secure-local")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7日間（HttpOnly Cookieなので長めに設定）
 
+# 署名鍵とJWS処理器は起動時に一度だけ用意し、トークン毎の鍵変換・クレーム処理を省略する
+_SIGNING_KEY = SECRET_KEY.encode("utf-8")
+_ALLOWED_ALGORITHMS = [ALGORITHM]
+
+
+class _PrecomputedHS256(HMACAlgorithm):
+    """
+    鍵パディング済みのSHA-256状態を再利用するHS256
+
+    HMACの内側・外側パッド（ipad/opad）を1ブロック処理したハッシュ状態を
+    起動時に作成し、署名毎にcopy()して本文のみを処理する。
+    事前計算した鍵以外が渡された場合は通常のHMAC計算を行う
+    """
+
+    def __init__(self, key: bytes):
+        super().__init__(HMACAlgorithm.SHA256)
+        self._signing_key = key
+        block_size = hashlib.sha256().block_size
+        if len(key) > block_size:
+            key = hashlib.sha256(key).digest()
+        key = key.ljust(block_size, b"\0")
+        self._inner = hashlib.sha256(bytes(b ^ 0x36 for b in key))
+        self._outer = hashlib.sha256(bytes(b ^ 0x5C for b in key))
+
+    def sign(self, msg: bytes, key: bytes) -> bytes:
+        if key != self._signing_key:
+            return super().sign(msg, key)
+        inner = self._inner.copy()
+        inner.update(msg)
+        outer = self._outer.copy()
+        outer.update(inner.digest())
+        return outer.digest()
+
+    def verify(self, msg: bytes, key: bytes, sig: bytes) -> bool:
+        return hmac.compare_digest(sig, self.sign(msg, key))
+
+
+_JWS = jwt.PyJWS(algorithms=[])
+_JWS.register_algorithm(ALGORITHM, _PrecomputedHS256(_SIGNING_KEY))
+
+# デコード結果キャッシュ（トークンダイジェスト → (ペイロード, エラー詳細)）
+# 有効なトークンはexpを超えない範囲で、無効なトークンも同じTTLでキャッシュし再検証を省略する
+TOKEN_CACHE_MAXSIZE = 4096
+TOKEN_CACHE_TTL_SECONDS = 60.0
+_TOKEN_CACHE = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
+
+_EXPIRED_TOKEN_DETAIL = "トークンの有効期限が切れています"
+_INVALID_TOKEN_DETAIL = "無効なトークンです"
+
 
 # ===================================================================
 # パスワード関連ユーティリティ
@@ -28,12 +154,56 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7日間（HttpOnly Cookieなので
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """パスワード検証"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update_password(plain_password, hashed_password)[0]
 
 def get_password_hash(password: str) -> str:
     """パスワードハッシュ化"""
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """パスワード検証（旧方式のハッシュであれば再ハッシュ値も返す）"""
+    if _ARGON2_HASHER is None or not hashed_password.startswith(_ARGON2ID_PREFIX):
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    
+    try:
+        _ARGON2_HASHER.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHash):
+        return False, None
+    if _ARGON2_HASHER.check_needs_rehash(hashed_password):
+        return True, get_password_hash(plain_password)
+    return True, None
+
+async def _run_in_hash_pool(func, *args):
+    """ハッシュ処理をプロセスプールで実行（同時実行数が上限に達した場合は503）"""
+    global _pending_hashes
+    if _pending_hashes >= MAX_PENDING_HASHES:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="認証処理が混雑しています。しばらくしてから再度お試しください",
+        )
+    _pending_hashes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_HASH_POOL, func, *args)
+    finally:
+        _pending_hashes -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """パスワード検証（プロセスプールで実行しイベントループをブロックしない）"""
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """パスワード検証と再ハッシュ（プロセスプールで実行）"""
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """パスワードハッシュ化（プロセスプールで実行）"""
+    return await _run_in_hash_pool(get_password_hash, password)
+
+def shutdown_hash_pool() -> None:
+    """パスワードハッシュ用プロセスプールを停止"""
+    _HASH_POOL.shutdown(wait=False, cancel_futures=True)
+
 
 # ===================================================================
 # JWT トークン関連
@@ -48,69 +218,139 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": calendar.timegm(expire.utctimetuple())})
+    encoded_jwt = _JWS.encode(orjson.dumps(to_encode), _SIGNING_KEY, algorithm=ALGORITHM)
     
     return encoded_jwt
 
 def decode_access_token(token: str) -> dict:
-    """JWTトークンをデコード"""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="トークンの有効期限が切れています",
-        )
-    except (jwt.InvalidSignatureError, jwt.DecodeError, Exception):
+    """JWTトークンをデコード（検証結果をキャッシュ）"""
+    key = hash_token(token)
+    cached = _TOKEN_CACHE.get(key)
+    if cached is None:
+        cached = _decode_access_token_uncached(token)
+        payload = cached[0]
+        exp = payload.get("exp") if payload else None
+        _TOKEN_CACHE.set(key, cached, ttl=exp - time.time() if exp is not None else None)
+    
+    payload, error_detail = cached
+    if error_detail is not None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="無効なトークンです",
+            detail=error_detail,
         )
+    return dict(payload)
+
+def _decode_access_token_uncached(token: str) -> Tuple[Optional[dict], Optional[str]]:
+    """JWTの署名・登録クレームを検証し、(ペイロード, エラー詳細)を返す"""
+    try:
+        payload = orjson.loads(_JWS.decode(token, _SIGNING_KEY, algorithms=_ALLOWED_ALGORITHMS))
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError("Invalid payload string: must be a json object")
+        _validate_registered_claims(payload)
+        return payload, None
+    except jwt.ExpiredSignatureError:
+        return None, _EXPIRED_TOKEN_DETAIL
+    except (jwt.PyJWTError, orjson.JSONDecodeError):
+        return None, _INVALID_TOKEN_DETAIL
+
+def _int_claim(payload: dict, name: str, error: jwt.PyJWTError) -> Optional[int]:
+    """数値クレームを整数で取得（存在しない場合はNone、数値でなければerrorを送出）"""
+    if name not in payload:
+        return None
+    try:
+        return int(payload[name])
+    except (TypeError, ValueError):
+        raise error
+
+def _validate_registered_claims(payload: dict) -> None:
+    """
+    登録クレームを検証（audience/issuer未指定のPyJWT jwt.decodeと同じ判定）
+    - iat/nbf: 未来の時刻なら未だ有効でないトークンとして拒否
+    - exp: 現在時刻以前なら期限切れ
+    - aud: audienceを設定していないため、audを含むトークンは拒否
+    """
+    now = time.time()
+    
+    iat = _int_claim(payload, "iat", jwt.InvalidIssuedAtError("Issued At claim (iat) must be an integer."))
+    if iat is not None and iat > now:
+        raise jwt.ImmatureSignatureError("The token is not yet valid (iat)")
+    
+    nbf = _int_claim(payload, "nbf", jwt.DecodeError("Not Before claim (nbf) must be an integer."))
+    if nbf is not None and nbf > now:
+        raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+    
+    exp = _int_claim(payload, "exp", jwt.DecodeError("Expiration Time claim (exp) must be an integer."))
+    if exp is not None and exp <= now:
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    
+    if payload.get("aud"):
+        raise jwt.InvalidAudienceError("Invalid audience")
 
 
 # ===================================================================
 # ユーザー認証関連
 # ===================================================================
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """ユーザー認証（ユーザー名またはメールアドレス）"""
-    # ユーザー名またはメールアドレスで検索
-    user = db.query(User).filter(
-        (User.username == username) | (User.email == username)
-    ).first()
+    # ユーザー名またはメールアドレスで検索（検証に必要な列のみ取得）
+    result = await db.execute(
+        select(User.id, User.hashed_password, User.is_active)
+        .where((User.username == username) | (User.email == username))
+    )
+    credentials = result.first()
     
-    if not user:
+    if not credentials:
         return None
     
     # 非アクティブユーザーチェック
-    if not user.is_active:
+    if not credentials.is_active:
         return None
     
-    # パスワード検証
-    if not verify_password(password, user.hashed_password):
-        # ログイン失敗回数をインクリメント
-        user.failed_login_attempts += 1
-        user.last_failed_login_at = datetime.utcnow()
+    # パスワード検証（旧方式のハッシュはArgon2idへの再ハッシュ値を受け取る）
+    verified, new_hash = await verify_and_update_password_async(password, credentials.hashed_password)
+    if not verified:
+        # ログイン失敗回数をカウント（DBへはアカウント無効化時のみ書き込む）
+        failed_attempts = await login_attempts.increment(credentials.id)
         
         # 5回失敗でアカウント無効化
-        if user.failed_login_attempts >= 5:
-            user.is_active = False
-        
-        db.commit()
+        if failed_attempts >= MAX_FAILED_LOGIN_ATTEMPTS:
+            await db.execute(
+                update(User)
+                .where(User.id == credentials.id)
+                .values(
+                    failed_login_attempts=failed_attempts,
+                    last_failed_login_at=datetime.utcnow(),
+                    is_active=False,
+                )
+            )
+            await db.commit()
+            auth_cache.invalidate_user(credentials.id)
+            await login_attempts.reset(credentials.id)
         return None
     
-    # ログイン成功時の処理
-    user.failed_login_attempts = 0
-    user.last_login_at = datetime.utcnow()
-    db.commit()
+    # ログイン成功時の処理（更新後のユーザーをRETURNINGで取得）
+    await login_attempts.reset(credentials.id)
+    values = {"failed_login_attempts": 0, "last_login_at": datetime.utcnow()}
+    if new_hash is not None:
+        values["hashed_password"] = new_hash
+    user = await db.scalar(
+        update(User)
+        .where(User.id == credentials.id)
+        .values(**values)
+        .returning(User)
+    )
+    # コミットによる属性の失効（再読み込み）を避けるためセッションから切り離す
+    db.expunge(user)
+    await db.commit()
     
     return user
 
-def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
-    """IDからユーザー取得"""
-    return db.query(User).filter(User.id == user_id, User.is_active == True).first()
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+    """IDからユーザー取得（セッションに読み込み済みであればSELECTを発行しない）"""
+    user = await db.get(User, user_id)
+    return user if user is not None and user.is_active else None
 
 def create_user_token(user: User) -> str:
     """ユーザー用JWTトークン生成"""
@@ -127,9 +367,13 @@ def create_user_token(user: User) -> str:
 # 権限チェック関連
 # ===================================================================
 
+# Enumメンバーはシングルトンのため、モジュール定数との同一性比較で判定する
+# （リクエスト毎のEnumクラス属性参照と__eq__呼び出しを避ける）
+_ADMIN_ROLE = UserRole.ADMIN
+
 def check_admin_role(current_user: User) -> bool:
     """管理者権限チェック"""
-    return current_user.role == UserRole.ADMIN
+    return current_user.role is _ADMIN_ROLE
 
 def require_admin_role(current_user: User):
     """管理者権限必須チェック（例外発生）"""
@@ -141,50 +385,54 @@ def require_admin_role(current_user: User):
 
 def check_user_access(current_user: User, target_user_id: int) -> bool:
     """ユーザーアクセス権限チェック（自分のデータまたは管理者）"""
-    return current_user.id == target_user_id or current_user.role == UserRole.ADMIN
+    return current_user.id == target_user_id or current_user.role is _ADMIN_ROLE
 
 
 # ===================================================================
 # ユーザー作成関連
 # ===================================================================
 
-def create_user(db: Session, username: str, email: str, password: str, 
-                full_name: Optional[str] = None, role: UserRole = UserRole.USER) -> User:
+async def create_user(db: AsyncSession, username: str, email: str, password: str, 
+                      full_name: Optional[str] = None, role: UserRole = UserRole.USER) -> User:
     """新規ユーザー作成"""
-    # 重複チェック
-    existing_user = db.query(User).filter(
-        (User.username == username) | (User.email == email)
-    ).first()
+    # ハッシュ化されたパスワード
+    hashed_password = await get_password_hash_async(password)
     
-    if existing_user:
-        if existing_user.username == username:
+    # 新規ユーザー作成（ユーザー名・メールアドレスの重複時は挿入しない）
+    user = await db.scalar(
+        insert(User)
+        .values(
+            username=username,
+            email=email,
+            hashed_password=hashed_password,
+            full_name=full_name,
+            role=role,
+            is_active=True,
+            is_verified=True,  # 簡単のため自動検証済み
+        )
+        .on_conflict_do_nothing()
+        .returning(User)
+    )
+    
+    if user is None:
+        # 重複していた項目を特定してエラーを返す
+        await db.rollback()
+        username_taken = await db.scalar(
+            select(User.id).where(User.username == username).limit(1)
+        )
+        if username_taken is not None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="このユーザー名は既に使用されています",
             )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="このメールアドレスは既に使用されています",
-            )
-    
-    # ハッシュ化されたパスワード
-    hashed_password = get_password_hash(password)
-    
-    # 新規ユーザー作成
-    user = User(
-        username=username,
-        email=email,
-        hashed_password=hashed_password,
-        full_name=full_name,
-        role=role,
-        is_active=True,
-        is_verified=True,  # 簡単のため自動検証済み
-    )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="このメールアドレスは既に使用されています",
+        )
     
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    # コミットによる属性の失効（再読み込み）を避けるためセッションから切り離す
+    db.expunge(user)
+    await db.commit()
     
     return user
 
@@ -193,20 +441,23 @@ def create_user(db: Session, username: str, email: str, password: str,
 # パスワード変更関連
 # ===================================================================
 
-def change_user_password(db: Session, user: User, current_password: str, new_password: str) -> bool:
+async def change_user_password(db: AsyncSession, user: User, current_password: str, new_password: str) -> bool:
     """ユーザーパスワード変更"""
     # 現在のパスワード検証
-    if not verify_password(current_password, user.hashed_password):
+    if not await verify_password_async(current_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="現在のパスワードが間違っています",
         )
     
     # 新しいパスワードをハッシュ化
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = await get_password_hash_async(new_password)
     user.password_changed_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    
+    # 既存トークンのキャッシュを破棄
+    auth_cache.invalidate_user(user.id)
     
     return True
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+認証キャッシュ（LRU + TTL）
+
+JWT検証結果とユーザー情報をプロセス内にキャッシュし、
+認証済みリクエストごとの署名検証とDBラウンドトリップを省略する
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+
+# キャッシュ設定
+AUTH_CACHE_MAXSIZE = 10_000
+AUTH_CACHE_TTL_SECONDS = 15.0
+
+
+def hash_token(token: str) -> bytes:
+    """トークン文字列をキャッシュキー用に短いダイジェストへ変換"""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+# ===================================================================
+# 汎用 LRU + TTL キャッシュ
+# ===================================================================
+
+class TTLCache:
+    """
+    エントリ毎に有効期限を持つLRUキャッシュ
+
+    スレッドセーフ。期限はtime.monotonic()基準で管理する。
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """キャッシュ取得（期限切れは削除してdefaultを返す）"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """キャッシュ登録（ttl未指定時はデフォルトTTL）"""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """キャッシュから削除"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def evict_where(self, predicate: Callable[[Any], bool]) -> int:
+        """条件に一致するエントリを全て削除し、削除件数を返す"""
+        with self._lock:
+            keys = [k for k, (_, v) in self._data.items() if predicate(v)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """全エントリ削除"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """ヒット/ミス統計"""
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+# ===================================================================
+# 認証キャッシュ
+# ===================================================================
+
+class CachedUser(NamedTuple):
+    """
+    キャッシュ用のユーザー情報スナップショット
+
+    ORMインスタンスの代わりにリクエスト間で共有する不変オブジェクト。
+    下流のハンドラーが参照する属性のみを保持し、パスワードハッシュは含めない
+    """
+    id: int
+    username: str
+    email: str
+    full_name: Optional[str]
+    role: Any
+    is_active: bool
+    last_login_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: Any) -> "CachedUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            last_login_at=user.last_login_at,
+            updated_at=user.updated_at,
+        )
+
+
+class AuthCache:
+    """
+    トークン → (ユーザーID, ユーザー) のキャッシュ
+
+    TTLはトークンの有効期限（exp）を超えないよう調整する。
+    パスワード変更・ログアウト時は明示的に無効化する。
+    """
+
+    def __init__(self, maxsize: int = AUTH_CACHE_MAXSIZE, ttl: float = AUTH_CACHE_TTL_SECONDS):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, token: str) -> Optional[Any]:
+        """トークンに対応するキャッシュ済みユーザーを取得"""
+        entry = self._cache.get(hash_token(token))
+        return entry[1] if entry is not None else None
+
+    def set(self, token: str, user_id: int, user: Any, exp: Optional[float] = None) -> None:
+        """ユーザーをキャッシュ（exp: トークン有効期限のUNIX時刻）"""
+        ttl = None
+        if exp is not None:
+            ttl = exp - time.time()
+        self._cache.set(hash_token(token), (user_id, user), ttl=ttl)
+
+    def invalidate_token(self, token: str) -> None:
+        """特定トークンのキャッシュを削除"""
+        self._cache.pop(hash_token(token))
+
+    def invalidate_user(self, user_id: int) -> int:
+        """指定ユーザーの全トークンのキャッシュを削除"""
+        return self._cache.evict_where(lambda entry: entry[0] == user_id)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        """ヒット/ミス統計"""
+        return self._cache.stats()
+
+
+auth_cache = AuthCache()
@@ -0,0 +1,32 @@
+"""
+キャッシュ付き現在時刻
+
+ヘルスチェック・ダッシュボードのポーリング等、高頻度で呼ばれるハンドラー向けに
+datetime.now()の結果を最大1秒間再利用する
+"""
+
+import time
+from datetime import datetime
+from typing import Optional
+
+
+# 現在時刻の更新間隔（秒）
+_REFRESH_SECONDS = 1.0
+
+_checked_at = 0.0
+_cached_now: Optional[datetime] = None
+
+
+def now_cached() -> datetime:
+    """
+    1秒単位でキャッシュした現在時刻を取得
+
+    経過時間の判定には単調時計を使用するため、システム時刻の変更の影響を受けない。
+    返す値は最大1秒古くなるため、秒未満の精度が必要な用途には使用しないこと
+    """
+    global _checked_at, _cached_now
+    checked_at = time.monotonic()
+    if _cached_now is None or checked_at - _checked_at >= _REFRESH_SECONDS:
+        _cached_now = datetime.now()
+        _checked_at = checked_at
+    return _cached_now
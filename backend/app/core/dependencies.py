@@ -4,20 +4,21 @@ FastAPI認証依存関数
 
 from typing import Optional
 from fastapi import Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
-from ..models import User
 from .auth import decode_access_token, get_user_by_id, require_admin_role
+from .auth_cache import auth_cache, CachedUser
 
 
 # ===================================================================
 # JWT認証依存関数
 # ===================================================================
 
-async def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_db)) -> CachedUser:
     """
     現在ログイン中のユーザーを取得
     HttpOnly CookieまたはAuthorizationヘッダーからトークンを読み取り
+    戻り値はセッションに属さない不変のスナップショット（更新する場合はDBから再取得すること）
     """
     # まずAuthorizationヘッダーを確認（API利用）
     auth_header = request.headers.get("Authorization")
@@ -36,6 +37,11 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)) -> U
             detail="認証が必要です",
         )
     
+    # キャッシュ済みなら署名検証とDB取得を省略
+    cached_user = auth_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
     # トークンデコード
     try:
         payload = decode_access_token(token)
@@ -53,16 +59,20 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)) -> U
         )
     
     # ユーザー取得
-    user = get_user_by_id(db, user_id)
+    user = await get_user_by_id(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="ユーザーが見つかりません",
         )
     
-    return user
+    # 不変のスナップショットとしてキャッシュ（リクエスト間で共有するため）
+    cached_user = CachedUser.from_user(user)
+    auth_cache.set(token, user.id, cached_user, exp=payload.get("exp"))
+    
+    return cached_user
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: CachedUser = Depends(get_current_user)) -> CachedUser:
     """アクティブなユーザーのみ許可"""
     if not current_user.is_active:
         raise HTTPException(
@@ -71,7 +81,7 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
         )
     return current_user
 
-async def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_current_admin_user(current_user: CachedUser = Depends(get_current_active_user)) -> CachedUser:
     """管理者権限が必要な場合"""
     require_admin_role(current_user)
     return current_user
@@ -81,7 +91,7 @@ async def get_current_admin_user(current_user: User = Depends(get_current_active
 # オプショナル認証依存関数
 # ===================================================================
 
-async def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -> Optional[User]:
+async def get_current_user_optional(request: Request, db: AsyncSession = Depends(get_db)) -> Optional[CachedUser]:
     """
     オプショナルな現在ユーザー取得
     認証されていない場合はNoneを返す
@@ -0,0 +1,95 @@
+"""
+ログイン失敗回数カウンター
+==========================
+
+ログイン失敗のたびにusers行を更新するとアカウント単位の行ロックとWALが
+集中するため、失敗回数はRedis（INCR + EXPIRE）で数え、DBへはロック確定時のみ書き込む
+- 保存先: REDIS_URL 設定時はRedis、未設定・障害時はプロセス内キャッシュ
+- 失敗回数は最初の失敗から一定時間でリセット
+"""
+
+import logging
+import time
+from typing import Optional
+
+from .auth_cache import TTLCache
+from .response_cache import REDIS_URL
+
+# redisはオプション依存
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+# カウンター設定
+MAX_FAILED_LOGIN_ATTEMPTS = 5
+FAILED_LOGIN_WINDOW_SECONDS = 900
+LOGIN_ATTEMPTS_LOCAL_MAXSIZE = 10_000
+
+_KEY_PREFIX = "loginfail:"
+_REDIS_RETRY_SECONDS = 30.0
+
+
+class LoginAttemptCounter:
+    """
+    ユーザー単位のログイン失敗回数
+
+    Redisが利用できない・障害中の場合はプロセス内キャッシュで代替する。
+    """
+
+    def __init__(self, redis_url: Optional[str] = REDIS_URL, window: int = FAILED_LOGIN_WINDOW_SECONDS):
+        self.window = window
+        self._local = TTLCache(maxsize=LOGIN_ATTEMPTS_LOCAL_MAXSIZE, ttl=window)
+        self._redis = None
+        if redis_url and aioredis is not None:
+            self._redis = aioredis.from_url(
+                redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+        self._redis_retry_at = 0.0
+
+    def _redis_available(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, error: Exception) -> None:
+        """Redis障害時は一定時間プロセス内キャッシュのみを使用"""
+        logger.warning(f"ログイン失敗カウンターのRedisアクセスに失敗しました: {str(error)}")
+        self._redis_retry_at = time.monotonic() + _REDIS_RETRY_SECONDS
+
+    async def increment(self, user_id: int) -> int:
+        """失敗回数を1増やし、現在の回数を返す（初回失敗時に有効期限を設定）"""
+        key = f"{_KEY_PREFIX}{user_id}"
+        if self._redis_available():
+            try:
+                count = int(await self._redis.incr(key))
+                if count == 1:
+                    await self._redis.expire(key, self.window)
+                return count
+            except Exception as e:
+                self._redis_failed(e)
+
+        # プロセス内では (ウィンドウ終了時刻, 回数) を保持し、期限は初回失敗から延長しない
+        now = time.monotonic()
+        window_end, count = self._local.get(key, (now + self.window, 0))
+        count += 1
+        self._local.set(key, (window_end, count), ttl=window_end - now)
+        return count
+
+    async def reset(self, user_id: int) -> None:
+        """失敗回数をリセット"""
+        key = f"{_KEY_PREFIX}{user_id}"
+        self._local.pop(key)
+        if self._redis_available():
+            try:
+                await self._redis.delete(key)
+            except Exception as e:
+                self._redis_failed(e)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+
+
+login_attempts = LoginAttemptCounter()
@@ -0,0 +1,21 @@
+"""
+Numba互換レイヤー
+
+各Numbaカーネルモジュールが共通で使う njit と NUMBA_AVAILABLE
+- numbaはオプション依存。未インストール時の njit は何もしないデコレータで、
+  カーネルは同じコードのまま純Pythonとして実行される
+"""
+
+# numbaはオプション依存（未インストール時はデコレータを無効化）
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba未導入時のフォールバック（何もしないデコレータ）"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
@@ -0,0 +1,260 @@
+"""
+GETレスポンスキャッシュ
+======================
+
+ダッシュボードが定期ポーリングするGETエンドポイントのレスポンスを
+シリアライズ済みバイト列のままキャッシュするASGIミドルウェア
+- キー: blake2b(パス + ソート済みクエリ文字列 + データバージョン)
+- 保存先: REDIS_URL 設定時はRedis、未設定時はプロセス内LRU
+- 為替レート・アラートの保存・更新時にデータバージョンを進めて無効化
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .auth_cache import TTLCache
+
+# redisはオプション依存
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+# キャッシュ設定
+REDIS_URL = os.getenv("REDIS_URL")
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 15))
+RESPONSE_CACHE_LOCAL_MAXSIZE = 1_000
+
+# キャッシュ対象のGETエンドポイント
+CACHED_GET_PATHS = frozenset({
+    "/api/predictions/latest",
+    "/api/indicators/technical",
+    "/api/indicators/summary",
+    "/api/metrics/risk",
+    "/api/charts/historical",
+    "/api/signals/current",
+    "/api/alerts/active",
+})
+
+_KEY_PREFIX = "response-cache:"
+_VERSION_KEY = _KEY_PREFIX + "data-version"
+_VERSION_REFRESH_SECONDS = 1.0
+_REDIS_RETRY_SECONDS = 30.0
+
+
+def build_cache_key(path: str, query_string: bytes, version: int) -> str:
+    """パス・ソート済みクエリ・データバージョンからキャッシュキーを生成"""
+    query = urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+    digest = hashlib.blake2b(
+        f"{path}?{query}#{version}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return _KEY_PREFIX + digest
+
+
+# ===================================================================
+# キャッシュストア
+# ===================================================================
+
+class ResponseCacheStore:
+    """
+    レスポンスバイト列とデータバージョンの保存先
+
+    Redisが利用できない・障害中の場合はプロセス内キャッシュで代替する。
+    """
+
+    def __init__(self, redis_url: Optional[str] = REDIS_URL, ttl: int = RESPONSE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._local = TTLCache(maxsize=RESPONSE_CACHE_LOCAL_MAXSIZE, ttl=ttl)
+        self._redis = None
+        if redis_url and aioredis is not None:
+            self._redis = aioredis.from_url(
+                redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+        self._redis_retry_at = 0.0
+        self._version = 0
+        self._version_synced_at = 0.0
+
+    def _redis_available(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_retry_at
+
+    def _redis_failed(self, error: Exception) -> None:
+        """Redis障害時は一定時間プロセス内キャッシュのみを使用"""
+        logger.warning(f"レスポンスキャッシュのRedisアクセスに失敗しました: {str(error)}")
+        self._redis_retry_at = time.monotonic() + _REDIS_RETRY_SECONDS
+
+    async def current_version(self) -> int:
+        """現在のデータバージョン（Redis値は最大1秒間ローカルに保持）"""
+        now = time.monotonic()
+        if self._redis_available() and now - self._version_synced_at >= _VERSION_REFRESH_SECONDS:
+            try:
+                value = await self._redis.get(_VERSION_KEY)
+                self._version = max(self._version, int(value or 0))
+                self._version_synced_at = now
+            except Exception as e:
+                self._redis_failed(e)
+        return self._version
+
+    def touch(self) -> None:
+        """データバージョンを進めて既存キャッシュを無効化"""
+        self._version += 1
+        self._local.clear()
+        if self._redis_available():
+            try:
+                asyncio.get_running_loop().create_task(self._incr_version())
+            except RuntimeError:
+                # イベントループ外（同期スクリプト等）ではローカルのみ更新
+                pass
+
+    async def _incr_version(self) -> None:
+        try:
+            self._version = max(self._version, int(await self._redis.incr(_VERSION_KEY)))
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if self._redis_available():
+            try:
+                return await self._redis.get(key)
+            except Exception as e:
+                self._redis_failed(e)
+        return self._local.get(key)
+
+    async def set(self, key: str, body: bytes) -> None:
+        if self._redis_available():
+            try:
+                await self._redis.setex(key, self.ttl, body)
+                return
+            except Exception as e:
+                self._redis_failed(e)
+        self._local.set(key, body)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+
+
+response_cache = ResponseCacheStore()
+
+
+# ===================================================================
+# キャッシュ対象データ更新時の無効化
+# ===================================================================
+
+_DATA_CHANGED_KEY = "response_cache_data_changed"
+
+
+def _is_cached_model(cls) -> bool:
+    """レスポンスキャッシュの内容に影響するモデル（為替レート・アラート）か"""
+    from ..models import ActiveAlert, ExchangeRate
+
+    return cls is not None and issubclass(cls, (ExchangeRate, ActiveAlert))
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_cached_data_changes(session: Session, flush_context) -> None:
+    """為替レート・アラートの追加・更新・削除をセッションに記録"""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if _is_cached_model(type(obj)):
+            session.info[_DATA_CHANGED_KEY] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_cached_data_statements(orm_execute_state) -> None:
+    """一括UPDATE/DELETE文（アラートの確認済み更新等）もセッションに記録"""
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and _is_cached_model(mapper.class_):
+            orm_execute_state.session.info[_DATA_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _touch_on_cached_data_commit(session: Session) -> None:
+    """キャッシュ対象データ変更のコミット後にデータバージョンを進める"""
+    if session.info.pop(_DATA_CHANGED_KEY, False):
+        response_cache.touch()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_cached_data_mark(session: Session) -> None:
+    session.info.pop(_DATA_CHANGED_KEY, None)
+
+
+# ===================================================================
+# ASGIミドルウェア
+# ===================================================================
+
+class ResponseCacheMiddleware:
+    """
+    対象GETエンドポイントのJSONレスポンスをキャッシュするASGIミドルウェア
+
+    CORSミドルウェアより内側に登録すること（ヒット時もCORSヘッダーを付与するため）。
+    """
+
+    def __init__(self, app, store: Optional[ResponseCacheStore] = None, paths=CACHED_GET_PATHS):
+        self.app = app
+        self.store = store or response_cache
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        version = await self.store.current_version()
+        key = build_cache_key(scope["path"], scope.get("query_string", b""), version)
+
+        cached = await self.store.get(key)
+        if cached is not None:
+            await self._send_cached(send, cached)
+            return
+
+        start_message, chunks = None, []
+
+        async def capture_send(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, capture_send)
+
+        if start_message is not None and self._is_cacheable(start_message):
+            await self.store.set(key, b"".join(chunks))
+
+    @staticmethod
+    def _is_cacheable(start_message) -> bool:
+        """200かつJSONのレスポンスのみキャッシュ"""
+        if start_message["status"] != 200:
+            return False
+        for name, value in start_message.get("headers", []):
+            if name.lower() == b"content-type":
+                return value.startswith(b"application/json")
+        return False
+
+    @staticmethod
+    async def _send_cached(send, body: bytes) -> None:
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            (b"x-cache", b"HIT"),
+        ]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,82 @@
+"""
+高速JSONレスポンス
+
+orjsonを使用したレスポンスクラスとエンコーダー
+チャート・指標・メトリクス等の大きなペイロードのシリアライズを高速化する
+"""
+
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _orjson_default(obj: Any) -> Any:
+    """orjsonが直接扱えない型の変換（Decimalは数値として出力）"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return str(obj)
+
+
+def orjson_dumps(content: Any) -> bytes:
+    """orjsonでシリアライズ（Decimal・numpy対応）"""
+    return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """orjsonでシリアライズするJSONレスポンス"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson_dumps(content)
+
+
+def precomputed_response(body: bytes) -> Response:
+    """
+    事前シリアライズ済みのJSONバイト列をレスポンスとして返す
+
+    ミドルウェアがヘッダーを書き換えるため、Responseオブジェクト自体は毎回生成する
+    """
+    return Response(content=body, media_type="application/json")
+
+
+def model_response(adapter: TypeAdapter, content: Any) -> Response:
+    """
+    構築済みTypeAdapterでモデルを直接JSONバイト列にシリアライズして返す
+
+    サービス層で生成済みのレスポンスモデルをFastAPIのresponse_modelで
+    再検証しないため、ネストの深いペイロードのリクエスト毎コストを削減できる
+    """
+    return Response(content=adapter.dump_json(content), media_type="application/json")
+
+
+class TimestampedJSON:
+    """
+    静的な内容を事前計算し、タイムスタンプのみ1秒単位で更新するJSONレスポンス
+
+    ヘルスチェック等、内容が固定でタイムスタンプだけが変わるエンドポイント用
+    """
+
+    def __init__(self, content: Dict[str, Any], timestamp_field: str = "timestamp"):
+        self._content = dict(content)
+        self._timestamp_field = timestamp_field
+        self._bucket: Optional[int] = None
+        self._body = b""
+
+    def response(self) -> Response:
+        bucket = int(time.time())
+        if bucket != self._bucket:
+            self._body = orjson_dumps({
+                **self._content,
+                self._timestamp_field: datetime.fromtimestamp(bucket),
+            })
+            self._bucket = bucket
+        return precomputed_response(self._body)
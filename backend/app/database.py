@@ -3,7 +3,9 @@ Database configuration and session management
 """
 
 import os
-from typing import AsyncGenerator, Generator
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Generator, Optional
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
@@ -21,20 +23,37 @@ if not DATABASE_URL:
 # 非同期用のデータベースURL
 ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 
+# コネクションプールからの取得待ちの上限（秒）
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 5))
+
+# リクエスト処理用セッションのステートメントタイムアウト（ミリ秒、0で無効）
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 3000))
+
 # SQLAlchemyエンジンとセッション設定（同期版）
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,  # 接続確認
     pool_recycle=3600,   # 1時間でコネクションプールをリサイクル
+    pool_use_lifo=True,  # 直近に使用した接続を再利用し、アイドル接続を自然に縮退させる
+    pool_timeout=DB_POOL_TIMEOUT,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 非同期コネクションプールサイズ（同時DBセッション数の上限と一致させる）
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+
 # 非同期SQLAlchemyエンジンとセッション設定
 async_engine = create_async_engine(
     ASYNC_DATABASE_URL,
     pool_pre_ping=True,
     pool_recycle=3600,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=0,  # セマフォで同時数を制御するためオーバーフローなし
+    pool_use_lifo=True,
+    pool_timeout=DB_POOL_TIMEOUT,
+    query_cache_size=1200,  # コンパイル済みSQLのキャッシュ（asyncpg側でプリペアドステートメントも再利用される）
+    connect_args={"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}},
     echo=False  # SQLログを抑制
 )
 
@@ -43,15 +62,41 @@ AsyncSessionLocal = sessionmaker(
     class_=AsyncSession,
     autocommit=False,
     autoflush=False,
+    expire_on_commit=False,  # コミット後の属性アクセスで再SELECTを発生させない
 )
 
 Base = declarative_base()
 
+# 同時DBセッション数を制限するセマフォ（イベントループ起動後に遅延生成）
+_db_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_db_semaphore() -> asyncio.Semaphore:
+    """
+    DB接続の同時実行数を制限するセマフォを取得
+    上限を超えたコルーチンはプールではなくセマフォで待機する
+    """
+    global _db_semaphore
+    if _db_semaphore is None:
+        _db_semaphore = asyncio.Semaphore(DB_POOL_SIZE)
+    return _db_semaphore
+
 
-def get_db() -> Generator[Session, None, None]:
+@asynccontextmanager
+async def db_session() -> AsyncIterator[AsyncSession]:
+    """
+    同時実行数を制限した非同期セッション
+    リクエストのセッションとは別に、独立したセッションで並行クエリを行う場合に使用
+    """
+    async with get_db_semaphore():
+        async with AsyncSessionLocal() as session:
+            yield session
+
+
+def get_sync_db() -> Generator[Session, None, None]:
     """
     Database session dependency (同期版)
-    FastAPIの依存性注入で使用されるデータベースセッション
+    スクリプト等、同期処理用のデータベースセッション
     """
     db = SessionLocal()
     try:
@@ -60,13 +105,18 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Async database session dependency (非同期版)
-    非同期処理用のデータベースセッション
+    Database session dependency
+    FastAPIの依存性注入で使用されるデータベースセッション（非同期版）
+    同時セッション数はDB_POOL_SIZEで制限される
+    認証依存（get_current_user等）もこの関数を使い、1リクエストで1セッションを共有する
     """
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
\ No newline at end of file
+    async with db_session() as session:
+        yield session
+
+
+# 旧名の別名（get_dbと同じ依存関数）
+# FastAPIは同一の依存関数を1リクエスト内で1回だけ解決するため、別関数にすると
+# 認証依存とルートでセマフォの枠を2つ取り、プール上限付近でデッドロックする
+get_async_db = get_db
@@ -6,12 +6,22 @@ CHAIN-001連鎖APIテスト用のFastAPIアプリケーション
 エンドポイント連鎖：4.2→1.1→1.2→1.3
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import SQLAlchemyError
+from .core.responses import ORJSONResponse
+from .core.auth import shutdown_hash_pool
+from .core.response_cache import ResponseCacheMiddleware, response_cache
+from .core.login_attempts import login_attempts
+from .core.clock import now_cached
+from .websocket.manager import manager, dumps_message, generate_mock_price_data, generate_mock_signals, generate_mock_alerts
 import os
+import re
 import asyncio
-import json
+import orjson
+import logging
 from datetime import datetime
+from typing import List
 
 # Import routers
 from .routers.data import router as data_router
@@ -36,9 +46,13 @@ app = FastAPI(
     description="為替予測システムのAPIエンドポイント",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,  # 大きなチャート・指標ペイロードを高速にシリアライズ
 )
 
+# レスポンスキャッシュ（CORSより内側に配置するため先に登録）
+app.add_middleware(ResponseCacheMiddleware)
+
 # CORS middleware
 # CORS設定
 cors_origins = os.getenv("CORS_ORIGINS", "").split(",") if os.getenv("CORS_ORIGINS") else []
@@ -51,38 +65,88 @@ default_origins = [
     "http://localhost:3000",
     "http://localhost:5174",
 ]
-all_origins = list(set(cors_origins + default_origins))
+
+
+def _split_cors_origins(origins):
+    """
+    CORSオリジンを完全一致の集合とワイルドカード用の正規表現に分割
+
+    CORSMiddlewareのallow_originsはワイルドカードを展開しないため、
+    「*」を含むオリジンは1つの正規表現にまとめてallow_origin_regexで照合する。
+    「*」はサブドメインの1ラベル分（ドット・スラッシュ・コロンを含まない）に一致する
+    """
+    exact, patterns = set(), []
+    for origin in (o.strip() for o in origins):
+        if not origin:
+            continue
+        if "*" in origin:
+            patterns.append(r"[^./:]+".join(re.escape(part) for part in origin.split("*")))
+        else:
+            exact.add(origin)
+    regex = "|".join(f"(?:{pattern})" for pattern in sorted(set(patterns))) or None
+    return frozenset(exact), regex
+
+
+exact_origins, origin_regex = _split_cors_origins(cors_origins + default_origins)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=all_origins,
+    allow_origins=exact_origins,
+    allow_origin_regex=origin_regex,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
     expose_headers=["*"],
 )
 
+logger = logging.getLogger(__name__)
+
+
+# データベースエラーの共通ハンドラー（各エンドポイントでの個別変換は行わない）
+@app.exception_handler(SQLAlchemyError)
+async def database_error_handler(request: Request, exc: SQLAlchemyError):
+    """データベースエラーを500レスポンスに変換"""
+    logger.error(f"データベースエラー: {request.method} {request.url.path}: {exc}")
+    return ORJSONResponse(
+        status_code=500,
+        content={"detail": "データベース処理中にエラーが発生しました"}
+    )
+
+# 起動時にスケジューラーを自動開始するか（未設定時は/api/scheduler経由で開始）
+SCHEDULER_AUTOSTART = os.getenv("SCHEDULER_AUTOSTART", "false").lower() == "true"
+
+# バックグラウンドタスクの参照（GCによる破棄を防ぎ、終了時にキャンセルする）
+_background_tasks: List[asyncio.Task] = []
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """アプリケーション起動時の処理"""
     # スケジューラーを開始（オプション）
-    # await scheduler_service.start()
-    pass
+    if scheduler_service is not None and SCHEDULER_AUTOSTART:
+        await scheduler_service.start()
+    # WebSocket配信用のデータ生成タスクを開始
+    for generator in (generate_mock_price_data, generate_mock_signals, generate_mock_alerts):
+        _background_tasks.append(asyncio.create_task(generator()))
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """アプリケーション終了時の処理"""
+    # バックグラウンドタスクを停止
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    _background_tasks.clear()
     # スケジューラーを停止
-    if scheduler_service.is_running:
+    if scheduler_service is not None and scheduler_service.is_running:
         scheduler_service.stop()
-
-# Health check endpoint
-@app.get("/health")
-async def health_check():
-    """ヘルスチェックエンドポイント"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    # パスワードハッシュ用プロセスプールを停止
+    shutdown_hash_pool()
+    # レスポンスキャッシュのRedis接続を閉じる
+    await response_cache.close()
+    # ログイン失敗カウンターのRedis接続を閉じる
+    await login_attempts.close()
 
 @app.get("/")
 async def root():
@@ -121,36 +185,13 @@ app.include_router(charts_router, prefix="/api/charts", tags=["charts"])
 app.include_router(indicators_router, prefix="/api/indicators", tags=["indicators"])
 
 
-@app.get("/")
-async def root():
-    """ヘルスチェック用ルートエンドポイント"""
-    return {
-        "message": "Forex Prediction System API",
-        "version": "1.0.0",
-        "status": "running",
-        "chain_endpoints": {
-            "4.2": "/api/data/collect",
-            "1.1": "/api/rates/current", 
-            "1.2": "/api/predictions/latest",
-            "1.3": "/api/signals/current",
-            "2.1": "/api/charts/historical",
-            "2.2": "/api/predictions/detailed",
-            "2.3": "/api/indicators/technical",
-            "2.4": "/api/indicators/economic",
-            "3.1": "/api/backtest/run",
-            "3.2": "/api/backtest/results/{job_id}",
-            "3.3": "/api/backtest/metrics/{job_id}",
-            "3.4": "/api/backtest/trades/{job_id}"
-        }
-    }
-
-
 @app.get("/health")
 @app.get("/api/health")
 async def health_check():
     """詳細ヘルスチェック"""
     return {
         "status": "healthy",
+        "timestamp": now_cached().isoformat(),
         "database": "connected",
         "services": {
             "data": "operational",
@@ -163,7 +204,42 @@ async def health_check():
 
 
 # WebSocketエンドポイント
-from .websocket.manager import manager, generate_mock_price_data, generate_mock_signals, generate_mock_alerts
+
+# 接続時に登録するデフォルトトピック
+DEFAULT_WS_TOPICS = ("rates", "signals", "alerts")
+
+
+async def _ws_subscribe(websocket: WebSocket, message: dict, data: str):
+    topic = message.get("topic")
+    if topic:
+        manager.subscribe(websocket, topic)
+        await websocket.send_text(dumps_message({
+            "type": "subscribed",
+            "topic": topic
+        }))
+
+
+async def _ws_unsubscribe(websocket: WebSocket, message: dict, data: str):
+    topic = message.get("topic")
+    if topic:
+        manager.unsubscribe(websocket, topic)
+        await websocket.send_text(dumps_message({
+            "type": "unsubscribed",
+            "topic": topic
+        }))
+
+
+async def _ws_echo(websocket: WebSocket, message: dict, data: str):
+    # エコーバック
+    await websocket.send_text(f"Echo: {data}")
+
+
+# メッセージ種別ごとのハンドラー（未知の種別はエコーバック）
+WS_MESSAGE_HANDLERS = {
+    "subscribe": _ws_subscribe,
+    "unsubscribe": _ws_unsubscribe,
+}
+
 
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
@@ -171,12 +247,10 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
     await manager.connect(websocket)
     
     # クライアントをデフォルトトピックに登録
-    manager.subscribe(websocket, "rates")
-    manager.subscribe(websocket, "signals")
-    manager.subscribe(websocket, "alerts")
+    manager.subscribe_all(websocket, DEFAULT_WS_TOPICS)
     
     try:
-        await websocket.send_text(json.dumps({
+        await websocket.send_text(dumps_message({
             "type": "connection",
             "message": f"Connected as {client_id}",
             "timestamp": datetime.now().isoformat()
@@ -185,46 +259,17 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
         while True:
             # クライアントからのメッセージを待機
             data = await websocket.receive_text()
-            message = json.loads(data)
-            
-            # サブスクリプション管理
-            if message.get("type") == "subscribe":
-                topic = message.get("topic")
-                if topic:
-                    manager.subscribe(websocket, topic)
-                    await websocket.send_text(json.dumps({
-                        "type": "subscribed",
-                        "topic": topic
-                    }))
-            elif message.get("type") == "unsubscribe":
-                topic = message.get("topic")
-                if topic:
-                    manager.unsubscribe(websocket, topic)
-                    await websocket.send_text(json.dumps({
-                        "type": "unsubscribed",
-                        "topic": topic
-                    }))
-            else:
-                # エコーバック
-                await websocket.send_text(f"Echo: {data}")
+            message = orjson.loads(data)
+            handler = WS_MESSAGE_HANDLERS.get(message.get("type"), _ws_echo)
+            await handler(websocket, message, data)
                 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
-        await manager.broadcast(json.dumps({
+        await manager.broadcast(dumps_message({
             "type": "disconnection",
             "message": f"Client {client_id} disconnected"
         }))
 
-# WebSocket用のバックグラウンドタスクを開始
-@app.on_event("startup")
-async def startup_event():
-    """アプリケーション起動時のイベント"""
-    # バックグラウンドでデータ生成タスクを開始
-    asyncio.create_task(generate_mock_price_data())
-    asyncio.create_task(generate_mock_signals())
-    asyncio.create_task(generate_mock_alerts())
-
-
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("API_PORT", 8173))
@@ -0,0 +1,126 @@
+"""
+アンサンブル結合カーネル
+========================
+
+EnsembleForexPredictor / EnsembleModel の集計を Numba で JIT コンパイルしたカーネル群
+- 予測値・下限・上限の加重平均を1回のループでまとめて計算（中間配列を作らない）
+- サブモデル予測の重み付き合計・モデル合意度の統計量（サブモデル数は数個のため、
+  NumPyの関数呼び出しごとのオーバーヘッドを避けて1回のループで集計）
+- numba 未インストール環境では同じコードを純Pythonとして実行する
+"""
+
+import numpy as np
+
+from ..core.numba_compat import NUMBA_AVAILABLE, njit
+
+
+# ===================================================================
+# 加重平均
+# ===================================================================
+
+@njit(cache=True)
+def _weighted_average(a, b, weight_a, weight_b):
+    """weight_a * a + weight_b * b"""
+    n = a.shape[0]
+    out = np.empty(n)
+    for i in range(n):
+        out[i] = weight_a * a[i] + weight_b * b[i]
+    return out
+
+
+@njit(cache=True)
+def _weighted_average_bounds(pred_a, pred_b, lower_a, lower_b, upper_a, upper_b, weight_a, weight_b):
+    """予測値・下限・上限それぞれの加重平均を1パスで計算"""
+    n = pred_a.shape[0]
+    pred = np.empty(n)
+    lower = np.empty(n)
+    upper = np.empty(n)
+    for i in range(n):
+        pred[i] = weight_a * pred_a[i] + weight_b * pred_b[i]
+        lower[i] = weight_a * lower_a[i] + weight_b * lower_b[i]
+        upper[i] = weight_a * upper_a[i] + weight_b * upper_b[i]
+    return pred, lower, upper
+
+
+def _flatten(values, n=None) -> np.ndarray:
+    """1次元配列に変換し、長さが揃っていることを確認"""
+    values = np.ravel(values)
+    if n is not None and values.shape[0] != n:
+        raise ValueError(f"Prediction length mismatch: {values.shape[0]} != {n}")
+    return values
+
+
+def weighted_average(a, b, weight_a: float, weight_b: float) -> np.ndarray:
+    """2つの予測の加重平均"""
+    a = _flatten(a)
+    return _weighted_average(a, _flatten(b, a.shape[0]), float(weight_a), float(weight_b))
+
+
+def weighted_average_bounds(
+    pred_a, pred_b, lower_a, lower_b, upper_a, upper_b, weight_a: float, weight_b: float
+):
+    """予測値・下限・上限の加重平均のタプル"""
+    pred_a = _flatten(pred_a)
+    n = pred_a.shape[0]
+    return _weighted_average_bounds(
+        pred_a, _flatten(pred_b, n),
+        _flatten(lower_a, n), _flatten(lower_b, n),
+        _flatten(upper_a, n), _flatten(upper_b, n),
+        float(weight_a), float(weight_b),
+    )
+
+
+# ===================================================================
+# サブモデル予測の統合・モデル合意度（EnsembleModel）
+# ===================================================================
+
+@njit(cache=True)
+def weighted_fields(fields, weights):
+    """
+    (項目数, モデル数) の配列の各行を重み付きで合計（重みは正規化済み）
+    
+    Returns:
+        項目ごとの重み付き合計の配列
+    """
+    n_fields, n_models = fields.shape
+    out = np.zeros(n_fields)
+    for j in range(n_fields):
+        for i in range(n_models):
+            out[j] += weights[i] * fields[j, i]
+    return out
+
+
+@njit(cache=True)
+def summary_stats(values):
+    """平均・母標準偏差・最小値・最大値のタプル"""
+    n = values.shape[0]
+    total = 0.0
+    low = values[0]
+    high = values[0]
+    for i in range(n):
+        total += values[i]
+        low = min(low, values[i])
+        high = max(high, values[i])
+    avg = total / n
+    squared = 0.0
+    for i in range(n):
+        squared += (values[i] - avg) ** 2
+    return avg, np.sqrt(squared / n), low, high
+
+
+# ===================================================================
+# ウォームアップ
+# ===================================================================
+
+def _warm_up() -> None:
+    """import時に小さな入力で各カーネルをコンパイル（初回推論・予測時のJITコストを回避）"""
+    for dtype in (np.float32, np.float64):
+        sample = np.zeros(2, dtype=dtype)
+        weighted_average(sample, sample, 0.5, 0.5)
+        weighted_average_bounds(sample, sample, sample, sample, sample, sample, 0.5, 0.5)
+    weighted_fields(np.zeros((5, 3)), np.full(3, 1 / 3))
+    summary_stats(np.zeros(3))
+
+
+if NUMBA_AVAILABLE:
+    _warm_up()
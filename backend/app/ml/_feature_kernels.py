@@ -0,0 +1,422 @@
+"""
+特徴量計算カーネル
+==================
+
+FeatureEngineer のローリング統計・テクニカル指標を Numba で JIT コンパイルしたカーネル群
+- 入力は連続した float64 の numpy 配列
+- pandas の rolling(window).mean()/std()/min()/max() と ewm(span, adjust=False).mean() と
+  同じ欠損値の扱い（窓内にNaNを含む場合はNaN、ウォームアップ期間はNaN）を再現する
+- 窓の出入りを差分更新する1パス計算（O(N)）
+- numba 未インストール環境では同じコードを純Pythonとして実行する
+"""
+
+import numpy as np
+
+from ..core.numba_compat import NUMBA_AVAILABLE, njit
+
+
+def as_float_array(values) -> np.ndarray:
+    """系列を連続したfloat64配列に変換"""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+# ===================================================================
+# ローリング統計
+# ===================================================================
+
+@njit(cache=True)
+def rolling_mean(values, window):
+    """ローリング平均（窓内の有効値がwindow本未満の位置はNaN）"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    count = 0
+    for i in range(n):
+        value = values[i]
+        if value == value:
+            total += value
+            count += 1
+        if i >= window:
+            old = values[i - window]
+            if old == old:
+                total -= old
+                count -= 1
+        if count == window:
+            out[i] = total / window
+    return out
+
+
+@njit(cache=True)
+def rolling_std(values, window):
+    """ローリング標本標準偏差（ddof=1、Welford法による窓の差分更新）"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        value = values[i]
+        if value == value:
+            count += 1
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+        if i >= window:
+            old = values[i - window]
+            if old == old:
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = old - mean
+                    mean -= delta / count
+                    m2 -= delta * (old - mean)
+        if count == window and window > 1:
+            out[i] = np.sqrt(m2 / (window - 1)) if m2 > 0.0 else 0.0
+    return out
+
+
+@njit(cache=True)
+def _rolling_extreme(values, window, use_max):
+    """単調キューによるローリング最大値・最小値"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    queue = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    nan_count = 0
+    for i in range(n):
+        value = values[i]
+        if value == value:
+            while tail > head and (
+                values[queue[tail - 1]] <= value if use_max else values[queue[tail - 1]] >= value
+            ):
+                tail -= 1
+            queue[tail] = i
+            tail += 1
+        else:
+            nan_count += 1
+        if i >= window:
+            if values[i - window] != values[i - window]:
+                nan_count -= 1
+            while tail > head and queue[head] <= i - window:
+                head += 1
+        if i >= window - 1 and nan_count == 0:
+            out[i] = values[queue[head]]
+    return out
+
+
+@njit(cache=True)
+def rolling_max(values, window):
+    """ローリング最大値"""
+    return _rolling_extreme(values, window, True)
+
+
+@njit(cache=True)
+def rolling_min(values, window):
+    """ローリング最小値"""
+    return _rolling_extreme(values, window, False)
+
+
+@njit(cache=True)
+def rolling_window_stats(values, window):
+    """
+    ローリング平均・標本標準偏差・最大値・最小値を1パスでまとめて計算
+
+    戻り値は (4, N) の配列で、行は平均・標準偏差・最大値・最小値の順。
+    各行は rolling_mean / rolling_std / rolling_max / rolling_min と同じ値になる
+    """
+    n = values.shape[0]
+    out = np.full((4, n), np.nan)
+    max_queue = np.empty(n, dtype=np.int64)
+    min_queue = np.empty(n, dtype=np.int64)
+    max_head = max_tail = 0
+    min_head = min_tail = 0
+    total = 0.0
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        value = values[i]
+        if value == value:
+            total += value
+            count += 1
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+            while max_tail > max_head and values[max_queue[max_tail - 1]] <= value:
+                max_tail -= 1
+            max_queue[max_tail] = i
+            max_tail += 1
+            while min_tail > min_head and values[min_queue[min_tail - 1]] >= value:
+                min_tail -= 1
+            min_queue[min_tail] = i
+            min_tail += 1
+        if i >= window:
+            old = values[i - window]
+            if old == old:
+                total -= old
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = old - mean
+                    mean -= delta / count
+                    m2 -= delta * (old - mean)
+            while max_tail > max_head and max_queue[max_head] <= i - window:
+                max_head += 1
+            while min_tail > min_head and min_queue[min_head] <= i - window:
+                min_head += 1
+        if count == window:
+            out[0, i] = total / window
+            if window > 1:
+                out[1, i] = np.sqrt(m2 / (window - 1)) if m2 > 0.0 else 0.0
+            out[2, i] = values[max_queue[max_head]]
+            out[3, i] = values[min_queue[min_head]]
+    return out
+
+
+@njit(cache=True)
+def ewm_step(weighted, old_wt, value, alpha):
+    """
+    ewm_mean の1ステップ分の更新
+
+    状態は (加重平均, 直前の観測値の重み)。最初の観測値までは加重平均がNaN
+    """
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if value == value:
+            if weighted != value:
+                weighted = (old_wt * weighted + alpha * value) / (old_wt + alpha)
+            old_wt = 1.0
+    elif value == value:
+        weighted = value
+    return weighted, old_wt
+
+
+@njit(cache=True)
+def ewm_mean(values, span):
+    """指数加重移動平均（pandasのewm(span, adjust=False).mean()と同じ漸化式）"""
+    n = values.shape[0]
+    out = np.empty(n)
+    alpha = 2.0 / (span + 1.0)
+    weighted = np.nan
+    old_wt = 1.0
+    for i in range(n):
+        weighted, old_wt = ewm_step(weighted, old_wt, values[i], alpha)
+        out[i] = weighted
+    return out
+
+
+# ===================================================================
+# テクニカル指標
+# ===================================================================
+
+@njit(cache=True)
+def ewm_state(values, span):
+    """ewm_mean を系列の最後まで進めたときの状態 (加重平均, 直前の観測値の重み)"""
+    alpha = 2.0 / (span + 1.0)
+    weighted = np.nan
+    old_wt = 1.0
+    for i in range(values.shape[0]):
+        weighted, old_wt = ewm_step(weighted, old_wt, values[i], alpha)
+    return weighted, old_wt
+
+
+@njit(cache=True)
+def wilder_rsi_step(avg_gain, avg_loss, i, change, period):
+    """
+    wilder_rsi の i 本目（i >= 1）の更新
+
+    戻り値は (平均上昇幅, 平均下落幅, RSI)。初期値が揃うまでのRSIはNaN
+    """
+    gain = change if change > 0 else 0.0
+    loss = -change if change < 0 else 0.0
+    if i <= period:
+        avg_gain += gain / period
+        avg_loss += loss / period
+        if i < period:
+            return avg_gain, avg_loss, np.nan
+    else:
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    return avg_gain, avg_loss, 100.0 - 100.0 / (1.0 + avg_gain / (avg_loss + 1e-10))
+
+
+@njit(cache=True)
+def wilder_rsi(close, period):
+    """
+    WilderのRSI
+
+    最初のperiod本の上昇幅・下落幅の単純平均を初期値とし、以降は
+    avg = (avg * (period - 1) + 今回の値) / period で平滑化する。
+    欠損値を含む差分は上昇・下落とも0として扱い、初期値が揃うまではNaN
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, n):
+        avg_gain, avg_loss, out[i] = wilder_rsi_step(
+            avg_gain, avg_loss, i, close[i] - close[i - 1], period
+        )
+    return out
+
+
+@njit(cache=True)
+def wilder_rsi_state(close, period):
+    """wilder_rsi を系列の最後まで進めたときの状態 (平均上昇幅, 平均下落幅)"""
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, close.shape[0]):
+        avg_gain, avg_loss, _ = wilder_rsi_step(avg_gain, avg_loss, i, close[i] - close[i - 1], period)
+    return avg_gain, avg_loss
+
+
+@njit(cache=True)
+def _true_range(high, low, close, i):
+    """i本目のTrue Range（先頭足は高値-安値、NaNを除いた最大値はpandasのmax(axis=1)と同じ）"""
+    value = high[i] - low[i]
+    if i > 0:
+        for candidate in (abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])):
+            if candidate == candidate and (value != value or candidate > value):
+                value = candidate
+    return value
+
+
+@njit(cache=True)
+def average_true_range(high, low, close, period):
+    """
+    ATR（True Rangeの単純移動平均）
+
+    窓から外れるTrue Rangeは入力から再計算し、True Rangeの中間配列を作らずに1パスで計算する
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    count = 0
+    for i in range(n):
+        value = _true_range(high, low, close, i)
+        if value == value:
+            total += value
+            count += 1
+        if i >= period:
+            old = _true_range(high, low, close, i - period)
+            if old == old:
+                total -= old
+                count -= 1
+        if count == period:
+            out[i] = total / period
+    return out
+
+
+# テクニカル指標の期間（technical_indicators とオンライン計算で共通）
+SMA_PERIODS = (5, 10, 20, 50)
+EMA_FAST_SPAN = 12
+EMA_SLOW_SPAN = 26
+MACD_SIGNAL_SPAN = 9
+RSI_PERIOD = 14
+BB_PERIOD = 20
+BB_NUM_STD = 2
+ATR_PERIOD = 14
+STOCH_PERIOD = 14
+STOCH_SMOOTH = 3
+
+# technical_indicators の出力行に対応する列名
+TECHNICAL_COLUMNS = (
+    'sma_5', 'sma_5_ratio', 'sma_10', 'sma_10_ratio',
+    'sma_20', 'sma_20_ratio', 'sma_50', 'sma_50_ratio',
+    'ema_12', 'ema_26', 'macd', 'macd_signal', 'macd_histogram',
+    'rsi',
+    'bb_middle', 'bb_upper', 'bb_lower', 'bb_width', 'bb_position',
+    'atr',
+    'stoch_k', 'stoch_d',
+)
+_TECHNICAL_COLUMN_COUNT = len(TECHNICAL_COLUMNS)
+
+
+@njit(cache=True)
+def technical_indicators(high, low, close):
+    """
+    FeatureEngineerのテクニカル指標を一括計算
+
+    戻り値は列順に並べた (列数, N) の配列。列名は TECHNICAL_COLUMNS を参照
+    """
+    n = close.shape[0]
+    out = np.empty((_TECHNICAL_COLUMN_COUNT, n))
+    row = 0
+
+    # 移動平均
+    for period in SMA_PERIODS:
+        sma = rolling_mean(close, period)
+        out[row] = sma
+        out[row + 1] = close / sma
+        row += 2
+
+    # 指数移動平均・MACD
+    ema_12 = ewm_mean(close, EMA_FAST_SPAN)
+    ema_26 = ewm_mean(close, EMA_SLOW_SPAN)
+    macd = ema_12 - ema_26
+    macd_signal = ewm_mean(macd, MACD_SIGNAL_SPAN)
+    out[row] = ema_12
+    out[row + 1] = ema_26
+    out[row + 2] = macd
+    out[row + 3] = macd_signal
+    out[row + 4] = macd - macd_signal
+    row += 5
+
+    # RSI
+    out[row] = wilder_rsi(close, RSI_PERIOD)
+    row += 1
+
+    # ボリンジャーバンド（標本標準偏差）
+    bb_middle = rolling_mean(close, BB_PERIOD)
+    bb_std_dev = rolling_std(close, BB_PERIOD)
+    bb_upper = bb_middle + bb_std_dev * BB_NUM_STD
+    bb_lower = bb_middle - bb_std_dev * BB_NUM_STD
+    bb_width = bb_upper - bb_lower
+    out[row] = bb_middle
+    out[row + 1] = bb_upper
+    out[row + 2] = bb_lower
+    out[row + 3] = bb_width
+    out[row + 4] = (close - bb_lower) / (bb_width + 1e-10)
+    row += 5
+
+    # ATR
+    out[row] = average_true_range(high, low, close, ATR_PERIOD)
+    row += 1
+
+    # ストキャスティクス
+    lowest_low = rolling_min(low, STOCH_PERIOD)
+    stoch_k = (close - lowest_low) / (rolling_max(high, STOCH_PERIOD) - lowest_low + 1e-10) * 100
+    out[row] = stoch_k
+    out[row + 1] = rolling_mean(stoch_k, STOCH_SMOOTH)
+    return out
+
+
+# ===================================================================
+# ウォームアップ
+# ===================================================================
+
+def _warm_up() -> None:
+    """import時に小さな入力で各カーネルをコンパイル（初回学習・推論時のJITコストを回避）"""
+    sample = np.array([1.0, 2.0, 1.5], dtype=np.float64)
+    rolling_mean(sample, 2)
+    rolling_std(sample, 2)
+    rolling_max(sample, 2)
+    rolling_min(sample, 2)
+    rolling_window_stats(sample, 2)
+    ewm_mean(sample, 2)
+    ewm_state(sample, 2)
+    ewm_step(np.nan, 1.0, 1.0, 0.5)
+    wilder_rsi(sample, 2)
+    wilder_rsi_state(sample, 2)
+    wilder_rsi_step(0.0, 0.0, 1, 0.5, 2)
+    average_true_range(sample, sample, sample, 2)
+    technical_indicators(sample, sample, sample)
+
+
+if NUMBA_AVAILABLE:
+    _warm_up()
@@ -0,0 +1,73 @@
+"""
+評価メトリクスカーネル
+======================
+
+LSTMForexPredictor / XGBoostForexPredictor の evaluate で使う回帰メトリクスを
+Numba で JIT コンパイルしたカーネル
+- MSE・MAE・MAPE・方向精度を実績値と予測値の1回の走査でまとめて計算（中間配列を作らない）
+- 集計はfloat64で行う
+- numba 未インストール環境では同じコードを純Pythonとして実行する
+"""
+
+import numpy as np
+
+from ..core.numba_compat import NUMBA_AVAILABLE, njit
+
+
+# ===================================================================
+# 回帰メトリクス
+# ===================================================================
+
+@njit(cache=True)
+def _regression_metrics(y_true, y_pred, mape_floor):
+    """(MSE, MAE, MAPE[%], 方向精度) を1パスで計算"""
+    n = y_true.shape[0]
+    if n == 0:
+        return np.nan, np.nan, np.nan, np.nan
+    squared = 0.0
+    absolute = 0.0
+    percentage = 0.0
+    same_direction = 0
+    for i in range(n):
+        actual = np.float64(y_true[i])
+        predicted = np.float64(y_pred[i])
+        error = abs(actual - predicted)
+        squared += error * error
+        absolute += error
+        percentage += error / max(abs(actual), mape_floor)
+        if (actual > 0) == (predicted > 0):
+            same_direction += 1
+    return squared / n, absolute / n, 100.0 * percentage / n, same_direction / n
+
+
+def regression_metrics(y_true, y_pred, mape_floor: float = 1e-10):
+    """
+    回帰メトリクスのタプル (MSE, MAE, MAPE[%], 方向精度)
+    
+    Args:
+        y_true: 実績値
+        y_pred: 予測値
+        mape_floor: MAPEの分母 |実績値| の下限（0での除算を避ける）
+    """
+    y_true = np.ravel(y_true)
+    y_pred = np.ravel(y_pred)
+    if y_true.shape[0] != y_pred.shape[0]:
+        raise ValueError(f"Prediction length mismatch: {y_pred.shape[0]} != {y_true.shape[0]}")
+    return _regression_metrics(y_true, y_pred, float(mape_floor))
+
+
+# ===================================================================
+# ウォームアップ
+# ===================================================================
+
+def _warm_up() -> None:
+    """import時に小さな入力でカーネルをコンパイル（初回評価時のJITコストを回避）"""
+    for dtype in (np.float32, np.float64):
+        sample = np.zeros(2, dtype=dtype)
+        regression_metrics(sample, sample)
+    regression_metrics(np.zeros(2, dtype=np.float64), np.zeros(2, dtype=np.float32))
+    regression_metrics(np.zeros(2, dtype=np.float32), np.zeros(2, dtype=np.float64))
+
+
+if NUMBA_AVAILABLE:
+    _warm_up()
@@ -7,10 +7,14 @@ from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 import logging
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from app.ml.lstm_model import LSTMForexPredictor
 from app.ml.xgboost_model import XGBoostForexPredictor
 from app.ml.feature_engineering import FeatureEngineer
+from app.ml import _ensemble_kernels as kernels
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +26,16 @@ class EnsembleForexPredictor:
         self,
         lstm_weight: float = 0.5,
         xgboost_weight: float = 0.5,
-        use_meta_learner: bool = False
+        use_meta_learner: bool = False,
+        n_infer_threads: Optional[int] = None
     ):
         """
         Args:
             lstm_weight: LSTMモデルの重み
             xgboost_weight: XGBoostモデルの重み
             use_meta_learner: メタ学習器を使用するか
+            n_infer_threads: 各モデルの推論スレッド数（省略時はXGBoostのみコア数の半分に制限）
+                TensorFlowのスレッド数はプロセス全体の設定のため、指定した場合のみ変更する
         """
         self.lstm_weight = lstm_weight
         self.xgboost_weight = xgboost_weight
@@ -39,6 +46,13 @@ class EnsembleForexPredictor:
         self.xgboost_model = XGBoostForexPredictor()
         self.feature_engineer = FeatureEngineer()
         
+        # LSTMとXGBoostは並行して推論するため、XGBoostのスレッド数をコアの半分に制限
+        # （TensorFlowの設定はプロセス内の全モデルに影響するため、明示的に指定された場合のみ適用）
+        self.n_infer_threads = n_infer_threads or max(1, (os.cpu_count() or 2) // 2)
+        self.xgboost_model.set_inference_threads(self.n_infer_threads)
+        if n_infer_threads is not None:
+            self.lstm_model.set_inference_threads(n_infer_threads)
+        
         # メタ学習器（必要な場合）
         self.meta_learner = None
         if use_meta_learner:
@@ -47,6 +61,62 @@ class EnsembleForexPredictor:
         
         self.is_trained = False
         
+        # LSTMとXGBoostの推論を並行実行するスレッドプール（両者ともGILを解放して計算する）
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ensemble-predict")
+        
+        # メタ特徴量のバッファ（predictは複数スレッドから呼ばれるためスレッドごとに保持）
+        self._meta_buffers = threading.local()
+        
+    def close(self):
+        """推論用スレッドプールを終了し（実行中の推論の完了は待たない）、XGBoostのコンパイル済みモデルを解放"""
+        self._executor.shutdown(wait=False)
+        self.xgboost_model.close()
+    
+    def _meta_features(self, lstm_pred: np.ndarray, xgb_pred: np.ndarray) -> np.ndarray:
+        """
+        メタ学習器の入力 (n, 2) を作成
+        
+        スレッドごとのバッファを再利用し、呼び出しごとの確保・型変換を避ける
+        
+        Args:
+            lstm_pred: LSTMの予測値
+            xgb_pred: XGBoostの予測値
+        
+        Returns:
+            1列目がLSTM、2列目がXGBoostの予測値の配列（次の呼び出しで上書きされる）
+        """
+        n = len(lstm_pred)
+        buffer = getattr(self._meta_buffers, 'buffer', None)
+        if buffer is None or buffer.shape[0] < n:
+            buffer = np.empty((n, 2), dtype=np.float32)
+            self._meta_buffers.buffer = buffer
+        
+        meta_features = buffer[:n]
+        meta_features[:, 0] = np.ravel(lstm_pred)
+        meta_features[:, 1] = np.ravel(xgb_pred)
+        return meta_features
+        
+    def _run_models(self, lstm_call, xgboost_call) -> Tuple[Any, Any]:
+        """
+        LSTM・XGBoostの推論を実行（両方ある場合は並行して実行）
+        
+        Args:
+            lstm_call: LSTM推論の呼び出し（不要ならNone）
+            xgboost_call: XGBoost推論の呼び出し（不要ならNone）
+        
+        Returns:
+            LSTM・XGBoostの結果のタプル（呼び出しがない側はNone）
+        """
+        if lstm_call is None or xgboost_call is None:
+            return (
+                lstm_call() if lstm_call is not None else None,
+                xgboost_call() if xgboost_call is not None else None
+            )
+        
+        xgboost_future = self._executor.submit(xgboost_call)
+        lstm_result = lstm_call()
+        return lstm_result, xgboost_future.result()
+    
     def prepare_data(
         self,
         df: pd.DataFrame,
@@ -176,7 +246,7 @@ class EnsembleForexPredictor:
             xgb_val_pred = self.xgboost_model.predict(datasets['xgboost']['X_val'])
             
             # メタ特徴量を作成
-            meta_features = np.column_stack([lstm_val_pred, xgb_val_pred])
+            meta_features = self._meta_features(lstm_val_pred, xgb_val_pred)
             
             # メタ学習器を訓練
             self.meta_learner.fit(meta_features, datasets['lstm']['y_val'])
@@ -211,14 +281,14 @@ class EnsembleForexPredictor:
         
         predictions = []
         
-        # LSTM予測
-        if lstm_input is not None:
-            lstm_pred = self.lstm_model.predict(lstm_input)
+        # LSTM・XGBoost予測（並行実行）
+        lstm_pred, xgb_pred = self._run_models(
+            (lambda: self.lstm_model.predict(lstm_input)) if lstm_input is not None else None,
+            (lambda: self.xgboost_model.predict(xgboost_input)) if xgboost_input is not None else None
+        )
+        if lstm_pred is not None:
             predictions.append(('lstm', lstm_pred))
-        
-        # XGBoost予測
-        if xgboost_input is not None:
-            xgb_pred = self.xgboost_model.predict(xgboost_input)
+        if xgb_pred is not None:
             predictions.append(('xgboost', xgb_pred))
         
         if not predictions:
@@ -227,15 +297,16 @@ class EnsembleForexPredictor:
         # アンサンブル
         if ensemble_method == 'weighted_average':
             if len(predictions) == 2:
-                final_pred = (self.lstm_weight * predictions[0][1] + 
-                            self.xgboost_weight * predictions[1][1])
+                final_pred = kernels.weighted_average(
+                    predictions[0][1], predictions[1][1], self.lstm_weight, self.xgboost_weight
+                )
             else:
                 # 単一モデルの場合
                 final_pred = predictions[0][1]
                 
         elif ensemble_method == 'meta_learner' and self.meta_learner is not None:
             if len(predictions) == 2:
-                meta_features = np.column_stack([predictions[0][1], predictions[1][1]])
+                meta_features = self._meta_features(predictions[0][1], predictions[1][1])
                 final_pred = self.meta_learner.predict(meta_features)
             else:
                 final_pred = predictions[0][1]
@@ -272,32 +343,36 @@ class EnsembleForexPredictor:
         lower_bounds = []
         upper_bounds = []
         
-        # LSTM予測（信頼区間付き）
-        if lstm_input is not None:
-            lstm_pred, lstm_lower, lstm_upper = self.lstm_model.predict_with_confidence(
-                lstm_input, n_simulations
-            )
+        # LSTM・XGBoost予測（信頼区間付き、並行実行）
+        lstm_result, xgb_result = self._run_models(
+            (lambda: self.lstm_model.predict_with_confidence(
+                lstm_input, n_simulations, confidence_level
+            )) if lstm_input is not None else None,
+            (lambda: self.xgboost_model.predict_with_confidence(
+                xgboost_input, confidence_level
+            )) if xgboost_input is not None else None
+        )
+        
+        if lstm_result is not None:
+            lstm_pred, lstm_lower, lstm_upper = lstm_result
             predictions_list.append(lstm_pred)
             lower_bounds.append(lstm_lower)
             upper_bounds.append(lstm_upper)
         
-        # XGBoost予測（信頼区間付き）
-        if xgboost_input is not None:
-            xgb_pred, xgb_lower, xgb_upper = self.xgboost_model.predict_with_confidence(
-                xgboost_input, confidence_level
-            )
+        if xgb_result is not None:
+            xgb_pred, xgb_lower, xgb_upper = xgb_result
             predictions_list.append(xgb_pred)
             lower_bounds.append(xgb_lower)
             upper_bounds.append(xgb_upper)
         
         # アンサンブル
         if len(predictions_list) == 2:
-            final_pred = (self.lstm_weight * predictions_list[0] + 
-                        self.xgboost_weight * predictions_list[1])
-            final_lower = (self.lstm_weight * lower_bounds[0] + 
-                         self.xgboost_weight * lower_bounds[1])
-            final_upper = (self.lstm_weight * upper_bounds[0] + 
-                         self.xgboost_weight * upper_bounds[1])
+            final_pred, final_lower, final_upper = kernels.weighted_average_bounds(
+                predictions_list[0], predictions_list[1],
+                lower_bounds[0], lower_bounds[1],
+                upper_bounds[0], upper_bounds[1],
+                self.lstm_weight, self.xgboost_weight
+            )
         else:
             final_pred = predictions_list[0]
             final_lower = lower_bounds[0]
@@ -381,10 +456,20 @@ class EnsembleForexPredictor:
         with open(f"{filepath_prefix}_ensemble_config.json", 'w') as f:
             json.dump(ensemble_config, f)
         
-        # メタ学習器を保存（必要な場合）
+        # メタ学習器を保存（必要な場合、線形回帰の係数のみをNumPy形式で保存）
         if self.meta_learner is not None:
-            import joblib
-            joblib.dump(self.meta_learner, f"{filepath_prefix}_meta_learner.pkl")
+            np.savez(
+                f"{filepath_prefix}_meta_learner.npz",
+                coef=self.meta_learner.coef_,
+                intercept=np.asarray(self.meta_learner.intercept_)
+            )
+        
+        # シーケンス正規化の平均・標準偏差を保存
+        feature_means = getattr(self.feature_engineer, 'feature_means', None)
+        feature_stds = getattr(self.feature_engineer, 'feature_stds', None)
+        if feature_means is not None and feature_stds is not None:
+            np.save(f"{filepath_prefix}_feature_means.npy", feature_means)
+            np.save(f"{filepath_prefix}_feature_stds.npy", feature_stds)
         
         logger.info(f"Models saved with prefix: {filepath_prefix}")
     
@@ -407,10 +492,27 @@ class EnsembleForexPredictor:
         self.xgboost_weight = ensemble_config['xgboost_weight']
         self.use_meta_learner = ensemble_config['use_meta_learner']
         
-        # メタ学習器を読み込み（必要な場合）
+        # メタ学習器を読み込み（必要な場合、NumPy形式がなければ旧形式のpickle）
         if self.use_meta_learner:
-            import joblib
-            self.meta_learner = joblib.load(f"{filepath_prefix}_meta_learner.pkl")
+            meta_path = f"{filepath_prefix}_meta_learner.npz"
+            if os.path.exists(meta_path):
+                from sklearn.linear_model import LinearRegression
+                with np.load(meta_path) as meta:
+                    self.meta_learner = LinearRegression()
+                    self.meta_learner.coef_ = meta['coef']
+                    intercept = meta['intercept']
+                    self.meta_learner.intercept_ = float(intercept) if intercept.ndim == 0 else intercept
+                    self.meta_learner.n_features_in_ = meta['coef'].shape[-1]
+            else:
+                import joblib
+                self.meta_learner = joblib.load(f"{filepath_prefix}_meta_learner.pkl")
+        
+        # シーケンス正規化の平均・標準偏差を読み込み
+        means_path = f"{filepath_prefix}_feature_means.npy"
+        stds_path = f"{filepath_prefix}_feature_stds.npy"
+        if os.path.exists(means_path) and os.path.exists(stds_path):
+            self.feature_engineer.feature_means = np.load(means_path)
+            self.feature_engineer.feature_stds = np.load(stds_path)
         
         self.is_trained = True
         logger.info(f"Models loaded from prefix: {filepath_prefix}")
\ No newline at end of file
@@ -7,14 +7,44 @@ from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
+from . import _feature_kernels as kernels
+from .online_features import OnlineFeatureState
+
 logger = logging.getLogger(__name__)
 
+# 生成した特徴量を保持するdtype（計算はfloat64で行い、保持・受け渡しは単精度にする）
+FEATURE_DTYPE = np.float32
+
+
+def build_sequences(values: np.ndarray, sequence_length: int) -> np.ndarray:
+    """
+    2次元配列 (行数, 特徴量数) から長さsequence_lengthの全ウィンドウを作成
+    
+    データを複製しない読み取り専用のビュー (行数 - sequence_length + 1, sequence_length, 特徴量数)
+    を返す。ウィンドウをPythonのループで1つずつコピーして作る必要はない
+    
+    Args:
+        values: 時系列順の2次元配列
+        sequence_length: シーケンスの長さ
+    
+    Returns:
+        シーケンスのビュー
+    """
+    return np.lib.stride_tricks.sliding_window_view(
+        values, (sequence_length, values.shape[1])
+    )[:, 0]
+
 
 class FeatureEngineer:
     """為替予測のための特徴量エンジニアリング"""
     
+    # ラグ特徴量のラグ・ローリング統計の窓
+    LAG_PERIODS = (1, 2, 3, 5, 10, 20)
+    ROLLING_WINDOWS = (5, 10, 20, 50)
+    
     def __init__(self):
         self.feature_names = []
+        self._online = None
         
     def create_features(
         self,
@@ -39,179 +69,270 @@ class FeatureEngineer:
         Returns:
             特徴量が追加されたDataFrame
         """
-        df = df.copy()
+        # 特徴量は列名→配列の辞書に蓄積し、最後にDataFrameへ一括で結合する
+        # （入力のDataFrameは変更しないため複製しない。列ごとの代入によるブロックの断片化も避ける）
+        features: Dict[str, np.ndarray] = {}
         
         # 基本的な価格変動特徴量
-        df = self._add_price_features(df)
+        self._add_price_features(features, df)
         
         # テクニカル指標
         if include_technical:
-            df = self._add_technical_indicators(df)
+            self._add_technical_indicators(features, df)
         
         # ラグ特徴量
         if include_lag:
-            df = self._add_lag_features(df, target_col)
+            self._add_lag_features(features, df, target_col)
         
         # ローリング統計
         if include_rolling:
-            df = self._add_rolling_features(df, target_col)
+            self._add_rolling_features(features, df, target_col)
         
         # 時系列特徴量
         if include_time:
-            df = self._add_time_features(df)
+            self._add_time_features(features, df)
+        
+        df = self._join_features(df, features)
         
         # 特徴量名を保存
         self.feature_names = [col for col in df.columns if col not in ['date', target_col]]
         
         return df
     
-    def _add_price_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _available_features(self, df: pd.DataFrame) -> List[str]:
+        """feature_namesのうちdfに存在する列（順序はfeature_namesのまま）"""
+        columns = set(df.columns)
+        return [col for col in self.feature_names if col in columns]
+    
+    @staticmethod
+    def _join_features(df: pd.DataFrame, features: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """
+        特徴量配列を元のDataFrameの右側に一度に結合した新しいDataFrameを返す
+        
+        元の列のデータは複製せずに共有し、既存の同名列は結果側でのみその位置で置き換える
+        """
+        features = {
+            column: values.astype(FEATURE_DTYPE, copy=False) if values.dtype == np.float64 else values
+            for column, values in features.items()
+        }
+        columns = set(df.columns)
+        replaced = {column: features.pop(column) for column in [c for c in features if c in columns]}
+        if features:
+            new_features = pd.DataFrame(features, index=df.index, copy=False)
+            result = pd.concat([df, new_features], axis=1, copy=False)
+        else:
+            result = df.copy(deep=False)
+        for column, values in replaced.items():
+            result[column] = values
+        return result
+    
+    @staticmethod
+    def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+        """配列をperiods行後ろへずらす（pandasのshiftと同様に先頭はNaN）"""
+        shifted = np.full(values.shape[0], np.nan)
+        if periods < values.shape[0]:
+            shifted[periods:] = values[:values.shape[0] - periods]
+        return shifted
+    
+    def _add_price_features(self, features: Dict[str, np.ndarray], df: pd.DataFrame) -> None:
         """価格変動に関する特徴量を追加"""
+        open_ = kernels.as_float_array(df['open_rate'])
+        high = kernels.as_float_array(df['high_rate'])
+        low = kernels.as_float_array(df['low_rate'])
+        close = kernels.as_float_array(df['close_rate'])
         
-        # 日次リターン
-        df['returns'] = df['close_rate'].pct_change()
+        # 日次リターン（欠損値の前方補完を含むpct_changeの挙動を維持）
+        features['returns'] = df['close_rate'].pct_change().to_numpy(dtype=np.float64)
         
         # 対数リターン
-        df['log_returns'] = np.log(df['close_rate'] / df['close_rate'].shift(1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features['log_returns'] = np.log(close / self._shift(close, 1))
         
         # 価格レンジ
-        df['high_low_range'] = df['high_rate'] - df['low_rate']
-        df['high_low_pct'] = df['high_low_range'] / df['close_rate']
+        high_low_range = high - low
+        features['high_low_range'] = high_low_range
+        features['high_low_pct'] = high_low_range / close
         
         # ボディサイズ（実体）
-        df['body_size'] = abs(df['close_rate'] - df['open_rate'])
-        df['body_pct'] = df['body_size'] / df['close_rate']
+        body_size = np.abs(close - open_)
+        features['body_size'] = body_size
+        features['body_pct'] = body_size / close
         
-        # 上ヒゲ・下ヒゲ
-        df['upper_shadow'] = df['high_rate'] - df[['open_rate', 'close_rate']].max(axis=1)
-        df['lower_shadow'] = df[['open_rate', 'close_rate']].min(axis=1) - df['low_rate']
+        # 上ヒゲ・下ヒゲ（欠損値を除いた始値・終値の最大・最小）
+        features['upper_shadow'] = high - np.fmax(open_, close)
+        features['lower_shadow'] = np.fmin(open_, close) - low
         
         # 価格位置（日中のどこで終値をつけたか）
-        df['price_position'] = (df['close_rate'] - df['low_rate']) / (df['high_rate'] - df['low_rate'] + 1e-10)
-        
-        return df
+        features['price_position'] = (close - low) / (high_low_range + 1e-10)
     
-    def _add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """テクニカル指標を追加"""
-        
-        # 移動平均
-        for period in [5, 10, 20, 50]:
-            df[f'sma_{period}'] = df['close_rate'].rolling(window=period).mean()
-            df[f'sma_{period}_ratio'] = df['close_rate'] / df[f'sma_{period}']
-        
-        # 指数移動平均
-        for period in [12, 26]:
-            df[f'ema_{period}'] = df['close_rate'].ewm(span=period, adjust=False).mean()
-        
-        # MACD
-        df['macd'] = df['ema_12'] - df['ema_26']
-        df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
-        
-        # RSI
-        df['rsi'] = self._calculate_rsi(df['close_rate'], period=14)
-        
-        # ボリンジャーバンド
-        bb_period = 20
-        bb_std = 2
-        df['bb_middle'] = df['close_rate'].rolling(window=bb_period).mean()
-        bb_std_dev = df['close_rate'].rolling(window=bb_period).std()
-        df['bb_upper'] = df['bb_middle'] + (bb_std_dev * bb_std)
-        df['bb_lower'] = df['bb_middle'] - (bb_std_dev * bb_std)
-        df['bb_width'] = df['bb_upper'] - df['bb_lower']
-        df['bb_position'] = (df['close_rate'] - df['bb_lower']) / (df['bb_width'] + 1e-10)
-        
-        # ATR (Average True Range)
-        df['atr'] = self._calculate_atr(df, period=14)
-        
-        # ストキャスティクス
-        stoch_period = 14
-        df['stoch_k'] = ((df['close_rate'] - df['low_rate'].rolling(window=stoch_period).min()) / 
-                        (df['high_rate'].rolling(window=stoch_period).max() - 
-                         df['low_rate'].rolling(window=stoch_period).min() + 1e-10)) * 100
-        df['stoch_d'] = df['stoch_k'].rolling(window=3).mean()
-        
-        return df
+    def _add_technical_indicators(self, features: Dict[str, np.ndarray], df: pd.DataFrame) -> None:
+        """テクニカル指標を追加（移動平均・MACD・RSI・ボリンジャーバンド・ATR・ストキャスティクス）"""
+        indicators = kernels.technical_indicators(
+            kernels.as_float_array(df['high_rate']),
+            kernels.as_float_array(df['low_rate']),
+            kernels.as_float_array(df['close_rate']),
+        )
+        features.update(zip(kernels.TECHNICAL_COLUMNS, indicators))
     
     def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """RSIを計算"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / (loss + 1e-10)
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        """RSI（Wilderの平滑化）を計算"""
+        return pd.Series(kernels.wilder_rsi(kernels.as_float_array(prices), period), index=prices.index)
     
     def _calculate_atr(self, df: pd.DataFrame, period: int = 14) -> pd.Series:
         """ATRを計算"""
-        high_low = df['high_rate'] - df['low_rate']
-        high_close = abs(df['high_rate'] - df['close_rate'].shift())
-        low_close = abs(df['low_rate'] - df['close_rate'].shift())
-        
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        atr = true_range.rolling(window=period).mean()
-        
-        return atr
+        atr = kernels.average_true_range(
+            kernels.as_float_array(df['high_rate']),
+            kernels.as_float_array(df['low_rate']),
+            kernels.as_float_array(df['close_rate']),
+            period,
+        )
+        return pd.Series(atr, index=df.index)
     
-    def _add_lag_features(self, df: pd.DataFrame, target_col: str, lags: List[int] = None) -> pd.DataFrame:
+    def _add_lag_features(
+        self,
+        features: Dict[str, np.ndarray],
+        df: pd.DataFrame,
+        target_col: str,
+        lags: List[int] = None
+    ) -> None:
         """ラグ特徴量を追加"""
         if lags is None:
-            lags = [1, 2, 3, 5, 10, 20]
+            lags = self.LAG_PERIODS
         
+        target = kernels.as_float_array(df[target_col])
+        returns = features['returns']
         for lag in lags:
-            df[f'{target_col}_lag_{lag}'] = df[target_col].shift(lag)
-            df[f'returns_lag_{lag}'] = df['returns'].shift(lag)
-        
-        return df
+            features[f'{target_col}_lag_{lag}'] = self._shift(target, lag)
+            features[f'returns_lag_{lag}'] = self._shift(returns, lag)
     
-    def _add_rolling_features(self, df: pd.DataFrame, target_col: str) -> pd.DataFrame:
+    def _add_rolling_features(self, features: Dict[str, np.ndarray], df: pd.DataFrame, target_col: str) -> None:
         """ローリング統計量を追加"""
         
-        windows = [5, 10, 20, 50]
+        target = kernels.as_float_array(df[target_col])
         
-        for window in windows:
-            # ローリング平均
-            df[f'rolling_mean_{window}'] = df[target_col].rolling(window=window).mean()
-            
-            # ローリング標準偏差（ボラティリティ）
-            df[f'rolling_std_{window}'] = df[target_col].rolling(window=window).std()
-            
-            # ローリング最大値・最小値
-            df[f'rolling_max_{window}'] = df[target_col].rolling(window=window).max()
-            df[f'rolling_min_{window}'] = df[target_col].rolling(window=window).min()
+        for window in self.ROLLING_WINDOWS:
+            # ローリング平均・標準偏差（ボラティリティ）・最大値・最小値（1パスでまとめて計算）
+            rolling_mean, rolling_std, rolling_max, rolling_min = kernels.rolling_window_stats(target, window)
+            features[f'rolling_mean_{window}'] = rolling_mean
+            features[f'rolling_std_{window}'] = rolling_std
+            features[f'rolling_max_{window}'] = rolling_max
+            features[f'rolling_min_{window}'] = rolling_min
             
             # 現在値の位置（最大値・最小値に対する）
-            df[f'price_to_max_{window}'] = df[target_col] / df[f'rolling_max_{window}']
-            df[f'price_to_min_{window}'] = df[target_col] / df[f'rolling_min_{window}']
-        
-        return df
+            features[f'price_to_max_{window}'] = target / rolling_max
+            features[f'price_to_min_{window}'] = target / rolling_min
     
-    def _add_time_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _add_time_features(self, features: Dict[str, np.ndarray], df: pd.DataFrame) -> None:
         """時系列特徴量を追加"""
         
         if 'date' in df.columns:
-            # dateがdatetime型でない場合は変換
-            if not pd.api.types.is_datetime64_any_dtype(df['date']):
-                df['date'] = pd.to_datetime(df['date'])
+            # dateがdatetime型でない場合は変換（結果のDataFrameのdate列も変換後の値にする）
+            dates = df['date']
+            if not pd.api.types.is_datetime64_any_dtype(dates):
+                dates = pd.to_datetime(dates)
+                features['date'] = dates
+            if dates.isna().any():
+                # 欠損日付を含む場合はpandasのアクセサで計算（欠損はNaN）
+                self._add_time_features_from_accessors(features, dates.dt)
+                return
+            if dates.dt.tz is not None:
+                dates = dates.dt.tz_localize(None)
+            
+            # 日・月単位の通し番号から整数演算で一括計算（1970-01-01は木曜日）
+            values = dates.to_numpy()
+            days = values.astype('datetime64[D]').view(np.int64)
+            months = values.astype('datetime64[M]')
+            month_start = months.astype('datetime64[D]').view(np.int64)
+            next_month_start = (months + 1).astype('datetime64[D]').view(np.int64)
+            month = (months.view(np.int64) % 12 + 1).astype(np.int8)
+            is_month_start = days == month_start
+            is_month_end = days == next_month_start - 1
             
             # 曜日（0=月曜日, 4=金曜日）
-            df['day_of_week'] = df['date'].dt.dayofweek
+            features['day_of_week'] = ((days + 3) % 7).astype(np.int8)
             
             # 月
-            df['month'] = df['date'].dt.month
+            features['month'] = month
             
             # 四半期
-            df['quarter'] = df['date'].dt.quarter
+            features['quarter'] = (month + 2) // 3
             
             # 月初・月末フラグ
-            df['is_month_start'] = df['date'].dt.is_month_start.astype(int)
-            df['is_month_end'] = df['date'].dt.is_month_end.astype(int)
+            features['is_month_start'] = is_month_start.astype(np.int8)
+            features['is_month_end'] = is_month_end.astype(np.int8)
             
             # 四半期初・四半期末フラグ
-            df['is_quarter_start'] = df['date'].dt.is_quarter_start.astype(int)
-            df['is_quarter_end'] = df['date'].dt.is_quarter_end.astype(int)
+            features['is_quarter_start'] = (is_month_start & (month % 3 == 1)).astype(np.int8)
+            features['is_quarter_end'] = (is_month_end & (month % 3 == 0)).astype(np.int8)
+    
+    @staticmethod
+    def _add_time_features_from_accessors(features: Dict[str, np.ndarray], dates) -> None:
+        """pandasの.dtアクセサによる時系列特徴量"""
+        features['day_of_week'] = dates.dayofweek.to_numpy()
+        features['month'] = dates.month.to_numpy()
+        features['quarter'] = dates.quarter.to_numpy()
+        features['is_month_start'] = dates.is_month_start.to_numpy().astype(np.int8)
+        features['is_month_end'] = dates.is_month_end.to_numpy().astype(np.int8)
+        features['is_quarter_start'] = dates.is_quarter_start.to_numpy().astype(np.int8)
+        features['is_quarter_end'] = dates.is_quarter_end.to_numpy().astype(np.int8)
+    
+    def start_incremental(
+        self,
+        df: pd.DataFrame,
+        target_col: str = 'close_rate',
+        include_technical: bool = True,
+        include_lag: bool = True,
+        include_rolling: bool = True,
+        include_time: bool = True,
+        max_rows: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        オンライン推論用に特徴量を生成し、以降の足を差分計算するための状態を保持
         
-        return df
+        Args:
+            df: 初期化に使うOHLCデータのDataFrame
+            target_col: ターゲット列名
+            include_technical: テクニカル指標を含むか
+            include_lag: ラグ特徴量を含むか
+            include_rolling: ローリング統計を含むか
+            include_time: 時系列特徴量を含むか
+            max_rows: 保持する最大行数（省略時は全行を保持）
+        
+        Returns:
+            特徴量が追加されたDataFrame（create_featuresと同じ）
+        """
+        features = self.create_features(
+            df, target_col, include_technical, include_lag, include_rolling, include_time
+        )
+        self._online = OnlineFeatureState(
+            features,
+            list(df.columns),
+            target_col=target_col,
+            include_technical=include_technical,
+            include_lag=include_lag,
+            include_rolling=include_rolling,
+            include_time=include_time,
+            lags=self.LAG_PERIODS,
+            windows=self.ROLLING_WINDOWS,
+            max_rows=max_rows
+        )
+        return features
+    
+    def create_features_incremental(self, new_row: Dict[str, Any]) -> pd.DataFrame:
+        """
+        新しい足を1本追加し、その足の特徴量だけを計算
+        
+        Args:
+            new_row: 追加する足（start_incrementalに渡したDataFrameと同じ列）
+        
+        Returns:
+            保持している全行の特徴量DataFrame（create_featuresの結果と同じ列構成）
+        """
+        if self._online is None:
+            raise ValueError("Incremental features not started")
+        
+        self._online.update(new_row)
+        return self._online.frame()
     
     def prepare_sequences(
         self,
@@ -232,29 +353,36 @@ class FeatureEngineer:
         Returns:
             X, y のタプル
         """
-        # 特徴量列を選択（NaNを含む列を除外）
-        feature_cols = [col for col in self.feature_names if col in df.columns]
+        # 特徴量列を選択（NaNを含む行を除外）
+        feature_cols = self._available_features(df)
         df_features = df[feature_cols].dropna()
         
-        # スケーリングのための値を保存
-        self.feature_means = df_features.mean()
-        self.feature_stds = df_features.std()
+        # 単精度の連続配列に一度だけ変換し、以降の正規化はこの配列上でインプレースに行う
+        normalized = df_features.to_numpy(dtype=np.float32, copy=True)
+        
+        # スケーリングのための値を保存（推論時に再利用、集計はfloat64で行う）
+        self.feature_means = normalized.mean(axis=0, dtype=np.float64).astype(np.float32)
+        self.feature_stds = normalized.std(axis=0, ddof=1, dtype=np.float64).astype(np.float32)
         
         # 正規化
-        df_normalized = (df_features - self.feature_means) / (self.feature_stds + 1e-10)
+        np.subtract(normalized, self.feature_means, out=normalized)
+        np.divide(normalized, self.feature_stds + np.float32(1e-10), out=normalized)
         
-        # シーケンスを作成
-        X, y = [], []
+        n_samples = len(normalized) - sequence_length - prediction_horizon + 1
+        if n_samples <= 0:
+            return np.empty((0, sequence_length, len(feature_cols)), dtype=np.float32), np.empty(0)
         
-        for i in range(sequence_length, len(df_normalized) - prediction_horizon + 1):
-            X.append(df_normalized.iloc[i-sequence_length:i].values)
-            
-            # ターゲットは元のスケールの価格変化率
-            current_price = df[target_col].iloc[i-1]
-            future_price = df[target_col].iloc[i-1+prediction_horizon]
-            y.append((future_price - current_price) / current_price)
+        # シーケンスを作成（正規化済み配列のスライディングウィンドウのビュー、複製しない）
+        X = build_sequences(normalized, sequence_length)[:n_samples]
+        
+        # ターゲットは元のスケールの価格変化率（各シーケンス末尾の行を基準とする）
+        valid_rows = df[feature_cols].notna().all(axis=1).to_numpy()
+        prices = df[target_col].to_numpy(dtype=np.float64)[valid_rows]
+        current_price = prices[sequence_length - 1:sequence_length - 1 + n_samples]
+        future_price = prices[sequence_length - 1 + prediction_horizon:sequence_length - 1 + prediction_horizon + n_samples]
+        y = (future_price - current_price) / current_price
         
-        return np.array(X), np.array(y)
+        return X, y
     
     def prepare_tabular_data(
         self,
@@ -274,16 +402,18 @@ class FeatureEngineer:
             X, y のタプル
         """
         # 特徴量列を選択
-        feature_cols = [col for col in self.feature_names if col in df.columns]
-        X = df[feature_cols].copy()
+        feature_cols = self._available_features(df)
+        X_values = df[feature_cols].to_numpy(dtype=FEATURE_DTYPE)
         
         # ターゲットを作成（未来の価格変化率）
         y = df[target_col].shift(-prediction_horizon).pct_change(prediction_horizon)
+        y_values = y.to_numpy(dtype=np.float64)
         
-        # NaNを削除
-        valid_idx = ~(X.isna().any(axis=1) | y.isna())
-        X = X[valid_idx]
-        y = y[valid_idx]
+        # NaNを削除（連続配列上の1回の走査で有効行を判定）
+        valid = ~(np.isnan(X_values).any(axis=1) | np.isnan(y_values))
+        index = df.index[valid]
+        X = pd.DataFrame(X_values[valid], columns=feature_cols, index=index)
+        y = pd.Series(y_values[valid], index=index, name=y.name)
         
         return X, y
     
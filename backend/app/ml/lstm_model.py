@@ -3,17 +3,40 @@ LSTM（Long Short-Term Memory）モデル - 時系列予測用ディープラー
 """
 import numpy as np
 import pandas as pd
-from typing import Tuple, Dict, Any, Optional
+from typing import Tuple, Dict, Any, List, Optional
 import tensorflow as tf
 from tensorflow import keras
-from tensorflow.keras import layers, models, callbacks
+from tensorflow.keras import layers, models, callbacks, mixed_precision
 from tensorflow.keras.optimizers import Adam
-from sklearn.preprocessing import StandardScaler
 import logging
+import contextlib
 import json
+import os
+
+from ._metric_kernels import regression_metrics
+from .feature_engineering import build_sequences
+
+# TensorRTはオプション依存（GPU版TensorFlowでのコンパイル済み推論に使用）
+try:
+    from tensorflow.python.compiler.tensorrt import trt_convert as trt
+    TENSORRT_AVAILABLE = True
+except ImportError:
+    TENSORRT_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# 保存・読み込み時にTensorRTエンジンを使用するか
+LSTM_TENSORRT = os.getenv("LSTM_TENSORRT", "false").lower() == "true"
+
+# 重みをfloat16で保存・読み込みするか（推論用。オプティマイザの状態は保存しない）
+LSTM_FP16_CHECKPOINT = os.getenv("LSTM_FP16_CHECKPOINT", "false").lower() == "true"
+
+# モンテカルロドロップアウトで1回の推論にまとめる最大行数
+MC_DROPOUT_MAX_BATCH = 4096
+
+# 通常の推論で1回の順伝播にまとめる最大行数
+PREDICT_MAX_BATCH = 4096
+
 
 class LSTMForexPredictor:
     """為替予測用LSTMモデル"""
@@ -24,7 +47,9 @@ class LSTMForexPredictor:
         n_features: int = None,
         lstm_units: List[int] = None,
         dropout_rate: float = 0.2,
-        learning_rate: float = 0.001
+        learning_rate: float = 0.001,
+        use_mixed_precision: bool = True,
+        use_xla: bool = True
     ):
         """
         Args:
@@ -33,16 +58,28 @@ class LSTMForexPredictor:
             lstm_units: 各LSTM層のユニット数
             dropout_rate: ドロップアウト率
             learning_rate: 学習率
+            use_mixed_precision: GPU利用時にfloat16混合精度で演算するか
+                （GPUがない環境では常にfloat32）
+            use_xla: XLAで学習・推論ステップをコンパイルするか
+                （cuDNNカーネルを使うGPU環境では無効）
         """
         self.sequence_length = sequence_length
         self.n_features = n_features
         self.lstm_units = lstm_units or [128, 64, 32]
         self.dropout_rate = dropout_rate
         self.learning_rate = learning_rate
+        self.use_mixed_precision = use_mixed_precision
+        self.use_xla = use_xla
         self.model = None
-        self.scaler = StandardScaler()
+        self._predict_fn = None
+        self._mc_forward = None
+        self._serving_model = None
         self.history = None
         
+        # 複数GPUがある場合は変数を各GPUにミラーし、学習・MCドロップアウトを分散する
+        gpus = tf.config.list_physical_devices('GPU')
+        self._strategy = tf.distribute.MirroredStrategy() if len(gpus) > 1 else None
+        
     def build_model(self, input_shape: Tuple[int, int]) -> keras.Model:
         """
         LSTMモデルを構築
@@ -53,44 +90,112 @@ class LSTMForexPredictor:
         Returns:
             構築されたモデル
         """
+        with self._strategy_scope():
+            return self._build_model(input_shape)
+    
+    def _strategy_scope(self):
+        """分散戦略のスコープ（単一デバイスの場合は何もしない）"""
+        return self._strategy.scope() if self._strategy is not None else contextlib.nullcontext()
+    
+    def _build_model(self, input_shape: Tuple[int, int]) -> keras.Model:
+        """LSTMモデルの層を構築してコンパイル"""
+        # 混合精度はグローバルポリシーを変更せず、このモデルの層にのみ指定する
+        mixed = self._mixed_precision_enabled()
+        dtype = mixed_precision.Policy('mixed_float16') if mixed else None
+        
+        if tf.config.list_physical_devices('GPU'):
+            logger.info("Building LSTM layers with the fused cuDNN kernel")
+        else:
+            logger.info("GPU not available, LSTM layers use the generic kernel")
+        
         model = models.Sequential()
         
         # 最初のLSTM層
-        model.add(layers.LSTM(
+        model.add(self._lstm_layer(
             self.lstm_units[0],
             return_sequences=True if len(self.lstm_units) > 1 else False,
+            dtype=dtype,
             input_shape=input_shape
         ))
-        model.add(layers.Dropout(self.dropout_rate))
+        model.add(layers.Dropout(self.dropout_rate, dtype=dtype))
         
         # 中間LSTM層
         for i in range(1, len(self.lstm_units) - 1):
-            model.add(layers.LSTM(self.lstm_units[i], return_sequences=True))
-            model.add(layers.Dropout(self.dropout_rate))
+            model.add(self._lstm_layer(self.lstm_units[i], return_sequences=True, dtype=dtype))
+            model.add(layers.Dropout(self.dropout_rate, dtype=dtype))
         
         # 最後のLSTM層
         if len(self.lstm_units) > 1:
-            model.add(layers.LSTM(self.lstm_units[-1], return_sequences=False))
-            model.add(layers.Dropout(self.dropout_rate))
+            model.add(self._lstm_layer(self.lstm_units[-1], return_sequences=False, dtype=dtype))
+            model.add(layers.Dropout(self.dropout_rate, dtype=dtype))
         
         # 全結合層
-        model.add(layers.Dense(64, activation='relu'))
-        model.add(layers.Dropout(self.dropout_rate))
-        model.add(layers.Dense(32, activation='relu'))
+        model.add(layers.Dense(64, activation='relu', dtype=dtype))
+        model.add(layers.Dropout(self.dropout_rate, dtype=dtype))
+        model.add(layers.Dense(32, activation='relu', dtype=dtype))
         
-        # 出力層（回帰問題なので活性化関数なし）
-        model.add(layers.Dense(1))
+        # 出力層（回帰問題なので活性化関数なし。損失の数値安定性のため常にfloat32）
+        model.add(layers.Dense(1, dtype='float32'))
         
         # モデルをコンパイル
+        self._compile_model(model, mixed)
+        
+        self.model = model
+        self._predict_fn = None
+        self._mc_forward = None
+        self._serving_model = None
+        return model
+    
+    def _compile_model(self, model: keras.Model, mixed: bool):
+        """モデルをコンパイル（混合精度では動的ロススケーリングでfloat16の勾配のアンダーフローを防ぐ）"""
         optimizer = Adam(learning_rate=self.learning_rate)
+        if mixed:
+            optimizer = mixed_precision.LossScaleOptimizer(optimizer)
         model.compile(
             optimizer=optimizer,
             loss='mse',
-            metrics=['mae', 'mape']
+            metrics=['mae', 'mape'],
+            jit_compile=self._xla_enabled()
         )
+    
+    @staticmethod
+    def _lstm_layer(units: int, return_sequences: bool, dtype=None, **kwargs) -> layers.LSTM:
+        """
+        cuDNNの融合カーネルの条件を満たすLSTM層を生成
         
-        self.model = model
-        return model
+        活性化関数・再帰ドロップアウトなどが条件から外れると汎用の（大幅に遅い）
+        実装になるため、条件となる引数を明示的に固定する。ドロップアウトは
+        LSTM層の外のDropout層で行う
+        """
+        return layers.LSTM(
+            units,
+            activation='tanh',
+            recurrent_activation='sigmoid',
+            recurrent_dropout=0.0,
+            unroll=False,
+            use_bias=True,
+            return_sequences=return_sequences,
+            dtype=dtype,
+            **kwargs
+        )
+    
+    def _mixed_precision_enabled(self) -> bool:
+        """混合精度を使うか（CPUではfloat16演算が遅いためGPUがある場合のみ）"""
+        if not self.use_mixed_precision:
+            return False
+        if not tf.config.list_physical_devices('GPU'):
+            logger.info("GPU not available, building LSTM model in float32")
+            return False
+        return True
+    
+    def _xla_enabled(self) -> bool:
+        """
+        XLAコンパイルを使うか
+        
+        GPUではcuDNNの融合LSTMカーネルがXLAの対象外のため使わない。CPUでは
+        LSTMの各ステップの小さな演算がXLAで融合される
+        """
+        return self.use_xla and not tf.config.list_physical_devices('GPU')
     
     def train(
         self,
@@ -137,20 +242,54 @@ class LSTMForexPredictor:
             )
         ]
         
-        # モデルの訓練
-        validation_data = (X_val, y_val) if X_val is not None else None
+        # モデルの訓練（次のバッチを学習と並行して用意するtf.dataパイプライン）
+        train_ds = self._make_dataset(X_train, y_train, batch_size, shuffle=True)
+        validation_data = (
+            self._make_dataset(X_val, y_val, batch_size, shuffle=False) if X_val is not None else None
+        )
         
         self.history = self.model.fit(
-            X_train, y_train,
+            train_ds,
             validation_data=validation_data,
             epochs=epochs,
-            batch_size=batch_size,
             callbacks=callbacks_list,
             verbose=verbose
         )
         
         return self.history.history
     
+    @staticmethod
+    def _make_dataset(
+        X: np.ndarray,
+        y: np.ndarray,
+        batch_size: int,
+        shuffle: bool
+    ) -> tf.data.Dataset:
+        """
+        学習用のtf.dataデータセットを作成
+        
+        fitにNumPy配列を渡した場合と同じく訓練データはエポックごとにシャッフルし、
+        端数のバッチも残す。バッチの作成は学習と並行してprefetchする
+        """
+        dataset = tf.data.Dataset.from_tensor_slices(
+            (np.asarray(X, dtype=np.float32), np.asarray(y, dtype=np.float32))
+        )
+        if shuffle:
+            dataset = dataset.shuffle(len(X), reshuffle_each_iteration=True)
+            options = tf.data.Options()
+            options.deterministic = False
+            dataset = dataset.with_options(options)
+        return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+    
+    @staticmethod
+    def build_sequences(values: np.ndarray, sequence_length: int) -> np.ndarray:
+        """
+        2次元配列 (行数, 特徴量数) からモデル入力のシーケンスを作成
+        
+        複製しない読み取り専用のビューを返す（feature_engineering.build_sequencesと同じ）
+        """
+        return build_sequences(np.asarray(values, dtype=np.float32), sequence_length)
+    
     def predict(self, X: np.ndarray) -> np.ndarray:
         """
         予測を実行
@@ -164,8 +303,26 @@ class LSTMForexPredictor:
         if self.model is None:
             raise ValueError("Model not trained yet")
         
-        predictions = self.model.predict(X, verbose=0)
-        return predictions.flatten()
+        # model.predictは呼び出しごとにデータアダプタと推論関数を構築するため、
+        # 小さな入力を繰り返し推論する用途ではグラフ化した順伝播を直接呼び出す
+        X = np.asarray(X, dtype=np.float32)
+        predictions = np.empty(X.shape[0], dtype=np.float32)
+        for start in range(0, X.shape[0], PREDICT_MAX_BATCH):
+            batch = X[start:start + PREDICT_MAX_BATCH]
+            predictions[start:start + len(batch)] = self._forward(batch).numpy().reshape(-1)
+        return predictions
+    
+    def _forward(self, X: np.ndarray) -> tf.Tensor:
+        """推論用の順伝播（入力形状を固定したグラフ化関数をモデルごとにキャッシュ）"""
+        if self._predict_fn is None:
+            model = self.model
+            _, sequence_length, n_features = model.input_shape
+            self._predict_fn = tf.function(
+                lambda inputs: model(inputs, training=False),
+                input_signature=[tf.TensorSpec([None, sequence_length, n_features], tf.float32)],
+                jit_compile=self._xla_enabled()
+            )
+        return self._predict_fn(X)
     
     def evaluate(self, X_test: np.ndarray, y_test: np.ndarray) -> Dict[str, float]:
         """
@@ -181,23 +338,21 @@ class LSTMForexPredictor:
         if self.model is None:
             raise ValueError("Model not trained yet")
         
-        # モデルの評価
-        loss, mae, mape = self.model.evaluate(X_test, y_test, verbose=0)
-        
-        # 予測
+        # 予測（損失・メトリクスは予測値から計算し、model.evaluateによる2回目の推論を省く）
         predictions = self.predict(X_test)
+        y_test = np.asarray(y_test, dtype=np.float32).reshape(-1)
         
-        # 追加メトリクスの計算
-        from sklearn.metrics import mean_squared_error, r2_score
-        mse = mean_squared_error(y_test, predictions)
+        # コンパイル時の損失・メトリクス（mse, mae, mape）と同じ定義で、方向精度と合わせて1パスで計算
+        loss, mae, mape, direction_accuracy = regression_metrics(
+            y_test, predictions, mape_floor=keras.backend.epsilon()
+        )
+        
+        # 追加メトリクスの計算（MSEは損失と同じ）
+        from sklearn.metrics import r2_score
+        mse = loss
         rmse = np.sqrt(mse)
         r2 = r2_score(y_test, predictions)
         
-        # 方向精度（上昇/下降の予測精度）
-        direction_accuracy = np.mean(
-            (predictions > 0) == (y_test > 0)
-        )
-        
         return {
             'loss': float(loss),
             'mae': float(mae),
@@ -218,8 +373,17 @@ class LSTMForexPredictor:
         if self.model is None:
             raise ValueError("Model not trained yet")
         
-        # モデルを保存
-        self.model.save(f"{filepath}_model.h5")
+        if LSTM_FP16_CHECKPOINT:
+            # 構成はJSON、重みはfloat16で保存（読み込むデータ量が半分になる）
+            with open(f"{filepath}_model.json", 'w') as f:
+                f.write(self.model.to_json())
+            np.savez(
+                f"{filepath}_weights_fp16.npz",
+                *[weights.astype(np.float16) for weights in self.model.get_weights()]
+            )
+        else:
+            # モデルを保存（Keras v3形式）
+            self.model.save(f"{filepath}_model.keras")
         
         # 設定を保存
         config = {
@@ -227,12 +391,17 @@ class LSTMForexPredictor:
             'n_features': self.n_features,
             'lstm_units': self.lstm_units,
             'dropout_rate': self.dropout_rate,
-            'learning_rate': self.learning_rate
+            'learning_rate': self.learning_rate,
+            'use_mixed_precision': self.use_mixed_precision,
+            'use_xla': self.use_xla
         }
         
         with open(f"{filepath}_config.json", 'w') as f:
             json.dump(config, f)
         
+        if LSTM_TENSORRT:
+            self.export_tensorrt(filepath)
+        
         logger.info(f"Model saved to {filepath}")
     
     def load_model(self, filepath: str):
@@ -242,9 +411,6 @@ class LSTMForexPredictor:
         Args:
             filepath: 読み込み元のパス
         """
-        # モデルを読み込み
-        self.model = keras.models.load_model(f"{filepath}_model.h5")
-        
         # 設定を読み込み
         with open(f"{filepath}_config.json", 'r') as f:
             config = json.load(f)
@@ -254,9 +420,113 @@ class LSTMForexPredictor:
         self.lstm_units = config['lstm_units']
         self.dropout_rate = config['dropout_rate']
         self.learning_rate = config['learning_rate']
+        self.use_mixed_precision = config.get('use_mixed_precision', True)
+        self.use_xla = config.get('use_xla', True)
+        
+        # モデルを読み込み（float16の重み、Keras v3形式、旧形式のHDF5の順）
+        weights_path = f"{filepath}_weights_fp16.npz"
+        with self._strategy_scope():
+            if LSTM_FP16_CHECKPOINT and os.path.exists(weights_path):
+                self.model = self._load_fp16_checkpoint(filepath)
+            else:
+                model_path = f"{filepath}_model.keras"
+                if not os.path.exists(model_path):
+                    model_path = f"{filepath}_model.h5"
+                self.model = keras.models.load_model(model_path)
+        self._predict_fn = None
+        self._mc_forward = None
+        self._serving_model = None
+        
+        # 変換済みのTensorRTエンジンがあれば推論に使用（学習・MCドロップアウトはKerasモデル）
+        trt_path = f"{filepath}_trt"
+        if LSTM_TENSORRT and os.path.isdir(trt_path):
+            self._load_tensorrt(trt_path)
         
         logger.info(f"Model loaded from {filepath}")
     
+    def _load_fp16_checkpoint(self, filepath: str) -> keras.Model:
+        """JSONの構成とfloat16の重みからモデルを復元し、各変数の型に戻してコンパイル"""
+        with open(f"{filepath}_model.json", 'r') as f:
+            model = keras.models.model_from_json(f.read())
+        
+        with np.load(f"{filepath}_weights_fp16.npz") as saved:
+            weights = [saved[f"arr_{i}"] for i in range(len(saved.files))]
+        model.set_weights([
+            values.astype(variable.dtype.as_numpy_dtype)
+            for values, variable in zip(weights, model.weights)
+        ])
+        
+        mixed = any(layer.dtype_policy.compute_dtype == 'float16' for layer in model.layers)
+        self._compile_model(model, mixed)
+        return model
+    
+    def export_tensorrt(self, filepath: str) -> bool:
+        """
+        推論用のSavedModelを書き出し、TensorRT（FP16）エンジンに変換して推論に使用する
+        
+        SavedModelは{filepath}_savedmodel、変換後のモデルは{filepath}_trtに保存する
+        
+        Args:
+            filepath: 保存先のパス
+        
+        Returns:
+            変換に成功したか
+        """
+        if self.model is None:
+            raise ValueError("Model not trained yet")
+        
+        if not TENSORRT_AVAILABLE or not tf.config.list_physical_devices('GPU'):
+            logger.warning("TensorRT or GPU not available. Using Keras predict.")
+            return False
+        
+        saved_model_path = f"{filepath}_savedmodel"
+        trt_path = f"{filepath}_trt"
+        try:
+            # オプティマイザを含まない推論専用のSavedModel
+            self.model.export(saved_model_path)
+            converter = trt.TrtGraphConverterV2(
+                input_saved_model_dir=saved_model_path,
+                precision_mode=trt.TrtPrecisionMode.FP16
+            )
+            converter.convert()
+            converter.save(trt_path)
+            return self._load_tensorrt(trt_path)
+        except Exception as e:
+            logger.warning(f"Failed to convert LSTM model to TensorRT: {str(e)}")
+            return False
+    
+    def _load_tensorrt(self, trt_path: str) -> bool:
+        """変換済みのTensorRTモデルを読み込み、推論関数として設定"""
+        try:
+            serving_model = tf.saved_model.load(trt_path)
+            signature = serving_model.signatures['serving_default']
+        except Exception as e:
+            logger.warning(f"Failed to load TensorRT model {trt_path}: {str(e)}")
+            return False
+        
+        input_name = next(iter(signature.structured_input_signature[1]))
+        output_name = next(iter(signature.structured_outputs))
+        # 変数の解放を防ぐため読み込んだモデルへの参照を保持する
+        self._serving_model = serving_model
+        self._predict_fn = lambda inputs: signature(**{input_name: tf.constant(inputs)})[output_name]
+        return True
+    
+    def set_inference_threads(self, n_threads: Optional[int]):
+        """
+        TensorFlowの演算内並列スレッド数を設定
+        
+        プロセス全体の設定で、TensorFlowランタイムの初期化後は変更できない
+        
+        Args:
+            n_threads: スレッド数（Noneの場合は変更しない）
+        """
+        if n_threads is None:
+            return
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+        except RuntimeError as e:
+            logger.warning(f"TensorFlow threads already initialized: {str(e)}")
+    
     def get_model_summary(self) -> str:
         """モデルの概要を取得"""
         if self.model is None:
@@ -267,17 +537,50 @@ class LSTMForexPredictor:
         self.model.summary(print_fn=lambda x: stream.write(x + '\n'))
         return stream.getvalue()
     
+    def _dropout_forward(self, X: np.ndarray) -> tf.Tensor:
+        """
+        ドロップアウトを有効にした順伝播（グラフ化した関数をモデルごとにキャッシュ）
+        
+        Eagerモードでの層ごとのPythonディスパッチを避けるためtf.functionでグラフ化する。
+        最後の分割だけ行数が変わるため、形状の変化で再トレースしないよう
+        reduce_retracingを指定する。複数GPUでは行を各GPUに連続区間で分割して
+        同時に計算し、元の順序で結合する
+        """
+        if self._mc_forward is None:
+            model = self.model
+            self._mc_forward = tf.function(
+                lambda inputs: model(inputs, training=True),
+                reduce_retracing=True
+            )
+        if self._strategy is None:
+            return self._mc_forward(X)
+        
+        bounds = np.linspace(0, len(X), self._strategy.num_replicas_in_sync + 1).astype(int)
+        
+        def replica_rows(context):
+            replica = context.replica_id_in_sync_group
+            return tf.constant(X[bounds[replica]:bounds[replica + 1]])
+        
+        per_replica = self._strategy.experimental_distribute_values_from_function(replica_rows)
+        outputs = self._strategy.run(self._mc_forward, args=(per_replica,))
+        return self._strategy.gather(outputs, axis=0)
+    
     def predict_with_confidence(
         self,
         X: np.ndarray,
-        n_simulations: int = 100
+        n_simulations: int = 100,
+        confidence_level: float = 0.95
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         信頼区間付きで予測（モンテカルロドロップアウト）
         
+        入力をシミュレーション回数分タイル状に複製し、ドロップアウトを有効にした
+        まとめての推論で全シミュレーションを計算する
+        
         Args:
             X: 入力データ
             n_simulations: シミュレーション回数
+            confidence_level: 信頼水準
         
         Returns:
             予測値、下限、上限のタプル
@@ -285,22 +588,26 @@ class LSTMForexPredictor:
         if self.model is None:
             raise ValueError("Model not trained yet")
         
-        # ドロップアウトを有効にして複数回予測
-        predictions = []
+        X = np.asarray(X, dtype=np.float32)
+        batch_size = X.shape[0]
         
-        for _ in range(n_simulations):
-            # training=Trueでドロップアウトを有効化
-            pred = self.model(X, training=True).numpy().flatten()
-            predictions.append(pred)
+        # 1回の推論に含めるシミュレーション数（入力が大きい場合のメモリ上限）
+        sims_per_call = max(1, min(n_simulations, MC_DROPOUT_MAX_BATCH // max(batch_size, 1)))
         
-        predictions = np.array(predictions)
+        predictions = np.empty((n_simulations, batch_size), dtype=np.float32)
+        for start in range(0, n_simulations, sims_per_call):
+            n_sims = min(sims_per_call, n_simulations - start)
+            tiled = np.broadcast_to(X, (n_sims,) + X.shape).reshape((-1,) + X.shape[1:])
+            # training=Trueでドロップアウトを有効化
+            predictions[start:start + n_sims] = (
+                self._dropout_forward(tiled).numpy().reshape(n_sims, batch_size)
+            )
         
         # 統計量を計算
         mean_pred = np.mean(predictions, axis=0)
-        std_pred = np.std(predictions, axis=0)
         
-        # 95%信頼区間
-        lower_bound = mean_pred - 1.96 * std_pred
-        upper_bound = mean_pred + 1.96 * std_pred
+        # 信頼区間（シミュレーション分布の分位点）
+        alpha = (1 - confidence_level) / 2
+        lower_bound, upper_bound = np.quantile(predictions, [alpha, 1 - alpha], axis=0)
         
-        return mean_pred, lower_bound, upper_bound
\ No newline at end of file
+        return mean_pred, lower_bound, upper_bound
@@ -0,0 +1,318 @@
+"""
+オンライン特徴量計算
+====================
+
+ライブ推論で1本ずつ追加される足について、FeatureEngineer.create_features と同じ特徴量を
+追加した足の行だけ計算する
+- 指数移動平均・MACD・RSIは漸化式の状態を保持して1ステップずつ更新
+- 移動平均・ボリンジャーバンド・ATR・ストキャスティクス・ローリング統計は直近の窓のみを計算
+- 列ごとのバッファを事前に確保し、足の追加ごとに全系列を作り直さない
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from . import _feature_kernels as kernels
+
+# バッファの初期確保行数
+_INITIAL_CAPACITY = 1024
+
+# 計算用に float64 で保持する系列
+_HISTORY_COLUMNS = ('high', 'low', 'close', 'target', 'returns', 'stoch_k')
+
+
+class OnlineFeatureState:
+    """
+    create_features の結果を起点に、追加された足の特徴量を差分計算する状態
+
+    行のインデックスは初期化したDataFrameの先頭を0とする通し番号
+    """
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        input_columns: Sequence[str],
+        target_col: str = 'close_rate',
+        include_technical: bool = True,
+        include_lag: bool = True,
+        include_rolling: bool = True,
+        include_time: bool = True,
+        lags: Sequence[int] = (),
+        windows: Sequence[int] = (),
+        max_rows: Optional[int] = None
+    ):
+        """
+        Args:
+            frame: create_features の結果
+            input_columns: create_features に渡したDataFrameの列（追加する足が持つ列）
+            target_col: ターゲット列名
+            include_technical: テクニカル指標を含むか
+            include_lag: ラグ特徴量を含むか
+            include_rolling: ローリング統計を含むか
+            include_time: 時系列特徴量を含むか
+            lags: ラグ特徴量のラグ
+            windows: ローリング統計の窓
+            max_rows: 保持する最大行数（省略時は全行を保持）
+        """
+        if len(frame) == 0:
+            raise ValueError("Incremental features require at least one row")
+
+        self.target_col = target_col
+        self.include_technical = include_technical
+        self.include_lag = include_lag
+        self.include_rolling = include_rolling
+        self.include_time = include_time
+        self.lags = tuple(lags)
+        self.windows = tuple(windows)
+
+        # 窓計算・ラグ参照に必要な直近の本数（ATR・リターンは前日の足も参照する）
+        self._min_history = max(
+            (*kernels.SMA_PERIODS, kernels.BB_PERIOD, kernels.STOCH_PERIOD, *self.windows, *self.lags),
+            default=0,
+        ) + 1
+        if max_rows is not None and max_rows < self._min_history:
+            raise ValueError(f"max_rows must be at least {self._min_history}")
+        self.max_rows = max_rows
+
+        self.columns: List[str] = list(frame.columns)
+        self._input_columns = list(input_columns)
+        input_set = set(self._input_columns)
+        self._feature_columns = [col for col in self.columns if col not in input_set]
+
+        # 列ごとのバッファ（dtypeはcreate_featuresの結果に合わせる）
+        n = len(frame)
+        capacity = max(_INITIAL_CAPACITY if max_rows is None else 2 * max_rows, 2 * n)
+        self._buffers: Dict[str, np.ndarray] = {}
+        for col in self.columns:
+            values = frame[col].to_numpy()
+            buffer = np.empty(capacity, dtype=values.dtype)
+            buffer[:n] = values
+            self._buffers[col] = buffer
+
+        # 指標計算用の float64 系列
+        high = kernels.as_float_array(frame['high_rate'])
+        low = kernels.as_float_array(frame['low_rate'])
+        close = kernels.as_float_array(frame['close_rate'])
+        technical = kernels.technical_indicators(high, low, close)
+        macd = technical[kernels.TECHNICAL_COLUMNS.index('macd')]
+        self._history: Dict[str, np.ndarray] = {name: np.empty(capacity) for name in _HISTORY_COLUMNS}
+        self._history['high'][:n] = high
+        self._history['low'][:n] = low
+        self._history['close'][:n] = close
+        self._history['target'][:n] = kernels.as_float_array(frame[target_col])
+        self._history['returns'][:n] = frame['close_rate'].pct_change().to_numpy(dtype=np.float64)
+        self._history['stoch_k'][:n] = technical[kernels.TECHNICAL_COLUMNS.index('stoch_k')]
+
+        # 漸化式の状態
+        self._ema_fast = kernels.ewm_state(close, kernels.EMA_FAST_SPAN)
+        self._ema_slow = kernels.ewm_state(close, kernels.EMA_SLOW_SPAN)
+        self._macd_signal = kernels.ewm_state(macd, kernels.MACD_SIGNAL_SPAN)
+        self._rsi = kernels.wilder_rsi_state(close, kernels.RSI_PERIOD)
+        filled = pd.Series(close).ffill().to_numpy()
+        self._last_filled_close = filled[-1]
+
+        self._start = 0      # バッファ先頭の通し番号
+        self._size = n       # バッファ内の行数
+        self._n_seen = n     # これまでに受け取った足の本数
+
+    # ===================================================================
+    # 足の追加
+    # ===================================================================
+
+    def update(self, new_row: Dict[str, Any]) -> None:
+        """
+        足を1本追加して特徴量を計算
+
+        Args:
+            new_row: 追加する足（初期化したDataFrameの入力列をすべて含む）
+        """
+        if self._size == self._buffers[self.columns[0]].shape[0]:
+            self._make_room()
+
+        t = self._size
+        for col in self._input_columns:
+            self._buffers[col][t] = (
+                pd.Timestamp(new_row[col]).to_datetime64() if col == 'date' else new_row[col]
+            )
+
+        high = float(new_row['high_rate'])
+        low = float(new_row['low_rate'])
+        close = float(new_row['close_rate'])
+        history = self._history
+        history['high'][t] = high
+        history['low'][t] = low
+        history['close'][t] = close
+        history['target'][t] = float(new_row[self.target_col])
+
+        features: Dict[str, Any] = {}
+        self._price_features(features, t, float(new_row['open_rate']), high, low, close)
+        if self.include_technical:
+            self._technical_features(features, t, close)
+        if self.include_lag:
+            self._lag_features(features, t)
+        if self.include_rolling:
+            self._rolling_features(features, t)
+        if self.include_time and 'date' in self._input_columns:
+            self._time_features(features, pd.Timestamp(new_row['date']))
+
+        for col in self._feature_columns:
+            self._buffers[col][t] = features[col]
+
+        self._size += 1
+        self._n_seen += 1
+
+    def frame(self) -> pd.DataFrame:
+        """保持している行（max_rows 指定時は直近 max_rows 行）の特徴量DataFrame"""
+        first = 0 if self.max_rows is None else max(0, self._size - self.max_rows)
+        index = pd.RangeIndex(self._start + first, self._start + self._size)
+        return pd.DataFrame(
+            {col: self._buffers[col][first:self._size] for col in self.columns}, index=index
+        )
+
+    def _make_room(self) -> None:
+        """バッファが一杯の場合、max_rows 指定時は古い行を捨て、それ以外は容量を倍にする"""
+        if self.max_rows is not None:
+            keep = self.max_rows
+            drop = self._size - keep
+            for buffer in (*self._buffers.values(), *self._history.values()):
+                buffer[:keep] = buffer[drop:self._size]
+            self._start += drop
+            self._size = keep
+            return
+
+        capacity = 2 * self._size
+        for store in (self._buffers, self._history):
+            for key, buffer in store.items():
+                grown = np.empty(capacity, dtype=buffer.dtype)
+                grown[:self._size] = buffer[:self._size]
+                store[key] = grown
+
+    def _tail(self, name: str, t: int, length: int) -> np.ndarray:
+        """t行目までの直近 length 本（系列の先頭付近では短くなる）"""
+        return self._history[name][max(0, t - length + 1):t + 1]
+
+    # ===================================================================
+    # 特徴量グループ（create_features の各メソッドに対応）
+    # ===================================================================
+
+    def _price_features(
+        self, features: Dict[str, Any], t: int, open_: float, high: float, low: float, close: float
+    ) -> None:
+        """価格変動に関する特徴量（_add_price_features と同じ）"""
+        previous_close = self._history['close'][t - 1]
+
+        # pct_change と同様に欠損値は直前の終値で補完してからリターンを計算
+        previous_filled = self._last_filled_close
+        current_filled = close if close == close else previous_filled
+        self._last_filled_close = current_filled
+        returns = current_filled / previous_filled - 1 if previous_filled == previous_filled else math.nan
+        self._history['returns'][t] = returns
+        features['returns'] = returns
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features['log_returns'] = np.log(np.float64(close) / previous_close)
+
+        high_low_range = high - low
+        features['high_low_range'] = high_low_range
+        features['high_low_pct'] = high_low_range / close
+        body_size = abs(close - open_)
+        features['body_size'] = body_size
+        features['body_pct'] = body_size / close
+        features['upper_shadow'] = high - np.fmax(open_, close)
+        features['lower_shadow'] = np.fmin(open_, close) - low
+        features['price_position'] = (close - low) / (high_low_range + 1e-10)
+
+    def _technical_features(self, features: Dict[str, Any], t: int, close: float) -> None:
+        """テクニカル指標（technical_indicators と同じ）"""
+        for period in kernels.SMA_PERIODS:
+            sma = kernels.rolling_mean(self._tail('close', t, period), period)[-1]
+            features[f'sma_{period}'] = sma
+            features[f'sma_{period}_ratio'] = close / sma
+
+        # 指数移動平均・MACD
+        ema_fast = kernels.ewm_step(*self._ema_fast, close, 2.0 / (kernels.EMA_FAST_SPAN + 1.0))
+        ema_slow = kernels.ewm_step(*self._ema_slow, close, 2.0 / (kernels.EMA_SLOW_SPAN + 1.0))
+        self._ema_fast, self._ema_slow = ema_fast, ema_slow
+        macd = ema_fast[0] - ema_slow[0]
+        self._macd_signal = kernels.ewm_step(
+            *self._macd_signal, macd, 2.0 / (kernels.MACD_SIGNAL_SPAN + 1.0)
+        )
+        macd_signal = self._macd_signal[0]
+        features['ema_12'] = ema_fast[0]
+        features['ema_26'] = ema_slow[0]
+        features['macd'] = macd
+        features['macd_signal'] = macd_signal
+        features['macd_histogram'] = macd - macd_signal
+
+        # RSI（通し番号で初期化期間を判定、初期化時に1本以上あるため t >= 1）
+        avg_gain, avg_loss, rsi = kernels.wilder_rsi_step(
+            *self._rsi, self._n_seen, close - self._history['close'][t - 1], kernels.RSI_PERIOD
+        )
+        self._rsi = (avg_gain, avg_loss)
+        features['rsi'] = rsi
+
+        # ボリンジャーバンド
+        bb_middle, bb_std_dev = kernels.rolling_window_stats(
+            self._tail('close', t, kernels.BB_PERIOD), kernels.BB_PERIOD
+        )[:2, -1]
+        bb_upper = bb_middle + bb_std_dev * kernels.BB_NUM_STD
+        bb_lower = bb_middle - bb_std_dev * kernels.BB_NUM_STD
+        bb_width = bb_upper - bb_lower
+        features['bb_middle'] = bb_middle
+        features['bb_upper'] = bb_upper
+        features['bb_lower'] = bb_lower
+        features['bb_width'] = bb_width
+        features['bb_position'] = (close - bb_lower) / (bb_width + 1e-10)
+
+        # ATR（窓の先頭のTrue Rangeにも前日終値が必要なため1本多く渡す）
+        length = kernels.ATR_PERIOD + 1
+        features['atr'] = kernels.average_true_range(
+            self._tail('high', t, length), self._tail('low', t, length),
+            self._tail('close', t, length), kernels.ATR_PERIOD
+        )[-1]
+
+        # ストキャスティクス
+        lowest_low = kernels.rolling_min(self._tail('low', t, kernels.STOCH_PERIOD), kernels.STOCH_PERIOD)[-1]
+        highest_high = kernels.rolling_max(self._tail('high', t, kernels.STOCH_PERIOD), kernels.STOCH_PERIOD)[-1]
+        stoch_k = (close - lowest_low) / (highest_high - lowest_low + 1e-10) * 100
+        self._history['stoch_k'][t] = stoch_k
+        features['stoch_k'] = stoch_k
+        features['stoch_d'] = kernels.rolling_mean(
+            self._tail('stoch_k', t, kernels.STOCH_SMOOTH), kernels.STOCH_SMOOTH
+        )[-1]
+
+    def _lag_features(self, features: Dict[str, Any], t: int) -> None:
+        """ラグ特徴量（_add_lag_features と同じ）"""
+        target = self._history['target']
+        returns = self._history['returns']
+        for lag in self.lags:
+            features[f'{self.target_col}_lag_{lag}'] = target[t - lag] if t >= lag else math.nan
+            features[f'returns_lag_{lag}'] = returns[t - lag] if t >= lag else math.nan
+
+    def _rolling_features(self, features: Dict[str, Any], t: int) -> None:
+        """ローリング統計量（_add_rolling_features と同じ）"""
+        target = self._history['target'][t]
+        for window in self.windows:
+            rolling_mean, rolling_std, rolling_max, rolling_min = kernels.rolling_window_stats(
+                self._tail('target', t, window), window
+            )[:, -1]
+            features[f'rolling_mean_{window}'] = rolling_mean
+            features[f'rolling_std_{window}'] = rolling_std
+            features[f'rolling_max_{window}'] = rolling_max
+            features[f'rolling_min_{window}'] = rolling_min
+            features[f'price_to_max_{window}'] = target / rolling_max
+            features[f'price_to_min_{window}'] = target / rolling_min
+
+    @staticmethod
+    def _time_features(features: Dict[str, Any], date: pd.Timestamp) -> None:
+        """時系列特徴量（_add_time_features と同じ）"""
+        features['day_of_week'] = date.dayofweek
+        features['month'] = date.month
+        features['quarter'] = date.quarter
+        features['is_month_start'] = int(date.is_month_start)
+        features['is_month_end'] = int(date.is_month_end)
+        features['is_quarter_start'] = int(date.is_quarter_start)
+        features['is_quarter_end'] = int(date.is_quarter_end)
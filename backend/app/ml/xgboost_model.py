@@ -6,13 +6,64 @@ import pandas as pd
 from typing import Dict, Any, Optional, List, Tuple
 import xgboost as xgb
 from sklearn.model_selection import GridSearchCV, TimeSeriesSplit
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from sklearn.metrics import r2_score
 import joblib
+import functools
 import json
 import logging
+import os
+import shutil
+import tempfile
+import weakref
+
+from ._metric_kernels import regression_metrics
+
+# treelite/tl2cgenはオプション依存（コンパイル済みモデルによる推論に使用）
+try:
+    import treelite
+    import tl2cgen
+    NATIVE_PREDICTOR_AVAILABLE = True
+except ImportError:
+    NATIVE_PREDICTOR_AVAILABLE = False
+
+# optunaはオプション依存（ハイパーパラメータ探索に使用）
+try:
+    import optuna
+    OPTUNA_AVAILABLE = True
+except ImportError:
+    OPTUNA_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# 学習済みの木をCの共有ライブラリにコンパイルして推論する（オプトイン）
+XGBOOST_NATIVE_PREDICT = os.getenv("XGBOOST_NATIVE_PREDICT", "false").lower() == "true"
+
+# ハイパーパラメータ探索の各試行の最大ラウンド数と早期停止ラウンド数
+TUNING_MAX_BOOST_ROUNDS = 500
+TUNING_EARLY_STOPPING_ROUNDS = 20
+
+
+@functools.lru_cache(maxsize=None)
+def cuda_device_available() -> bool:
+    """
+    XGBoostがGPU（CUDA）で学習できるか
+
+    CUDA対応ビルドでもGPUがなければ警告を出してCPUで学習されるため、
+    小さな学習を一度実行して実際に選ばれたデバイスを確認する
+    """
+    if not xgb.build_info().get('USE_CUDA', False):
+        return False
+    try:
+        booster = xgb.train(
+            {'device': 'cuda', 'tree_method': 'hist', 'verbosity': 0},
+            xgb.DMatrix(np.zeros((2, 1), dtype=np.float32), label=[0.0, 1.0]),
+            num_boost_round=1
+        )
+        config = json.loads(booster.save_config())
+        return config['learner']['generic_param']['device'].startswith('cuda')
+    except Exception:
+        return False
+
 
 class XGBoostForexPredictor:
     """為替予測用XGBoostモデル"""
@@ -25,7 +76,8 @@ class XGBoostForexPredictor:
         learning_rate: float = 0.1,
         subsample: float = 0.8,
         colsample_bytree: float = 0.8,
-        random_state: int = 42
+        random_state: int = 42,
+        device: str = 'auto'
     ):
         """
         Args:
@@ -36,7 +88,11 @@ class XGBoostForexPredictor:
             subsample: サブサンプリング率
             colsample_bytree: 特徴量のサブサンプリング率
             random_state: 乱数シード
+            device: 学習・推論デバイス（'auto'の場合はGPUがあればcuda、なければcpu）
         """
+        if device == 'auto':
+            device = 'cuda' if cuda_device_available() else 'cpu'
+        
         self.params = {
             'objective': objective,
             'n_estimators': n_estimators,
@@ -46,16 +102,24 @@ class XGBoostForexPredictor:
             'colsample_bytree': colsample_bytree,
             'random_state': random_state,
             'tree_method': 'hist',  # 高速化
+            'device': device,
             'eval_metric': 'rmse'
         }
         
         self.model = None
         self.feature_importance = None
         self.best_params = None
+        self.native_predictor = None
+        self.native_library_path = None
+        self._native_tempdir = None  # コンパイル先の一時ディレクトリの削除処理（weakref.finalize）
+        self.n_threads = None  # 推論スレッド数（Noneの場合は全コア）
+        self._explainer = None  # (ブースター, SHAP Explainer)
+        self._feature_names = None  # (ブースター, 学習時の特徴量名)
         
     def build_model(self) -> xgb.XGBRegressor:
         """XGBoostモデルを構築"""
         self.model = xgb.XGBRegressor(**self.params)
+        self.native_predictor = None
         return self.model
     
     def train(
@@ -103,6 +167,11 @@ class XGBoostForexPredictor:
             'importance': self.model.feature_importances_
         }).sort_values('importance', ascending=False)
         
+        # コンパイル済み推論（有効な場合）
+        if XGBOOST_NATIVE_PREDICT:
+            self.compile_native_predictor()
+        self._apply_inference_threads()
+        
         # 訓練結果を返す
         results = {
             'n_features': X_train.shape[1],
@@ -119,22 +188,32 @@ class XGBoostForexPredictor:
         y_train: pd.Series,
         param_grid: Optional[Dict] = None,
         cv_splits: int = 5,
-        verbose: int = 1
+        verbose: int = 1,
+        n_trials: int = 50
     ) -> Dict[str, Any]:
         """
         ハイパーパラメータチューニング
         
+        param_gridを省略した場合はOptuna（TPE）で探索し、各試行は早期停止付きの
+        時系列クロスバリデーションで評価する。param_gridを指定した場合、または
+        Optunaがインストールされていない場合はグリッドサーチ
+        
         Args:
             X_train: 訓練データ
             y_train: 訓練ラベル
             param_grid: パラメータグリッド
             cv_splits: クロスバリデーションの分割数
             verbose: 出力の詳細度
+            n_trials: Optunaの試行回数
         
         Returns:
-            最適パラメータと結果
+            最適パラメータと結果（best_scoreは平均二乗誤差）
         """
+        if param_grid is None and OPTUNA_AVAILABLE:
+            return self._tune_with_optuna(X_train, y_train, cv_splits, verbose, n_trials)
+        
         if param_grid is None:
+            logger.warning("Optuna not installed. Using grid search.")
             param_grid = {
                 'n_estimators': [100, 200, 300],
                 'max_depth': [3, 5, 7, 9],
@@ -150,7 +229,8 @@ class XGBoostForexPredictor:
         base_model = xgb.XGBRegressor(
             objective=self.params['objective'],
             random_state=self.params['random_state'],
-            tree_method='hist'
+            tree_method='hist',
+            device=self.params['device']
         )
         
         grid_search = GridSearchCV(
@@ -158,7 +238,7 @@ class XGBoostForexPredictor:
             param_grid=param_grid,
             cv=tscv,
             scoring='neg_mean_squared_error',
-            n_jobs=-1,
+            n_jobs=1 if self.params['device'] == 'cuda' else -1,  # GPUは並列のフィットで共有しない
             verbose=verbose
         )
         
@@ -170,7 +250,7 @@ class XGBoostForexPredictor:
         self.params.update(self.best_params)
         
         # 最適モデルを保存
-        self.model = grid_search.best_estimator_
+        self._set_tuned_model(grid_search.best_estimator_)
         
         return {
             'best_params': self.best_params,
@@ -178,6 +258,84 @@ class XGBoostForexPredictor:
             'cv_results': pd.DataFrame(grid_search.cv_results_)
         }
     
+    def _tune_with_optuna(
+        self,
+        X_train: pd.DataFrame,
+        y_train: pd.Series,
+        cv_splits: int,
+        verbose: int,
+        n_trials: int
+    ) -> Dict[str, Any]:
+        """Optuna（TPE）と早期停止付きのxgb.cvによるハイパーパラメータ探索"""
+        dtrain = xgb.DMatrix(X_train, label=y_train)
+        folds = list(TimeSeriesSplit(n_splits=cv_splits).split(X_train))
+        base_params = {
+            'objective': self.params['objective'],
+            'eval_metric': 'rmse',
+            'tree_method': 'hist',
+            'device': self.params['device'],
+            'seed': self.params['random_state']
+        }
+        
+        def objective(trial) -> float:
+            params = {
+                **base_params,
+                'max_depth': trial.suggest_int('max_depth', 3, 9),
+                'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.2, log=True),
+                'subsample': trial.suggest_float('subsample', 0.6, 1.0),
+                'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
+                'min_child_weight': trial.suggest_float('min_child_weight', 1.0, 10.0, log=True)
+            }
+            # 早期停止で打ち切ったラウンド数を木の数として記録
+            cv_result = xgb.cv(
+                params,
+                dtrain,
+                num_boost_round=TUNING_MAX_BOOST_ROUNDS,
+                folds=folds,
+                early_stopping_rounds=TUNING_EARLY_STOPPING_ROUNDS,
+                verbose_eval=verbose > 1
+            )
+            trial.set_user_attr('n_estimators', len(cv_result))
+            return float(cv_result['test-rmse-mean'].iloc[-1])
+        
+        study = optuna.create_study(
+            direction='minimize',
+            sampler=optuna.samplers.TPESampler(seed=self.params['random_state'])
+        )
+        study.optimize(objective, n_trials=n_trials, show_progress_bar=verbose > 0)
+        
+        # 最適パラメータを保存
+        self.best_params = {
+            **study.best_params,
+            'n_estimators': study.best_trial.user_attrs['n_estimators']
+        }
+        self.params.update(self.best_params)
+        
+        # 最適パラメータで全訓練データに再学習（GridSearchCVのrefitと同じ）
+        # 探索で作成済みのDMatrixを再利用し、学習済みブースターをXGBRegressorに読み込む
+        booster = xgb.train(
+            {**base_params, **study.best_params},
+            dtrain,
+            num_boost_round=self.best_params['n_estimators']
+        )
+        model = xgb.XGBRegressor(**self.params)
+        model.load_model(booster.save_raw(raw_format='ubj'))
+        self._set_tuned_model(model)
+        
+        return {
+            'best_params': self.best_params,
+            'best_score': study.best_value ** 2,
+            'cv_results': study.trials_dataframe()
+        }
+    
+    def _set_tuned_model(self, model: xgb.XGBRegressor):
+        """チューニング結果のモデルを推論に使うモデルとして設定"""
+        self.model = model
+        self.native_predictor = None
+        if XGBOOST_NATIVE_PREDICT:
+            self.compile_native_predictor()
+        self._apply_inference_threads()
+    
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         """
         予測を実行
@@ -191,8 +349,135 @@ class XGBoostForexPredictor:
         if self.model is None:
             raise ValueError("Model not trained yet")
         
-        predictions = self.model.predict(X)
-        return predictions
+        features = self._as_feature_array(X)
+        
+        # コンパイル済みモデルがあればDMatrix・Pythonラッパーを経由せずに推論
+        if self.native_predictor is not None:
+            return self.native_predictor.predict(tl2cgen.DMatrix(features)).reshape(-1)
+        
+        # DMatrixを作らずに連続配列から直接推論（早期停止時は最良イテレーションまで）
+        best_iteration = getattr(self.model, 'best_iteration', None)
+        iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+        return self.model.get_booster().inplace_predict(features, iteration_range=iteration_range)
+    
+    def _as_feature_array(self, X) -> np.ndarray:
+        """入力を学習時の列順に並べたfloat32の連続配列に変換"""
+        if isinstance(X, pd.DataFrame):
+            feature_names = self._booster_feature_names()
+            if feature_names is not None and list(X.columns) != feature_names:
+                X = X[feature_names]
+            X = X.to_numpy(dtype=np.float32)
+        return np.ascontiguousarray(X, dtype=np.float32)
+    
+    def _booster_feature_names(self) -> Optional[List[str]]:
+        """
+        学習時の特徴量名（ブースターごとにキャッシュ）
+        
+        Booster.feature_namesは参照のたびにネイティブライブラリから文字列を
+        取り出すため、1行ずつの推論では無視できない時間になる
+        """
+        booster = self.model.get_booster()
+        if self._feature_names is None or self._feature_names[0] is not booster:
+            self._feature_names = (booster, booster.feature_names)
+        return self._feature_names[1]
+    
+    def set_inference_threads(self, n_threads: Optional[int]):
+        """
+        推論に使うスレッド数を設定
+        
+        他のモデルと同じプロセスで推論する場合にOpenMPのスレッドを奪い合わないよう制限する
+        
+        Args:
+            n_threads: スレッド数（Noneの場合は全コア）
+        """
+        self.n_threads = n_threads
+        self._apply_inference_threads()
+    
+    def _apply_inference_threads(self):
+        """学習済みモデル・コンパイル済みモデルに推論スレッド数を反映"""
+        if self.n_threads is None or self.model is None:
+            return
+        self.model.get_booster().set_param({'nthread': self.n_threads})
+        if self.native_predictor is not None:
+            self._load_native_predictor(self.native_library_path)
+    
+    def compile_native_predictor(self, libpath: Optional[str] = None) -> bool:
+        """
+        学習済みモデルを共有ライブラリにコンパイルし、推論に使用する
+        
+        Args:
+            libpath: 出力先のパス（省略時は一時ディレクトリ）
+        
+        Returns:
+            コンパイルに成功したか
+        """
+        if self.model is None:
+            raise ValueError("Model not trained yet")
+        
+        if not NATIVE_PREDICTOR_AVAILABLE:
+            logger.warning("treelite/tl2cgen not installed. Using XGBoost predict.")
+            return False
+        
+        tempdir = None
+        if libpath is None:
+            tempdir = tempfile.mkdtemp(prefix="xgb_native_")
+            libpath = os.path.join(tempdir, "predictor.so")
+        
+        try:
+            booster = self.model.get_booster()
+            # 早期停止した場合はXGBRegressor.predictと同じく最良イテレーションまでの木を使用
+            best_iteration = getattr(self.model, 'best_iteration', None)
+            if best_iteration is not None:
+                booster = booster[:best_iteration + 1]
+            
+            tl2cgen.export_lib(
+                treelite.frontend.from_xgboost(booster),
+                toolchain='gcc',
+                libpath=libpath,
+                params={'parallel_comp': os.cpu_count() or 1}
+            )
+            loaded = self._load_native_predictor(libpath)
+        except Exception as e:
+            logger.warning(f"Failed to compile XGBoost model: {str(e)}")
+            self.native_predictor = None
+            loaded = False
+        
+        if loaded:
+            # 以前の一時ディレクトリは新しいライブラリの読み込み後に削除
+            self._set_native_tempdir(tempdir)
+        elif tempdir is not None:
+            shutil.rmtree(tempdir, ignore_errors=True)
+        return loaded
+    
+    def _set_native_tempdir(self, tempdir: Optional[str]):
+        """
+        コンパイル先の一時ディレクトリを差し替え、以前のディレクトリを削除
+        
+        明示的に削除されなかった場合もインスタンスの破棄時・プロセス終了時に削除される
+        """
+        if self._native_tempdir is not None:
+            self._native_tempdir()
+        self._native_tempdir = (
+            weakref.finalize(self, shutil.rmtree, tempdir, True) if tempdir is not None else None
+        )
+    
+    def close(self):
+        """コンパイル済みモデルを解放し、コンパイル先の一時ディレクトリを削除"""
+        self.native_predictor = None
+        self.native_library_path = None
+        self._set_native_tempdir(None)
+    
+    def _load_native_predictor(self, libpath: str) -> bool:
+        """コンパイル済みの共有ライブラリを読み込み"""
+        try:
+            self.native_predictor = tl2cgen.Predictor(libpath, nthread=self.n_threads)
+        except Exception as e:
+            logger.warning(f"Failed to load compiled XGBoost model {libpath}: {str(e)}")
+            self.native_predictor = None
+            return False
+        
+        self.native_library_path = libpath
+        return True
     
     def predict_with_confidence(
         self,
@@ -244,23 +529,16 @@ class XGBoostForexPredictor:
         if self.model is None:
             raise ValueError("Model not trained yet")
         
-        # 予測
+        # 予測（ラベルは予測値と同じfloat32の配列に一度だけ変換）
         predictions = self.predict(X_test)
+        y_test = np.asarray(y_test, dtype=np.float32).reshape(-1)
         
-        # メトリクスの計算
-        mse = mean_squared_error(y_test, predictions)
+        # MSE・MAE・MAPE・方向精度（上昇/下降の予測精度）を1パスで計算
+        # MAPEは実績値が0の場合は1e-10で割る
+        mse, mae, mape, direction_accuracy = regression_metrics(y_test, predictions, mape_floor=1e-10)
         rmse = np.sqrt(mse)
-        mae = mean_absolute_error(y_test, predictions)
         r2 = r2_score(y_test, predictions)
         
-        # 方向精度（上昇/下降の予測精度）
-        direction_accuracy = np.mean(
-            (predictions > 0) == (y_test > 0)
-        )
-        
-        # MAPE (Mean Absolute Percentage Error)
-        mape = np.mean(np.abs((y_test - predictions) / (y_test + 1e-10))) * 100
-        
         return {
             'mse': float(mse),
             'rmse': float(rmse),
@@ -303,8 +581,8 @@ class XGBoostForexPredictor:
         try:
             import shap
             
-            # SHAP Explainerを作成
-            explainer = shap.TreeExplainer(self.model)
+            # SHAP Explainerは学習済みモデルごとに作成して再利用（全行をまとめて計算）
+            explainer = self._get_explainer(shap)
             shap_values = explainer.shap_values(X)
             
             # 特徴量の寄与度を計算
@@ -326,6 +604,29 @@ class XGBoostForexPredictor:
             logger.warning("SHAP not installed. Cannot explain predictions.")
             return {}
     
+    def _get_explainer(self, shap):
+        """
+        現在のブースター用のSHAP Explainerを取得（ブースターが変わった場合は作り直す）
+        
+        GPUで学習した場合はGPUTreeExplainerを使い、shapがCUDA対応でビルドされて
+        いない等で作成できなければTreeExplainer
+        """
+        booster = self.model.get_booster()
+        if self._explainer is not None and self._explainer[0] is booster:
+            return self._explainer[1]
+        
+        explainer = None
+        if self.params.get('device') == 'cuda':
+            try:
+                explainer = shap.explainers.GPUTree(self.model)
+            except Exception as e:
+                logger.warning(f"GPU SHAP explainer not available: {str(e)}")
+        if explainer is None:
+            explainer = shap.TreeExplainer(self.model, feature_perturbation='tree_path_dependent')
+        
+        self._explainer = (booster, explainer)
+        return explainer
+    
     def save_model(self, filepath: str):
         """
         モデルを保存
@@ -336,8 +637,8 @@ class XGBoostForexPredictor:
         if self.model is None:
             raise ValueError("Model not trained yet")
         
-        # モデルを保存
-        joblib.dump(self.model, f"{filepath}_model.pkl")
+        # モデルを保存（XGBoostネイティブのUBJ形式、pickleより読み込みが速くバージョン間の互換性もある）
+        self.model.save_model(f"{filepath}_model.ubj")
         
         # パラメータを保存
         with open(f"{filepath}_params.json", 'w') as f:
@@ -347,6 +648,10 @@ class XGBoostForexPredictor:
         if self.feature_importance is not None:
             self.feature_importance.to_csv(f"{filepath}_importance.csv", index=False)
         
+        # コンパイル済みモデルを保存
+        if self.native_predictor is not None and self.native_library_path != f"{filepath}_native.so":
+            shutil.copyfile(self.native_library_path, f"{filepath}_native.so")
+        
         logger.info(f"Model saved to {filepath}")
     
     def load_model(self, filepath: str):
@@ -356,12 +661,20 @@ class XGBoostForexPredictor:
         Args:
             filepath: 読み込み元のパス
         """
-        # モデルを読み込み
-        self.model = joblib.load(f"{filepath}_model.pkl")
+        # モデルを読み込み（UBJ形式がなければ旧形式のpickle）
+        model_path = f"{filepath}_model.ubj"
+        if os.path.exists(model_path):
+            self.model = xgb.XGBRegressor()
+            self.model.load_model(model_path)
+        else:
+            self.model = joblib.load(f"{filepath}_model.pkl")
         
         # パラメータを読み込み
         with open(f"{filepath}_params.json", 'r') as f:
             self.params = json.load(f)
+        # GPUで学習したモデルをGPUのない環境で読み込んだ場合はCPUを使用
+        if self.params.get('device', 'cpu') != 'cpu' and not cuda_device_available():
+            self.params['device'] = 'cpu'
         
         # 特徴量重要度を読み込み
         try:
@@ -369,4 +682,14 @@ class XGBoostForexPredictor:
         except FileNotFoundError:
             self.feature_importance = None
         
+        # コンパイル済みモデルを読み込み（別環境で作られた等で読めない場合は再コンパイル）
+        self.native_predictor = None
+        if XGBOOST_NATIVE_PREDICT and NATIVE_PREDICTOR_AVAILABLE:
+            libpath = f"{filepath}_native.so"
+            if os.path.exists(libpath) and self._load_native_predictor(libpath):
+                self._set_native_tempdir(None)
+            else:
+                self.compile_native_predictor(libpath)
+        self._apply_inference_threads()
+        
         logger.info(f"Model loaded from {filepath}")
\ No newline at end of file
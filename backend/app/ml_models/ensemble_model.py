@@ -8,16 +8,103 @@ Ensemble Prediction Model
 - 不確実性の定量化
 """
 
+import bisect
+import copy
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Optional, Tuple
-import math
-from statistics import mean, stdev
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 import logging
+import os
 
+import numpy as np
+
+from ..ml import _ensemble_kernels as kernels
 from .simple_predictor import SimplePredictorModel
 
 logger = logging.getLogger(__name__)
 
+# 不確実性レベルの境界（0.3未満: low、0.6未満: medium、それ以上: high）
+_UNCERTAINTY_THRESHOLDS = (0.3, 0.6)
+_UNCERTAINTY_LEVELS = ("low", "medium", "high")
+
+# 品質レベルに応じた推奨事項
+_QUALITY_RECOMMENDATIONS = {
+    "high": "高い信頼度で予測を使用できます",
+    "medium": "標準的な信頼度で使用してください。他の情報と併用することを推奨します",
+    "low": "予測の信頼度が低いです。追加の分析や他の情報源との確認を強く推奨します"
+}
+_DEFAULT_RECOMMENDATION = "予測を慎重に使用してください"
+
+# サブモデルの予測結果に必要な項目
+_REQUIRED_PREDICTION_KEYS = frozenset(
+    ("predicted_rate", "confidence_interval", "volatility", "prediction_strength")
+)
+
+# get_model_info で返す機能一覧
+_CAPABILITIES = {
+    "provides_model_agreement": True,
+    "provides_uncertainty_quantification": True,
+    "provides_quality_assessment": True,
+    "handles_model_disagreement": True,
+    "adaptive_weighting": True  # 学習時に検証誤差から重みを決定
+}
+
+# 重み最適化（アンサンブル選択）の設定
+ENSEMBLE_SELECTION_SIZE = 20
+ENSEMBLE_SELECTION_VALIDATION_DAYS = 30
+
+
+class SubPredictionArrays(NamedTuple):
+    """
+    サブモデル予測の列バッファ
+    
+    fieldsの各行は予測値・ボラティリティ・予測強度・信頼区間の下限/上限、
+    各列はnamesの順のサブモデル。weightsは統合に使う正規化済みの重み（重みのないモデルは0）
+    """
+    names: Tuple[str, ...]
+    fields: np.ndarray
+    weights: np.ndarray
+
+
+# SubPredictionArrays.fields の行
+_RATE, _VOLATILITY, _STRENGTH, _CI_LOWER, _CI_UPPER = range(5)
+
+
+def _fit_sub_model(
+    model: SimplePredictorModel,
+    historical_data: List[Dict[str, Any]]
+) -> Tuple[SimplePredictorModel, Dict[str, Any]]:
+    """サブモデルを学習し、学習済みモデルと学習結果を返す（ワーカープロセスで実行）"""
+    result = model.fit(historical_data)
+    return model, result
+
+
+def _greedy_ensemble_selection(
+    predictions: np.ndarray,
+    targets: np.ndarray,
+    ensemble_size: int
+) -> np.ndarray:
+    """
+    貪欲法でアンサンブルを構成し、各モデルの選択回数を返す
+    
+    各ステップでアンサンブル予測を作り直さず、s個目のモデルを加えた予測を
+    acc * (s-1)/s + pred / s で逐次更新する（O(S·N)）。
+    
+    Args:
+        predictions: 各モデルの検証予測 (n_models, n_samples)
+        targets: 検証データの実測値 (n_samples,)
+        ensemble_size: 選択回数
+    """
+    counts = np.zeros(predictions.shape[0], dtype=np.int64)
+    acc = np.zeros(predictions.shape[1], dtype=np.float64)
+    for s in range(1, ensemble_size + 1):
+        candidates = acc * ((s - 1) / s) + predictions / s
+        losses = np.mean((candidates - targets) ** 2, axis=1)
+        best = int(np.argmin(losses))
+        counts[best] += 1
+        acc = candidates[best]
+    return counts
+
 
 class EnsembleModel:
     """
@@ -26,6 +113,29 @@ class EnsembleModel:
     複数の予測アプローチを統合して最終予測を生成
     """
     
+    # サブモデル固有のパラメータ
+    _SUB_MODEL_PARAMS = {
+        # トレンドフォロー設定
+        "trend_following": {
+            "short_ma_period": 5,
+            "long_ma_period": 20,
+            "trend_sensitivity": 0.8,  # 高感度
+        },
+        # 平均回帰設定
+        "mean_reversion": {
+            "short_ma_period": 10,
+            "long_ma_period": 50,
+            "trend_sensitivity": 0.3,  # 低感度（逆張り）
+        },
+        # ボラティリティ調整設定
+        "volatility_adjusted": {
+            "short_ma_period": 7,
+            "long_ma_period": 30,
+            "trend_sensitivity": 0.5,  # 中庸
+            "volatility_period": 20,
+        },
+    }
+    
     def __init__(self, model_name: str = "ensemble_v1.0"):
         self.model_name = model_name
         self.is_trained = False
@@ -36,6 +146,7 @@ class EnsembleModel:
             "mean_reversion": 0.3,       # 平均回帰
             "volatility_adjusted": 0.3   # ボラティリティ調整
         }
+        self._update_normalized_weights()
         
         # サブモデルの初期化
         self.sub_models = {
@@ -53,7 +164,8 @@ class EnsembleModel:
         }
         
         self.training_results = {}
-        
+        self._sub_model_info: Optional[Dict[str, Any]] = None
+    
     # ===================================================================
     # モデル学習
     # ===================================================================
@@ -73,25 +185,40 @@ class EnsembleModel:
                 raise ValueError("アンサンブル学習には最低50日分のデータが必要です")
             
             logger.info("アンサンブルモデルの学習を開始...")
+            self._sub_model_info = None
             
             training_results = {}
             
-            # 各サブモデルを個別に学習
+            # モデル固有の設定を適用
             for model_name, model in self.sub_models.items():
-                logger.info(f"{model_name}モデルの学習中...")
-                
-                # モデル固有の設定を適用
                 self._configure_sub_model(model, model_name)
-                
-                # 学習実行
-                model_result = model.fit(historical_data)
+            
+            # 各サブモデルは独立しているため別プロセスで並行して学習
+            # （学習は純Pythonの計算のためスレッドではGILで並列化されない。1コアの環境では逐次実行）
+            n_workers = min(len(self.sub_models), os.cpu_count() or 1)
+            if n_workers > 1:
+                with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                    futures = {
+                        model_name: executor.submit(_fit_sub_model, model, historical_data)
+                        for model_name, model in self.sub_models.items()
+                    }
+                    logger.info(f"{len(futures)}個のサブモデルを並行して学習中...")
+                    fitted = {model_name: future.result() for model_name, future in futures.items()}
+            else:
+                fitted = {
+                    model_name: _fit_sub_model(model, historical_data)
+                    for model_name, model in self.sub_models.items()
+                }
+            
+            for model_name, (trained_model, model_result) in fitted.items():
+                self.sub_models[model_name] = trained_model
                 training_results[model_name] = model_result
-                
                 logger.info(f"{model_name}モデルの学習完了")
             
             # アンサンブル重みの最適化
             optimization_result = self._optimize_ensemble_weights(historical_data)
             training_results["weight_optimization"] = optimization_result
+            self._update_normalized_weights()
             
             # モデル性能の評価
             performance_metrics = self._evaluate_ensemble_performance(historical_data)
@@ -149,22 +276,32 @@ class EnsembleModel:
             for model_name, model in self.sub_models.items():
                 try:
                     prediction = model.predict(target_days, current_rate, recent_data)
-                    sub_predictions[model_name] = prediction
                 except Exception as e:
                     logger.warning(f"{model_name}の予測に失敗: {str(e)}")
                     continue
+                # 統合処理で参照する項目は取り込み時に一度だけ確認する
+                missing = _REQUIRED_PREDICTION_KEYS.difference(prediction)
+                if missing:
+                    logger.warning(f"{model_name}の予測結果に必要な項目がありません: {sorted(missing)}")
+                    continue
+                sub_predictions[model_name] = prediction
             
             if len(sub_predictions) == 0:
                 raise RuntimeError("すべてのサブモデルの予測に失敗しました")
             
+            # 以降の集計はサブモデル予測を列バッファにまとめて行う
+            arrays = self._stack_sub_predictions(sub_predictions)
+            
             # アンサンブル予測の計算
-            ensemble_prediction = self._combine_predictions(sub_predictions)
+            ensemble_prediction = self._combine_predictions(arrays)
             
             # モデル合意度の計算
-            model_agreement = self._calculate_model_agreement(sub_predictions)
+            model_agreement = self._calculate_model_agreement(arrays)
             
             # 不確実性の定量化
-            uncertainty_metrics = self._quantify_uncertainty(sub_predictions, ensemble_prediction)
+            uncertainty_metrics = self._quantify_uncertainty(
+                ensemble_prediction, model_agreement, target_days
+            )
             
             # 最終結果の構築
             final_prediction = {
@@ -181,7 +318,7 @@ class EnsembleModel:
                 "sub_predictions": sub_predictions,
                 "ensemble_weights": self.model_weights.copy(),
                 "ensemble_quality": self._assess_prediction_quality(
-                    sub_predictions, model_agreement
+                    arrays, model_agreement
                 )
             }
             
@@ -197,139 +334,81 @@ class EnsembleModel:
     
     def _configure_sub_model(self, model: SimplePredictorModel, model_name: str) -> None:
         """サブモデル固有の設定を適用"""
-        try:
-            if model_name == "trend_following":
-                # トレンドフォロー設定
-                model.model_params.update({
-                    "short_ma_period": 5,
-                    "long_ma_period": 20,
-                    "trend_sensitivity": 0.8,  # 高感度
-                })
-                
-            elif model_name == "mean_reversion":
-                # 平均回帰設定
-                model.model_params.update({
-                    "short_ma_period": 10,
-                    "long_ma_period": 50,
-                    "trend_sensitivity": 0.3,  # 低感度（逆張り）
-                })
-                
-            elif model_name == "volatility_adjusted":
-                # ボラティリティ調整設定
-                model.model_params.update({
-                    "short_ma_period": 7,
-                    "long_ma_period": 30,
-                    "trend_sensitivity": 0.5,  # 中庸
-                    "volatility_period": 20,
-                })
-                
-        except Exception as e:
-            logger.warning(f"サブモデル設定中にエラー: {str(e)}")
+        params = self._SUB_MODEL_PARAMS.get(model_name)
+        if params:
+            model.model_params.update(params)
     
     # ===================================================================
     # アンサンブル予測計算
     # ===================================================================
     
-    def _combine_predictions(self, sub_predictions: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
-        """サブモデル予測を統合"""
-        try:
-            # 重み付き平均で予測値を統合
-            weighted_rate = 0.0
-            weighted_volatility = 0.0
-            weighted_strength = 0.0
-            total_weight = 0.0
-            
-            confidence_intervals = []
-            
-            for model_name, prediction in sub_predictions.items():
-                weight = self.model_weights.get(model_name, 0.0)
-                if weight == 0.0:
-                    continue
-                
-                weighted_rate += prediction["predicted_rate"] * weight
-                weighted_volatility += prediction["volatility"]["predicted"] * weight
-                weighted_strength += prediction["prediction_strength"] * weight
-                total_weight += weight
-                
-                # 信頼区間情報を収集
-                ci = prediction["confidence_interval"]
-                confidence_intervals.append({
-                    "lower": ci["lower"],
-                    "upper": ci["upper"],
-                    "weight": weight
-                })
-            
-            # 重みの正規化
-            if total_weight > 0:
-                weighted_rate /= total_weight
-                weighted_volatility /= total_weight
-                weighted_strength /= total_weight
-            
-            # アンサンブル信頼区間の計算
-            ensemble_ci = self._calculate_ensemble_confidence_interval(
-                weighted_rate, weighted_volatility, confidence_intervals
-            )
-            
-            return {
-                "predicted_rate": round(weighted_rate, 4),
-                "confidence_interval": {
-                    "lower": round(ensemble_ci[0], 4),
-                    "upper": round(ensemble_ci[1], 4),
-                    "level": 0.95
-                },
-                "volatility": {
-                    "predicted": round(weighted_volatility, 4),
-                    "regime": self._determine_volatility_regime(weighted_volatility)
-                },
-                "prediction_strength": round(weighted_strength, 3)
-            }
-            
-        except Exception as e:
-            logger.error(f"予測統合中にエラー: {str(e)}")
-            # フォールバック: 単純平均
-            rates = [pred["predicted_rate"] for pred in sub_predictions.values()]
-            avg_rate = mean(rates)
-            return {
-                "predicted_rate": round(avg_rate, 4),
-                "confidence_interval": {"lower": avg_rate * 0.98, "upper": avg_rate * 1.02, "level": 0.95},
-                "volatility": {"predicted": 0.15, "regime": "normal"},
-                "prediction_strength": 0.5
-            }
+    def _update_normalized_weights(self) -> None:
+        """
+        予測時に使う正規化済みの重みを更新（model_weightsを変更したら呼び出す）
+        
+        重みが0のサブモデルは除外し、合計が1になるよう正規化した重みを保持する
+        """
+        self._weight_names = tuple(name for name, weight in self.model_weights.items() if weight != 0.0)
+        weights = np.array([self.model_weights[name] for name in self._weight_names], dtype=np.float64)
+        total = weights.sum()
+        if total > 0:
+            weights = weights / total
+        self._normalized_weights = dict(zip(self._weight_names, weights.tolist()))
     
-    def _calculate_ensemble_confidence_interval(
-        self,
-        predicted_rate: float,
-        predicted_volatility: float,
-        sub_intervals: List[Dict[str, Any]]
-    ) -> Tuple[float, float]:
-        """アンサンブル信頼区間を計算"""
-        try:
-            # 各サブモデルの信頼区間を重み付き統合
-            weighted_lower = 0.0
-            weighted_upper = 0.0
-            total_weight = 0.0
-            
-            for interval in sub_intervals:
-                weight = interval["weight"]
-                weighted_lower += interval["lower"] * weight
-                weighted_upper += interval["upper"] * weight
-                total_weight += weight
-            
-            if total_weight > 0:
-                weighted_lower /= total_weight
-                weighted_upper /= total_weight
+    def _stack_sub_predictions(self, sub_predictions: Dict[str, Dict[str, Any]]) -> SubPredictionArrays:
+        """
+        サブモデル予測を列バッファにまとめる（予測ごとに一度だけ辞書を走査）
+        
+        予測に失敗したサブモデルがある場合は残りの重みだけで正規化し直す。
+        重みのあるサブモデルがすべて失敗した場合は、残ったサブモデルを等しい重みで統合する
+        """
+        names = tuple(sub_predictions)
+        fields = np.array([
+            [prediction["predicted_rate"] for prediction in sub_predictions.values()],
+            [prediction["volatility"]["predicted"] for prediction in sub_predictions.values()],
+            [prediction["prediction_strength"] for prediction in sub_predictions.values()],
+            [prediction["confidence_interval"]["lower"] for prediction in sub_predictions.values()],
+            [prediction["confidence_interval"]["upper"] for prediction in sub_predictions.values()]
+        ], dtype=np.float64).reshape(5, len(names))
+        weights = np.array(
+            [self._normalized_weights.get(name, 0.0) for name in names], dtype=np.float64
+        )
+        if np.count_nonzero(weights) < len(self._weight_names):
+            total = weights.sum()
+            if total > 0:
+                weights = weights / total
             else:
-                # フォールバック
-                margin = predicted_rate * predicted_volatility * 1.96
-                weighted_lower = predicted_rate - margin
-                weighted_upper = predicted_rate + margin
-            
-            return (weighted_lower, weighted_upper)
-            
-        except Exception:
-            # フォールバック計算
-            margin = predicted_rate * 0.02
-            return (predicted_rate - margin, predicted_rate + margin)
+                weights = np.full(len(names), 1.0 / len(names))
+        return SubPredictionArrays(names, fields, weights)
+    
+    def _combine_predictions(self, arrays: SubPredictionArrays) -> Dict[str, Any]:
+        """サブモデル予測を統合"""
+        weighted_models = np.flatnonzero(arrays.weights)
+        
+        if len(weighted_models) == 1:
+            # 重みのあるサブモデルが1つだけなら、その予測をそのまま使う（重み付き平均と同値）
+            weighted_rate, weighted_volatility, weighted_strength, ci_lower, ci_upper = (
+                arrays.fields[:, weighted_models[0]].tolist()
+            )
+        else:
+            # 予測値・ボラティリティ・予測強度・信頼区間の下限/上限を一度に重み付き平均する
+            weighted_rate, weighted_volatility, weighted_strength, ci_lower, ci_upper = (
+                kernels.weighted_fields(arrays.fields, arrays.weights).tolist()
+            )
+        
+        return {
+            "predicted_rate": round(weighted_rate, 4),
+            "confidence_interval": {
+                "lower": round(ci_lower, 4),
+                "upper": round(ci_upper, 4),
+                "level": 0.95
+            },
+            "volatility": {
+                "predicted": round(weighted_volatility, 4),
+                "regime": self._determine_volatility_regime(weighted_volatility)
+            },
+            "prediction_strength": round(weighted_strength, 3)
+        }
     
     def _determine_volatility_regime(self, volatility: float) -> str:
         """ボラティリティレジームを判定"""
@@ -344,159 +423,166 @@ class EnsembleModel:
     # モデル評価・分析
     # ===================================================================
     
-    def _calculate_model_agreement(self, sub_predictions: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_model_agreement(self, arrays: SubPredictionArrays) -> Dict[str, Any]:
         """モデル間の合意度を計算"""
-        try:
-            predicted_rates = [pred["predicted_rate"] for pred in sub_predictions.values()]
-            
-            if len(predicted_rates) < 2:
-                return {"agreement_score": 1.0, "consensus": "single_model"}
-            
-            # 予測値の分散を計算
-            rate_mean = mean(predicted_rates)
-            rate_variance = sum((rate - rate_mean) ** 2 for rate in predicted_rates) / len(predicted_rates)
-            rate_std = math.sqrt(rate_variance)
-            
-            # 合意度スコア（標準偏差が小さいほど高合意）
-            relative_disagreement = rate_std / rate_mean if rate_mean != 0 else 0
-            agreement_score = max(0.0, 1.0 - (relative_disagreement * 50))  # 正規化
-            
-            # 合意レベルの判定
-            if agreement_score > 0.8:
-                consensus = "high_agreement"
-            elif agreement_score > 0.6:
-                consensus = "moderate_agreement"
-            else:
-                consensus = "low_agreement"
-            
+        predicted_rates = arrays.fields[_RATE]
+        
+        if len(predicted_rates) < 2:
+            return {"agreement_score": 1.0, "consensus": "single_model"}
+        
+        # 全モデルの予測が一致している場合は統計計算を省略
+        rate_min = float(predicted_rates.min())
+        if float(predicted_rates.max()) - rate_min < 1e-9:
+            rate = round(rate_min, 4)
             return {
-                "agreement_score": round(agreement_score, 3),
-                "consensus": consensus,
-                "prediction_range": {
-                    "min": round(min(predicted_rates), 4),
-                    "max": round(max(predicted_rates), 4),
-                    "mean": round(rate_mean, 4),
-                    "std": round(rate_std, 4)
-                }
+                "agreement_score": 1.0,
+                "consensus": "high_agreement",
+                "prediction_range": {"min": rate, "max": rate, "mean": rate, "std": 0.0}
             }
-            
-        except Exception:
-            return {"agreement_score": 0.5, "consensus": "unknown"}
+        
+        # 予測値の平均・標準偏差（母標準偏差）を計算
+        rate_mean, rate_std, rate_min, rate_max = (
+            float(value) for value in kernels.summary_stats(predicted_rates)
+        )
+        
+        # 合意度スコア（標準偏差が小さいほど高合意）
+        relative_disagreement = rate_std / rate_mean if rate_mean != 0 else 0
+        agreement_score = max(0.0, 1.0 - (relative_disagreement * 50))  # 正規化
+        
+        # 合意レベルの判定
+        if agreement_score > 0.8:
+            consensus = "high_agreement"
+        elif agreement_score > 0.6:
+            consensus = "moderate_agreement"
+        else:
+            consensus = "low_agreement"
+        
+        return {
+            "agreement_score": round(agreement_score, 3),
+            "consensus": consensus,
+            "prediction_range": {
+                "min": round(rate_min, 4),
+                "max": round(rate_max, 4),
+                "mean": round(rate_mean, 4),
+                "std": round(rate_std, 4)
+            }
+        }
     
     def _quantify_uncertainty(
         self,
-        sub_predictions: Dict[str, Dict[str, Any]],
-        ensemble_prediction: Dict[str, Any]
+        ensemble_prediction: Dict[str, Any],
+        model_agreement: Dict[str, Any],
+        target_days: int
     ) -> Dict[str, Any]:
-        """不確実性を定量化"""
-        try:
-            # モデル不一致による不確実性
-            model_uncertainty = 1.0 - self._calculate_model_agreement(sub_predictions)["agreement_score"]
-            
-            # データ不確実性（ボラティリティベース）
-            volatility = ensemble_prediction["volatility"]["predicted"]
-            data_uncertainty = min(1.0, volatility / 0.30)  # 30%を最大として正規化
-            
-            # 時間軸不確実性（予測期間による）
-            # 注: target_daysが直接渡されていないので、サブ予測から推定
-            target_days = 7  # デフォルト値、実際は推定が必要
-            time_uncertainty = min(1.0, target_days / 30)  # 30日を最大として正規化
-            
-            # 総合不確実性
-            total_uncertainty = (model_uncertainty * 0.4 + 
-                               data_uncertainty * 0.4 + 
-                               time_uncertainty * 0.2)
-            
-            return {
-                "total_uncertainty": round(total_uncertainty, 3),
-                "model_uncertainty": round(model_uncertainty, 3),
-                "data_uncertainty": round(data_uncertainty, 3),
-                "time_uncertainty": round(time_uncertainty, 3),
-                "uncertainty_level": self._classify_uncertainty_level(total_uncertainty)
-            }
-            
-        except Exception:
-            return {
-                "total_uncertainty": 0.5,
-                "uncertainty_level": "medium"
-            }
-    
-    def _classify_uncertainty_level(self, uncertainty: float) -> str:
-        """不確実性レベルを分類"""
-        if uncertainty < 0.3:
-            return "low"
-        elif uncertainty < 0.6:
-            return "medium"
-        else:
-            return "high"
+        """不確実性を定量化（モデル合意度はpredictで計算済みのものを使用）"""
+        # モデル不一致による不確実性
+        model_uncertainty = 1.0 - model_agreement["agreement_score"]
+        
+        # データ不確実性（ボラティリティベース）
+        volatility = ensemble_prediction["volatility"]["predicted"]
+        data_uncertainty = min(1.0, volatility / 0.30)  # 30%を最大として正規化
+        
+        # 時間軸不確実性（予測期間による）
+        time_uncertainty = min(1.0, target_days / 30)  # 30日を最大として正規化
+        
+        # 総合不確実性
+        total_uncertainty = (model_uncertainty * 0.4 + 
+                           data_uncertainty * 0.4 + 
+                           time_uncertainty * 0.2)
+        
+        return {
+            "total_uncertainty": round(total_uncertainty, 3),
+            "model_uncertainty": round(model_uncertainty, 3),
+            "data_uncertainty": round(data_uncertainty, 3),
+            "time_uncertainty": round(time_uncertainty, 3),
+            "uncertainty_level": _UNCERTAINTY_LEVELS[
+                bisect.bisect_right(_UNCERTAINTY_THRESHOLDS, total_uncertainty)
+            ]
+        }
     
     def _assess_prediction_quality(
         self,
-        sub_predictions: Dict[str, Dict[str, Any]],
+        arrays: SubPredictionArrays,
         model_agreement: Dict[str, Any]
     ) -> Dict[str, Any]:
         """予測品質を評価"""
-        try:
-            # モデル合意度による品質評価
-            agreement_score = model_agreement["agreement_score"]
-            
-            # 各サブモデルの予測強度
-            strength_scores = [pred["prediction_strength"] for pred in sub_predictions.values()]
-            avg_strength = mean(strength_scores) if strength_scores else 0.5
-            
-            # 総合品質スコア
-            quality_score = (agreement_score * 0.6 + avg_strength * 0.4)
-            
-            # 品質レベルの判定
-            if quality_score > 0.8:
-                quality_level = "high"
-            elif quality_score > 0.6:
-                quality_level = "medium"
-            else:
-                quality_level = "low"
-            
-            return {
-                "quality_score": round(quality_score, 3),
-                "quality_level": quality_level,
-                "model_agreement_contribution": round(agreement_score * 0.6, 3),
-                "prediction_strength_contribution": round(avg_strength * 0.4, 3),
-                "recommendation": self._generate_quality_recommendation(quality_level)
-            }
-            
-        except Exception:
-            return {
-                "quality_score": 0.5,
-                "quality_level": "medium",
-                "recommendation": "標準的な信頼度で使用してください"
-            }
-    
-    def _generate_quality_recommendation(self, quality_level: str) -> str:
-        """品質レベルに応じた推奨事項を生成"""
-        recommendations = {
-            "high": "高い信頼度で予測を使用できます",
-            "medium": "標準的な信頼度で使用してください。他の情報と併用することを推奨します",
-            "low": "予測の信頼度が低いです。追加の分析や他の情報源との確認を強く推奨します"
+        # モデル合意度による品質評価
+        agreement_score = model_agreement["agreement_score"]
+        
+        # 各サブモデルの予測強度
+        strength_scores = arrays.fields[_STRENGTH]
+        avg_strength = float(strength_scores.mean()) if len(strength_scores) else 0.5
+        
+        # 総合品質スコア
+        quality_score = (agreement_score * 0.6 + avg_strength * 0.4)
+        
+        # 品質レベルの判定
+        if quality_score > 0.8:
+            quality_level = "high"
+        elif quality_score > 0.6:
+            quality_level = "medium"
+        else:
+            quality_level = "low"
+        
+        return {
+            "quality_score": round(quality_score, 3),
+            "quality_level": quality_level,
+            "model_agreement_contribution": round(agreement_score * 0.6, 3),
+            "prediction_strength_contribution": round(avg_strength * 0.4, 3),
+            "recommendation": _QUALITY_RECOMMENDATIONS.get(quality_level, _DEFAULT_RECOMMENDATION)
         }
-        return recommendations.get(quality_level, "予測を慎重に使用してください")
     
     # ===================================================================
     # 重み最適化
     # ===================================================================
     
     def _optimize_ensemble_weights(self, historical_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """アンサンブル重みを最適化（簡易実装）"""
+        """
+        アンサンブル重みを最適化（貪欲法によるアンサンブル選択）
+        
+        直近の検証期間で各サブモデルの1日先予測を一度だけ計算し、
+        二乗誤差が最小となるモデルを重複を許して繰り返し選択する。
+        選択回数の比率を新しい重みとする。
+        """
         try:
-            # 簡易的な性能評価による重み調整
-            # 実際の実装では交差検証や性能指標を使用
+            original_weights = self.model_weights.copy()
+            model_names = tuple(self.sub_models.keys())
+            
+            # 検証データ: 各時点までのデータで翌日のレートを予測
+            n_samples = min(ENSEMBLE_SELECTION_VALIDATION_DAYS, len(historical_data) - 1)
+            start = len(historical_data) - n_samples
+            targets = np.array(
+                [data["close_rate"] for data in historical_data[start:]], dtype=np.float64
+            )
+            predictions = np.array([
+                [
+                    self.sub_models[name].predict(
+                        1, historical_data[i - 1]["close_rate"], historical_data[:i]
+                    )["predicted_rate"]
+                    for i in range(start, len(historical_data))
+                ]
+                for name in model_names
+            ], dtype=np.float64)
+            
+            counts = _greedy_ensemble_selection(predictions, targets, ENSEMBLE_SELECTION_SIZE)
+            weights = counts / counts.sum()
+            
+            original = np.array([original_weights.get(name, 0.0) for name in model_names])
+            original_mse = float(np.mean((original @ predictions / original.sum() - targets) ** 2))
+            optimized_mse = float(np.mean((weights @ predictions - targets) ** 2))
+            
+            self.model_weights = {name: float(weight) for name, weight in zip(model_names, weights)}
             
             optimization_result = {
-                "method": "simple_performance_based",
-                "original_weights": self.model_weights.copy(),
-                "optimized_weights": self.model_weights.copy(),  # 今回は変更せず
-                "performance_improvement": 0.0
+                "method": "greedy_ensemble_selection",
+                "validation_samples": n_samples,
+                "ensemble_size": ENSEMBLE_SELECTION_SIZE,
+                "original_weights": original_weights,
+                "optimized_weights": self.model_weights.copy(),
+                "performance_improvement": original_mse - optimized_mse
             }
             
-            logger.info("重み最適化完了（簡易実装）")
+            logger.info(f"重み最適化完了: {self.model_weights}")
             return optimization_result
             
         except Exception as e:
@@ -531,20 +617,25 @@ class EnsembleModel:
     # モデル情報
     # ===================================================================
     
-    def get_model_info(self) -> Dict[str, Any]:
-        """アンサンブルモデル情報を取得"""
-        return {
+    def get_model_info(self, include_sub_models: bool = False) -> Dict[str, Any]:
+        """
+        アンサンブルモデル情報を取得
+        
+        Args:
+            include_sub_models: サブモデルの情報も含めるか（fit()までは前回の結果を再利用）
+        """
+        model_info = {
             "model_name": self.model_name,
             "model_type": "weighted_ensemble",
             "is_trained": self.is_trained,
-            "sub_models": {name: model.get_model_info() for name, model in self.sub_models.items()},
             "ensemble_weights": self.model_weights.copy(),
             "ensemble_config": self.ensemble_config.copy(),
-            "capabilities": {
-                "provides_model_agreement": True,
-                "provides_uncertainty_quantification": True,
-                "provides_quality_assessment": True,
-                "handles_model_disagreement": True,
-                "adaptive_weighting": False  # 今回は固定重み
-            }
-        }
\ No newline at end of file
+            "capabilities": _CAPABILITIES.copy()
+        }
+        if include_sub_models:
+            if self._sub_model_info is None:
+                self._sub_model_info = {
+                    name: model.get_model_info() for name, model in self.sub_models.items()
+                }
+            model_info["sub_models"] = copy.deepcopy(self._sub_model_info)
+        return model_info
@@ -430,6 +430,7 @@ class ActiveAlert(Base):
         Index('idx_active_alerts_setting_created', 'alert_setting_id', 'created_at'),
         Index('idx_active_alerts_severity', 'severity'),
         Index('idx_active_alerts_acknowledged', 'is_acknowledged'),
+        Index('idx_active_alerts_severity_ack_created', 'severity', 'is_acknowledged', created_at.desc()),
     )
 
 # ===================================================================
@@ -6,6 +6,8 @@ from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
+from ..core.clock import now_cached
+
 router = APIRouter()
 
 class Alert(BaseModel):
@@ -25,6 +27,7 @@ class AlertResponse(BaseModel):
 @router.get("/active", response_model=AlertResponse)
 async def get_active_alerts():
     """アクティブなアラートを取得"""
+    now = now_cached()
     # デモデータ
     alerts = [
         Alert(
@@ -32,7 +35,7 @@ async def get_active_alerts():
             type="price",
             severity="warning",
             message="USD/JPY が設定した閾値（150.00）を超えました",
-            timestamp=datetime.now(),
+            timestamp=now,
             is_read=False,
             currency_pair="USDJPY"
         ),
@@ -41,7 +44,7 @@ async def get_active_alerts():
             type="signal",
             severity="info",
             message="EUR/USD で買いシグナルが検出されました",
-            timestamp=datetime.now(),
+            timestamp=now,
             is_read=False,
             currency_pair="EURUSD"
         ),
@@ -50,7 +53,7 @@ async def get_active_alerts():
             type="news",
             severity="critical",
             message="重要な経済指標発表: 米国雇用統計",
-            timestamp=datetime.now(),
+            timestamp=now,
             is_read=False,
             currency_pair="USDJPY"
         )
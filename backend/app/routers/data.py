@@ -12,7 +12,7 @@ from typing import Optional, List
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_sync_db
 from ..core.dependencies import get_current_admin_user
 from ..models import User
 
@@ -48,7 +48,7 @@ router = APIRouter()
 
 @router.get("/status", response_model=DataStatusResponse)
 async def get_data_status(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_admin_user)
 ) -> DataStatusResponse:
     """
@@ -208,7 +208,7 @@ async def get_data_sources(
 @router.post("/collect", response_model=DataCollectionResponse)
 async def execute_data_collection(
     request: DataCollectionRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_admin_user)
 ) -> DataCollectionResponse:
     """
@@ -264,7 +264,7 @@ async def execute_data_collection(
 @router.get("/quality", response_model=DataQualityReport)
 async def get_data_quality_report(
     period_days: int = Query(7, ge=1, le=90, description="品質分析期間（日数）"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_admin_user)
 ) -> DataQualityReport:
     """
@@ -308,7 +308,7 @@ async def get_data_quality_report(
 @router.post("/repair", response_model=DataRepairResponse)
 async def execute_data_repair(
     request: DataRepairRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_sync_db),
     current_user: User = Depends(get_current_admin_user)
 ) -> DataRepairResponse:
     """
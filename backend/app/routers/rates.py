@@ -13,13 +13,13 @@ from sqlalchemy.orm import Session
 
 from ..schemas.rates_minimal import CurrentRateResponse
 from ..services.rates_service import RatesService
-from ..database import get_db
+from ..database import get_sync_db
 
 router = APIRouter()
 
 
 @router.get("/current", response_model=CurrentRateResponse)
-async def get_current_rate(db: Session = Depends(get_db)) -> CurrentRateResponse:
+async def get_current_rate(db: Session = Depends(get_sync_db)) -> CurrentRateResponse:
     """
     現在のドル円レートを取得
     
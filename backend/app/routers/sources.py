@@ -10,13 +10,14 @@ Data Sources API Router
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import List
 import uuid
 import os
 import logging
 
-from ..database import get_db
+from ..database import get_db, get_sync_db
 from ..schemas.sources import (
     SourcesStatusResponse,
     SourcesHealthResponse,
@@ -51,7 +52,7 @@ logger = logging.getLogger(__name__)
                200: {"description": "データソース状況取得成功"},
                500: {"model": SourcesErrorResponse, "description": "サーバーエラー"}
            })
-async def get_sources_status(db: Session = Depends(get_db)) -> SourcesStatusResponse:
+async def get_sources_status(db: Session = Depends(get_sync_db)) -> SourcesStatusResponse:
     """
     データソース稼働状況取得 (6.1)
     
@@ -79,7 +80,7 @@ async def get_sources_status(db: Session = Depends(get_db)) -> SourcesStatusResp
                200: {"description": "ヘルスチェック実行成功"},
                500: {"model": SourcesErrorResponse, "description": "サーバーエラー"}
            })
-async def check_sources_health(db: Session = Depends(get_db)) -> SourcesHealthResponse:
+async def check_sources_health(db: Session = Depends(get_sync_db)) -> SourcesHealthResponse:
     """
     ソースヘルスチェック (6.4)
     
@@ -110,7 +111,7 @@ async def check_sources_health(db: Session = Depends(get_db)) -> SourcesHealthRe
             })
 async def scrape_data(
     request: ScrapeRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> ScrapeResponse:
     """
     Webスクレイピング実行 (6.2)
@@ -206,7 +207,7 @@ async def scrape_data(
             })
 async def import_csv_data(
     request: CSVImportRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> CSVImportResponse:
     """
     CSV一括インポート実行 (6.3)
@@ -73,7 +73,7 @@ class CandlestickData(BaseModel):
     is_holiday: bool = Field(False, description="祝日フラグ")
     source: str = Field("yahoo_finance", description="データソース")
 
-    model_config = ConfigDict(from_attributes=True, protected_namespaces=())
+    model_config = ConfigDict(from_attributes=True, protected_namespaces=(), frozen=True)
 
 
 class MovingAverageData(BaseModel):
@@ -85,7 +85,7 @@ class MovingAverageData(BaseModel):
     ema_12: Optional[float] = Field(None, description="12期間指数移動平均", gt=0)
     ema_26: Optional[float] = Field(None, description="26期間指数移動平均", gt=0)
 
-    model_config = ConfigDict(from_attributes=True, protected_namespaces=())
+    model_config = ConfigDict(from_attributes=True, protected_namespaces=(), frozen=True)
 
 
 class RSIData(BaseModel):
@@ -0,0 +1,339 @@
+"""
+テクニカル指標計算カーネル
+==========================
+
+IndicatorsService の数値計算ループを Numba で JIT コンパイルしたカーネル群
+- 入力は連続した float64 の numpy 配列
+- numba 未インストール環境では同じコードを純Pythonとして実行する
+"""
+
+import numpy as np
+
+from ..core.numba_compat import NUMBA_AVAILABLE, njit
+
+
+def as_price_array(values) -> np.ndarray:
+    """価格列を連続したfloat64配列に変換"""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+# ===================================================================
+# 移動平均
+# ===================================================================
+
+@njit(cache=True)
+def sma_at(close, index, period):
+    """index時点の単純移動平均（計算不可時はNaN）"""
+    if index < period - 1 or close.shape[0] <= index:
+        return np.nan
+    total = 0.0
+    for i in range(index - period + 1, index + 1):
+        total += close[i]
+    return total / period
+
+
+@njit(cache=True)
+def ema_last(close, period):
+    """指数移動平均の最新値（初期値はSMA、計算不可時はNaN）"""
+    n = close.shape[0]
+    if n < period:
+        return np.nan
+    multiplier = 2.0 / (period + 1)
+    ema = 0.0
+    for i in range(period):
+        ema += close[i]
+    ema /= period
+    for i in range(period, n):
+        ema = (close[i] - ema) * multiplier + ema
+    return ema
+
+
+# ===================================================================
+# オシレーター・モメンタム
+# ===================================================================
+
+@njit(cache=True, fastmath=True)
+def rsi_last(close, period):
+    """直近period本の平均上昇幅/下落幅によるRSI"""
+    n = close.shape[0]
+    if n <= period:
+        return 50.0
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(n - period, n):
+        change = close[i] - close[i - 1]
+        if change > 0:
+            avg_gain += change
+        else:
+            avg_loss -= change
+    avg_gain /= period
+    avg_loss /= period
+    if avg_loss == 0:
+        return 100.0
+    rs = avg_gain / avg_loss
+    return 100.0 - (100.0 / (1.0 + rs))
+
+
+@njit(cache=True, fastmath=True)
+def macd_last(close):
+    """MACD（ライン・シグナル・ヒストグラム、シグナルは簡易版）"""
+    if close.shape[0] < 26:
+        return 0.0, 0.0, 0.0
+    macd_line = ema_last(close, 12) - ema_last(close, 26)
+    macd_signal = macd_line * 0.9  # 簡易実装
+    return macd_line, macd_signal, macd_line - macd_signal
+
+
+@njit(cache=True, fastmath=True)
+def stochastic_last(high, low, close, k_period):
+    """最新の%K（%Dは簡易的に%Kと同値）"""
+    n = close.shape[0]
+    if n < k_period:
+        return 50.0, 50.0
+    highest_high = high[n - k_period]
+    lowest_low = low[n - k_period]
+    for i in range(n - k_period + 1, n):
+        if high[i] > highest_high:
+            highest_high = high[i]
+        if low[i] < lowest_low:
+            lowest_low = low[i]
+    if highest_high == lowest_low:
+        stoch_k = 50.0
+    else:
+        stoch_k = (close[n - 1] - lowest_low) / (highest_high - lowest_low) * 100.0
+    return stoch_k, stoch_k
+
+
+# ===================================================================
+# ボラティリティ
+# ===================================================================
+
+@njit(cache=True)
+def welford_mean_var(values, start, stop):
+    """Welford法による平均と母分散（区間 [start, stop)）"""
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(start, stop):
+        count += 1
+        delta = values[i] - mean
+        mean += delta / count
+        m2 += delta * (values[i] - mean)
+    if count == 0:
+        return np.nan, np.nan
+    return mean, m2 / count
+
+
+@njit(cache=True)
+def bollinger_last(close, period, std_multiplier):
+    """最新のボリンジャーバンド（上限・中央・下限・バンド幅）"""
+    n = close.shape[0]
+    middle, variance = welford_mean_var(close, n - period, n)
+    std_dev = np.sqrt(variance)
+    upper = middle + std_multiplier * std_dev
+    lower = middle - std_multiplier * std_dev
+    return upper, middle, lower, upper - lower
+
+
+@njit(cache=True)
+def annualized_return_volatility(close, window, periods_per_year):
+    """先頭window本の単純リターンの標本標準偏差を年率換算"""
+    n = min(window, close.shape[0])
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(1, n):
+        ret = (close[i] - close[i - 1]) / close[i - 1]
+        count += 1
+        delta = ret - mean
+        mean += delta / count
+        m2 += delta * (ret - mean)
+    if count < 2:
+        return np.nan
+    return np.sqrt(m2 / (count - 1)) * np.sqrt(periods_per_year)
+
+
+@njit(cache=True, fastmath=True)
+def true_range(high, low, close):
+    """各足のTrue Range（先頭足を除くn-1本）"""
+    n = close.shape[0]
+    out = np.empty(max(n - 1, 0), dtype=np.float64)
+    for i in range(1, n):
+        tr = high[i] - low[i]
+        tr_high = abs(high[i] - close[i - 1])
+        tr_low = abs(low[i] - close[i - 1])
+        if tr_high > tr:
+            tr = tr_high
+        if tr_low > tr:
+            tr = tr_low
+        out[i - 1] = tr
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def atr_last(high, low, close, period):
+    """直近period本のTrue Range平均（ATR）"""
+    if close.shape[0] < 2:
+        return 1.0
+    tr = true_range(high, low, close)
+    m = tr.shape[0]
+    count = period if m >= period else m
+    total = 0.0
+    for i in range(m - count, m):
+        total += tr[i]
+    return total / count
+
+
+# ===================================================================
+# 時系列（チャート用、全バー分を一括計算）
+# ===================================================================
+
+@njit(cache=True)
+def rolling_mean(values, window):
+    """ローリング平均（先頭window-1本はNaN、窓ごとに先頭から加算）"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        total = 0.0
+        for j in range(i - window + 1, i + 1):
+            total += values[j]
+        out[i] = total / window
+    return out
+
+
+@njit(cache=True)
+def expanding_rolling_mean(values, window):
+    """直近最大window本の平均（先頭はデータ数分のみで平均）"""
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        start = max(0, i - window + 1)
+        total = 0.0
+        for j in range(start, i + 1):
+            total += values[j]
+        out[i] = total / (i + 1 - start)
+    return out
+
+
+@njit(cache=True)
+def trailing_signal(raw, rounded, window):
+    """
+    シグナル線（直前window-1本の丸め済み値と当該バーの値の平均）
+
+    先頭window-1本は当該バーの値をそのまま返す
+    """
+    n = raw.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    for k in range(n):
+        if k < window - 1:
+            out[k] = raw[k]
+        else:
+            total = 0.0
+            for j in range(k - window + 1, k):
+                total += rounded[j]
+            out[k] = (total + raw[k]) / window
+    return out
+
+
+@njit(cache=True)
+def rsi_series(close, period):
+    """各バーのRSI（先頭period本はNaN）"""
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    for i in range(period, n):
+        avg_gain = 0.0
+        avg_loss = 0.0
+        for j in range(i - period + 1, i + 1):
+            change = close[j] - close[j - 1]
+            if change > 0:
+                avg_gain += change
+            else:
+                avg_loss -= change
+        avg_gain /= period
+        avg_loss /= period
+        if avg_loss == 0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+    return out
+
+
+@njit(cache=True)
+def bollinger_series(close, period, std_multiplier):
+    """各バーのボリンジャーバンド（上限・中央・下限、先頭period-1本はNaN）"""
+    n = close.shape[0]
+    upper = np.full(n, np.nan)
+    middle = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    for i in range(period - 1, n):
+        # 中央線は単純平均、分散はWelford法で計算
+        total = 0.0
+        for j in range(i - period + 1, i + 1):
+            total += close[j]
+        mean = total / period
+        _, variance = welford_mean_var(close, i - period + 1, i + 1)
+        std_dev = np.sqrt(variance)
+        middle[i] = mean
+        upper[i] = mean + std_multiplier * std_dev
+        lower[i] = mean - std_multiplier * std_dev
+    return upper, middle, lower
+
+
+@njit(cache=True)
+def stochastic_k_series(high, low, close, k_period):
+    """各バーの%K（先頭k_period-1本はNaN）"""
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    for i in range(k_period - 1, n):
+        highest_high = high[i - k_period + 1]
+        lowest_low = low[i - k_period + 1]
+        for j in range(i - k_period + 2, i + 1):
+            if high[j] > highest_high:
+                highest_high = high[j]
+            if low[j] < lowest_low:
+                lowest_low = low[j]
+        if highest_high == lowest_low:
+            out[i] = 50.0
+        else:
+            out[i] = (close[i] - lowest_low) / (highest_high - lowest_low) * 100.0
+    return out
+
+
+@njit(cache=True, fastmath=True)
+def true_range_series(high, low, close):
+    """各バーのTrue Range（先頭足は高値-安値）"""
+    n = close.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+    out[0] = high[0] - low[0]
+    out[1:] = true_range(high, low, close)
+    return out
+
+
+# ===================================================================
+# ウォームアップ
+# ===================================================================
+
+def _warm_up() -> None:
+    """import時に小さな入力で各カーネルをコンパイル（初回リクエストのJITコストを回避）"""
+    sample = np.array([1.0, 1.0], dtype=np.float64)
+    sma_at(sample, 1, 2)
+    ema_last(sample, 1)
+    rsi_last(sample, 1)
+    macd_last(sample)
+    stochastic_last(sample, sample, sample, 1)
+    bollinger_last(sample, 2, 2.0)
+    annualized_return_volatility(sample, 2, 252)
+    atr_last(sample, sample, sample, 1)
+    rolling_mean(sample, 2)
+    expanding_rolling_mean(sample, 2)
+    trailing_signal(sample, sample, 2)
+    rsi_series(sample, 1)
+    bollinger_series(sample, 2, 2.0)
+    stochastic_k_series(sample, sample, sample, 1)
+    true_range_series(sample, sample, sample)
+
+
+if NUMBA_AVAILABLE:
+    _warm_up()
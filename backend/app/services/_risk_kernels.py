@@ -0,0 +1,300 @@
+"""
+バックテスト・リスク指標計算カーネル
+====================================
+
+BacktestService / MetricsService の時系列ループを Numba で JIT コンパイルしたカーネル群
+- 売買シミュレーション（バー単位ループ）
+- ローリング標準偏差（スライディングWelford法）
+- ヒストリカルVaR（クイックセレクトによる分位点選択）
+- ドローダウン系列と継続期間
+- numba 未インストール環境では同じコードを純Pythonとして実行する
+"""
+
+import numpy as np
+
+from ..core.numba_compat import NUMBA_AVAILABLE, njit
+
+
+# シグナルコード
+SIGNAL_NONE = 0
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+
+
+# ===================================================================
+# 売買シミュレーション
+# ===================================================================
+
+@njit(cache=True)
+def simulate_trades(close, signal, confidence, initial_capital, min_confidence):
+    """
+    バー単位の売買シミュレーション
+
+    買い: 現金がレート×1000を超える場合に現金の20%でUSDを購入
+    売り: 保有USDの半分を売却し、未決済の直前の取引を決済
+
+    Returns:
+        (cash, position, trade_bar, trade_side, trade_size, trade_exit_bar, trade_pnl,
+         final_capital, final_position)
+        cash/position は各バー開始時点の値、trade_* は取引順の配列
+    """
+    n = close.shape[0]
+    cash = np.empty(n, dtype=np.float64)
+    position = np.empty(n, dtype=np.float64)
+    trade_bar = np.empty(n, dtype=np.int64)
+    trade_side = np.empty(n, dtype=np.int64)
+    trade_size = np.empty(n, dtype=np.float64)
+    trade_exit_bar = np.empty(n, dtype=np.int64)
+    trade_pnl = np.empty(n, dtype=np.float64)
+
+    capital = initial_capital
+    pos = 0.0
+    n_trades = 0
+
+    for i in range(n):
+        rate = close[i]
+        cash[i] = capital
+        position[i] = pos
+
+        if signal[i] == SIGNAL_NONE or confidence[i] < min_confidence:
+            continue
+
+        if signal[i] == SIGNAL_BUY:
+            if capital > rate * 1000:
+                trade_amount = min(capital * 0.2, capital)
+                usd_amount = trade_amount / rate
+                pos += usd_amount
+                capital -= trade_amount
+
+                trade_bar[n_trades] = i
+                trade_side[n_trades] = SIGNAL_BUY
+                trade_size[n_trades] = usd_amount
+                trade_exit_bar[n_trades] = -1
+                trade_pnl[n_trades] = 0.0
+                n_trades += 1
+
+        elif signal[i] == SIGNAL_SELL and pos > 0:
+            sell_amount = pos * 0.5
+            capital += sell_amount * rate
+            pos -= sell_amount
+
+            # 直前の未決済取引を決済
+            if n_trades > 0 and trade_exit_bar[n_trades - 1] == -1:
+                last = n_trades - 1
+                trade_exit_bar[last] = i
+                trade_pnl[last] = sell_amount * (rate - close[trade_bar[last]])
+
+            trade_bar[n_trades] = i
+            trade_side[n_trades] = SIGNAL_SELL
+            trade_size[n_trades] = sell_amount
+            trade_exit_bar[n_trades] = i
+            trade_pnl[n_trades] = 0.0
+            n_trades += 1
+
+    return (
+        cash,
+        position,
+        trade_bar[:n_trades],
+        trade_side[:n_trades],
+        trade_size[:n_trades],
+        trade_exit_bar[:n_trades],
+        trade_pnl[:n_trades],
+        capital,
+        pos,
+    )
+
+
+# ===================================================================
+# リターン・標準偏差
+# ===================================================================
+
+@njit(cache=True)
+def simple_returns(values):
+    """単純リターン系列（長さn-1）"""
+    n = values.shape[0]
+    out = np.empty(max(n - 1, 0), dtype=np.float64)
+    for i in range(1, n):
+        out[i - 1] = (values[i] - values[i - 1]) / values[i - 1]
+    return out
+
+
+@njit(cache=True)
+def welford_std(values, ddof):
+    """Welford法による標準偏差（要素数がddof以下なら0）"""
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(values.shape[0]):
+        count += 1
+        delta = values[i] - mean
+        mean += delta / count
+        m2 += delta * (values[i] - mean)
+    if count <= ddof:
+        return 0.0
+    return np.sqrt(m2 / (count - ddof))
+
+
+@njit(cache=True)
+def rolling_std(values, window, ddof):
+    """
+    スライディングWelford法によるローリング標準偏差
+
+    out[j] は values[j-window+1 : j+1] の標準偏差（j < window-1 はNaN）
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    if window <= ddof or n < window:
+        return out
+
+    mean = 0.0
+    m2 = 0.0
+    for i in range(window):
+        delta = values[i] - mean
+        mean += delta / (i + 1)
+        m2 += delta * (values[i] - mean)
+    out[window - 1] = np.sqrt(max(m2, 0.0) / (window - ddof))
+
+    for j in range(window, n):
+        x_new = values[j]
+        x_old = values[j - window]
+        new_mean = mean + (x_new - x_old) / window
+        m2 += (x_new - x_old) * (x_new - new_mean + x_old - mean)
+        mean = new_mean
+        out[j] = np.sqrt(max(m2, 0.0) / (window - ddof))
+    return out
+
+
+# ===================================================================
+# VaR
+# ===================================================================
+
+@njit(cache=True)
+def quickselect(values, k):
+    """k番目に小さい値を平均O(n)で選択（入力は変更しない）"""
+    work = values.copy()
+    left = 0
+    right = work.shape[0] - 1
+    while left < right:
+        # 中央値の3点推定でピボットを選択
+        mid = (left + right) // 2
+        a = work[left]
+        b = work[mid]
+        c = work[right]
+        if a < b:
+            pivot = b if b < c else (c if a < c else a)
+        else:
+            pivot = a if a < c else (c if b < c else b)
+
+        i = left
+        j = right
+        while i <= j:
+            while work[i] < pivot:
+                i += 1
+            while work[j] > pivot:
+                j -= 1
+            if i <= j:
+                tmp = work[i]
+                work[i] = work[j]
+                work[j] = tmp
+                i += 1
+                j -= 1
+        if k <= j:
+            right = j
+        elif k >= i:
+            left = i
+        else:
+            break
+    return work[k]
+
+
+@njit(cache=True)
+def historical_var(returns, confidence_level):
+    """
+    ヒストリカルVaRとExpected Shortfall（リターン値）
+
+    VaRは下位(1-信頼水準)分位点、ESはVaR以下のリターンの平均
+    """
+    n = returns.shape[0]
+    var_index = int((1 - confidence_level) * n)
+    if var_index >= n:
+        var_index = 0
+    var_return = quickselect(returns, var_index)
+
+    tail_sum = 0.0
+    tail_count = 0
+    for i in range(n):
+        if returns[i] <= var_return:
+            tail_sum += returns[i]
+            tail_count += 1
+    es_return = tail_sum / tail_count if tail_count > 0 else var_return
+    return var_return, es_return
+
+
+# ===================================================================
+# ドローダウン
+# ===================================================================
+
+@njit(cache=True)
+def drawdown_series(values):
+    """累積最大値からの下落率（%、0以下）"""
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+    running_max = values[0]
+    for i in range(n):
+        if values[i] > running_max:
+            running_max = values[i]
+        out[i] = (values[i] - running_max) / running_max * 100
+    return out
+
+
+@njit(cache=True)
+def drawdown_durations(drawdowns, threshold):
+    """閾値を下回るドローダウンの現在継続期間と最大継続期間"""
+    max_duration = 0
+    duration = 0
+    for i in range(drawdowns.shape[0]):
+        if drawdowns[i] < threshold:
+            duration += 1
+            if duration > max_duration:
+                max_duration = duration
+        else:
+            duration = 0
+    return duration, max_duration
+
+
+@njit(cache=True)
+def max_drawdown_ratio(values):
+    """最大ドローダウン（比率、ピークは0から開始）"""
+    peak = 0.0
+    max_dd = 0.0
+    for i in range(values.shape[0]):
+        if values[i] > peak:
+            peak = values[i]
+        if peak > 0:
+            dd = (peak - values[i]) / peak
+            if dd > max_dd:
+                max_dd = dd
+    return max_dd
+
+
+# ===================================================================
+# ウォームアップ
+# ===================================================================
+
+def _warm_up() -> None:
+    """import時に小さな入力で各カーネルをコンパイル（初回リクエストのJITコストを回避）"""
+    sample = np.array([1.0, 1.0], dtype=np.float64)
+    codes = np.zeros(2, dtype=np.int64)
+    simulate_trades(sample, codes, sample, 1.0, 0.6)
+    simple_returns(sample)
+    welford_std(sample, 0)
+    rolling_std(sample, 2, 1)
+    historical_var(sample, 0.95)
+    drawdown_durations(drawdown_series(sample), -0.1)
+    max_drawdown_ratio(sample)
+
+
+if NUMBA_AVAILABLE:
+    _warm_up()
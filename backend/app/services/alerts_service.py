@@ -11,7 +11,7 @@ from decimal import Decimal
 from typing import Optional, List, Dict, Any
 import json
 import logging
-from sqlalchemy import select, desc, and_, func, or_
+from sqlalchemy import select, update, desc, and_, func, or_, case
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import (
@@ -82,8 +82,8 @@ class AlertsService:
         # アクティブアラートを取得（優先度順）
         alerts = await self._get_prioritized_alerts()
         
-        # サマリー情報を計算
-        summary = await self._calculate_alert_summary(alerts)
+        # サマリー情報を計算（重要度別の集計はDB側で実行）
+        summary = await self._calculate_alert_summary()
         
         return ActiveAlertsResponse(
             alerts=alerts,
@@ -91,19 +91,23 @@ class AlertsService:
         )
     
     async def acknowledge_alerts(self, request: AlertAcknowledgeRequest) -> Dict[str, Any]:
-        """アラートを確認済みにする"""
+        """アラートを確認済みにする（単一のUPDATE文で一括更新）"""
         acknowledged_count = 0
         acknowledged_at = datetime.now()
         
-        for alert_id in request.alert_ids:
-            stmt = select(ActiveAlert).where(ActiveAlert.id == alert_id)
+        if request.alert_ids:
+            stmt = (
+                update(ActiveAlert)
+                .where(
+                    and_(
+                        ActiveAlert.id.in_(request.alert_ids),
+                        ActiveAlert.is_acknowledged.is_not(True)
+                    )
+                )
+                .values(is_acknowledged=True, acknowledged_at=acknowledged_at)
+            )
             result = await self.db.execute(stmt)
-            alert = result.scalar_one_or_none()
-            
-            if alert and not alert.is_acknowledged:
-                alert.is_acknowledged = True
-                alert.acknowledged_at = acknowledged_at
-                acknowledged_count += 1
+            acknowledged_count = result.rowcount
         
         if acknowledged_count > 0:
             await self.db.commit()
@@ -124,7 +128,7 @@ class AlertsService:
             .order_by(
                 ActiveAlert.is_acknowledged.asc(),  # 未確認を先に
                 desc(
-                    func.case(
+                    case(
                         (ActiveAlert.severity == 'critical', 4),
                         (ActiveAlert.severity == 'high', 3),
                         (ActiveAlert.severity == 'medium', 2),
@@ -145,26 +149,37 @@ class AlertsService:
         
         return responses
     
-    async def _calculate_alert_summary(
-        self, 
-        alerts: List[ActiveAlertResponse]
-    ) -> Dict[str, Any]:
-        """アラートサマリー情報を計算"""
-        total_alerts = len(alerts)
-        unacknowledged_alerts = [a for a in alerts if not a.is_acknowledged]
-        unacknowledged_count = len(unacknowledged_alerts)
-        critical_count = len([a for a in alerts if a.severity == "critical"])
+    async def _calculate_alert_summary(self) -> Dict[str, Any]:
+        """
+        アラートサマリー情報を計算
+        
+        重要度別の件数・未確認件数・最新時刻を1回のGROUP BYクエリで集計する
+        """
+        stmt = (
+            select(
+                ActiveAlert.severity,
+                func.count().label("total"),
+                func.count().filter(
+                    ActiveAlert.is_acknowledged.is_not(True)
+                ).label("unacknowledged"),
+                func.max(ActiveAlert.created_at).label("latest_created_at")
+            )
+            .group_by(ActiveAlert.severity)
+        )
+        result = await self.db.execute(stmt)
+        rows = result.all()
         
         # 重要度別カウント
-        counts_by_severity = {}
-        for alert in alerts:
-            severity = alert.severity
-            counts_by_severity[severity] = counts_by_severity.get(severity, 0) + 1
+        counts_by_severity = {row.severity: row.total for row in rows}
+        
+        total_alerts = sum(counts_by_severity.values())
+        unacknowledged_count = sum(row.unacknowledged for row in rows)
+        critical_count = counts_by_severity.get("critical", 0)
         
         # 最新アラート時刻
         latest_alert_at = max(
-            [alert.created_at for alert in alerts]
-        ) if alerts else None
+            (row.latest_created_at for row in rows), default=None
+        )
         
         # UI制御フラグ
         show_notification_badge = unacknowledged_count > 0
@@ -10,13 +10,15 @@ import json
 import uuid
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator
 import asyncio
 import logging
 
+import numpy as np
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func, desc
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, load_only
 
 from app.models import (
     BacktestResult, 
@@ -36,9 +38,60 @@ from app.schemas.backtest import (
     PredictionModelType,
     BacktestStatusType
 )
+from app.services import _risk_kernels as kernels
 
 logger = logging.getLogger(__name__)
 
+# 予測シグナル → カーネル用シグナルコード
+_SIGNAL_CODES = {'buy': kernels.SIGNAL_BUY, 'sell': kernels.SIGNAL_SELL}
+
+# 取引履歴ストリーミング用シリアライザ
+_TRADE_STREAM_CHUNK_SIZE = 100
+_TRADES_RESPONSE_ADAPTER = TypeAdapter(BacktestTradesResponse)
+_TRADE_RECORDS_ADAPTER = TypeAdapter(List[TradeRecord])
+
+# 結果・指標レスポンスで参照する列（取引ログ等の大きな列は必要な場合のみ読み込む）
+_RESULT_COLUMNS = (
+    BacktestResult.job_id,
+    BacktestResult.status,
+    BacktestResult.start_date,
+    BacktestResult.end_date,
+    BacktestResult.initial_capital,
+    BacktestResult.model_type,
+    BacktestResult.execution_time,
+    BacktestResult.completed_at,
+    BacktestResult.error_message,
+    BacktestResult.total_return,
+    BacktestResult.annualized_return,
+    BacktestResult.volatility,
+    BacktestResult.sharpe_ratio,
+    BacktestResult.max_drawdown,
+    BacktestResult.total_trades,
+    BacktestResult.winning_trades,
+    BacktestResult.losing_trades,
+    BacktestResult.win_rate,
+)
+_METRICS_COLUMNS = (
+    BacktestResult.job_id,
+    BacktestResult.total_return,
+    BacktestResult.annualized_return,
+    BacktestResult.volatility,
+    BacktestResult.sharpe_ratio,
+    BacktestResult.max_drawdown,
+    BacktestResult.total_trades,
+    BacktestResult.winning_trades,
+    BacktestResult.losing_trades,
+    BacktestResult.win_rate,
+    BacktestResult.prediction_accuracy_1w,
+    BacktestResult.prediction_accuracy_2w,
+    BacktestResult.prediction_accuracy_3w,
+    BacktestResult.prediction_accuracy_1m,
+    BacktestResult.trade_log,
+)
+
+# 為替データをサーバーサイドカーソルで取得する際のバッチ行数
+_EXCHANGE_DATA_BATCH_SIZE = 2048
+
 
 class BacktestService:
     """バックテストサービス"""
@@ -109,7 +162,11 @@ class BacktestService:
         Returns:
             BacktestResultsResponse: バックテスト結果
         """
-        stmt = select(BacktestResult).where(BacktestResult.job_id == job_id)
+        stmt = (
+            select(BacktestResult)
+            .options(load_only(*_RESULT_COLUMNS))
+            .where(BacktestResult.job_id == job_id)
+        )
         result = await self.db.execute(stmt)
         backtest_result = result.scalar_one_or_none()
         
@@ -147,10 +204,14 @@ class BacktestService:
         Returns:
             BacktestMetricsResponse: 詳細評価指標
         """
-        stmt = select(BacktestResult).where(
-            and_(
-                BacktestResult.job_id == job_id,
-                BacktestResult.status == BacktestStatus.COMPLETED
+        stmt = (
+            select(BacktestResult)
+            .options(load_only(*_METRICS_COLUMNS))
+            .where(
+                and_(
+                    BacktestResult.job_id == job_id,
+                    BacktestResult.status == BacktestStatus.COMPLETED
+                )
             )
         )
         result = await self.db.execute(stmt)
@@ -198,36 +259,76 @@ class BacktestService:
         Returns:
             BacktestTradesResponse: 取引履歴
         """
-        stmt = select(BacktestResult).where(BacktestResult.job_id == job_id)
-        result = await self.db.execute(stmt)
-        backtest_result = result.scalar_one_or_none()
-        
-        if not backtest_result or not backtest_result.trade_log:
+        trade_log = await self._load_trade_log(job_id)
+        if not trade_log:
             return None
         
-        trade_log = json.loads(backtest_result.trade_log)
-        
         # ページネーション
         offset = (page - 1) * page_size
-        paginated_trades = trade_log[offset:offset + page_size]
-        
-        # TradeRecordに変換
         trade_records = [
-            TradeRecord(
-                trade_date=datetime.fromisoformat(trade['trade_date']).date(),
-                signal_type=trade['signal_type'],
-                entry_rate=Decimal(str(trade['entry_rate'])),
-                exit_rate=Decimal(str(trade['exit_rate'])) if trade.get('exit_rate') else None,
-                position_size=Decimal(str(trade['position_size'])),
-                profit_loss=Decimal(str(trade['profit_loss'])) if trade.get('profit_loss') else None,
-                holding_period=trade.get('holding_period'),
-                confidence=Decimal(str(trade['confidence'])),
-                market_volatility=Decimal(str(trade['market_volatility'])) if trade.get('market_volatility') else None
-            )
-            for trade in paginated_trades
+            self._to_trade_record(trade)
+            for trade in trade_log[offset:offset + page_size]
         ]
         
-        # 統計サマリーを計算
+        return self._summarize_trades(job_id, trade_log, page, page_size, trade_records)
+
+    async def stream_trades(self, job_id: str, page: int, page_size: int) -> Optional[AsyncIterator[bytes]]:
+        """
+        バックテスト取引履歴をJSONチャンクとして逐次生成する
+        
+        get_tradesと同じ形式のJSONオブジェクトを返すが、ページ内の取引記録は
+        一定件数ずつシリアライズして送出するため、ページ全体のモデルを保持しない
+        
+        Args:
+            job_id: ジョブID
+            page: ページ番号
+            page_size: ページサイズ
+            
+        Returns:
+            AsyncIterator[bytes]: JSONチャンクのイテレーター（ジョブが存在しない場合はNone）
+        """
+        trade_log = await self._load_trade_log(job_id)
+        if not trade_log:
+            return None
+        
+        offset = (page - 1) * page_size
+        summary = self._summarize_trades(job_id, trade_log, page, page_size, [])
+        return self._iter_trades_json(summary, trade_log[offset:offset + page_size])
+
+    async def _load_trade_log(self, job_id: str) -> Optional[List[Dict]]:
+        """取引ログ列のみを読み込んでデコードする"""
+        stmt = select(BacktestResult.trade_log).where(BacktestResult.job_id == job_id)
+        result = await self.db.execute(stmt)
+        trade_log = result.scalar_one_or_none()
+        
+        if not trade_log:
+            return None
+        return json.loads(trade_log)
+
+    @staticmethod
+    def _to_trade_record(trade: Dict) -> TradeRecord:
+        """取引ログの1件をTradeRecordに変換"""
+        return TradeRecord(
+            trade_date=datetime.fromisoformat(trade['trade_date']).date(),
+            signal_type=trade['signal_type'],
+            entry_rate=Decimal(str(trade['entry_rate'])),
+            exit_rate=Decimal(str(trade['exit_rate'])) if trade.get('exit_rate') else None,
+            position_size=Decimal(str(trade['position_size'])),
+            profit_loss=Decimal(str(trade['profit_loss'])) if trade.get('profit_loss') else None,
+            holding_period=trade.get('holding_period'),
+            confidence=Decimal(str(trade['confidence'])),
+            market_volatility=Decimal(str(trade['market_volatility'])) if trade.get('market_volatility') else None
+        )
+
+    @staticmethod
+    def _summarize_trades(
+        job_id: str,
+        trade_log: List[Dict],
+        page: int,
+        page_size: int,
+        trade_records: List[TradeRecord]
+    ) -> BacktestTradesResponse:
+        """ページング情報と統計サマリーを付与したレスポンスを生成"""
         profit_trades = sum(1 for t in trade_log if t.get('profit_loss', 0) > 0)
         loss_trades = sum(1 for t in trade_log if t.get('profit_loss', 0) < 0)
         profits = [t['profit_loss'] for t in trade_log if t.get('profit_loss', 0) > 0]
@@ -248,6 +349,18 @@ class BacktestService:
             largest_loss=Decimal(str(min(losses))) if losses else Decimal('0')
         )
 
+    async def _iter_trades_json(self, summary: BacktestTradesResponse, trades: List[Dict]) -> AsyncIterator[bytes]:
+        """サマリー → 取引記録（チャンク単位） → 終端の順にJSONを生成"""
+        head = _TRADES_RESPONSE_ADAPTER.dump_json(summary, exclude={'trades'})
+        yield head[:-1] + b',"trades":['
+        
+        for start in range(0, len(trades), _TRADE_STREAM_CHUNK_SIZE):
+            records = [self._to_trade_record(trade) for trade in trades[start:start + _TRADE_STREAM_CHUNK_SIZE]]
+            body = _TRADE_RECORDS_ADAPTER.dump_json(records)[1:-1]
+            yield body if start == 0 else b',' + body
+        
+        yield b']}'
+
     async def _validate_data_availability(self, start_date: date, end_date: date) -> None:
         """データの存在を確認する"""
         stmt = select(func.count(ExchangeRate.id)).where(
@@ -351,27 +464,45 @@ class BacktestService:
         }
 
     async def _get_exchange_data(self, start_date: date, end_date: date) -> List[Dict]:
-        """為替データを取得する"""
-        stmt = select(ExchangeRate).where(
-            and_(
-                ExchangeRate.date >= start_date,
-                ExchangeRate.date <= end_date
+        """
+        為替データを取得する
+        
+        必要な列のみをサーバーサイドカーソルでバッチ取得し、
+        全行のORMオブジェクトを同時に保持しない
+        """
+        stmt = (
+            select(
+                ExchangeRate.date,
+                ExchangeRate.open_rate,
+                ExchangeRate.high_rate,
+                ExchangeRate.low_rate,
+                ExchangeRate.close_rate
+            )
+            .where(
+                and_(
+                    ExchangeRate.date >= start_date,
+                    ExchangeRate.date <= end_date
+                )
             )
-        ).order_by(ExchangeRate.date)
+            .order_by(ExchangeRate.date)
+            .execution_options(yield_per=_EXCHANGE_DATA_BATCH_SIZE)
+        )
         
-        result = await self.db.execute(stmt)
-        exchange_rates = result.scalars().all()
+        result = await self.db.stream(stmt)
+        exchange_data = []
+        async for partition in result.partitions():
+            exchange_data.extend(
+                {
+                    'date': rate_date,
+                    'open': float(open_rate) if open_rate else None,
+                    'high': float(high_rate) if high_rate else None,
+                    'low': float(low_rate) if low_rate else None,
+                    'close': float(close_rate)
+                }
+                for rate_date, open_rate, high_rate, low_rate, close_rate in partition
+            )
         
-        return [
-            {
-                'date': rate.date,
-                'open': float(rate.open_rate) if rate.open_rate else None,
-                'high': float(rate.high_rate) if rate.high_rate else None,
-                'low': float(rate.low_rate) if rate.low_rate else None,
-                'close': float(rate.close_rate)
-            }
-            for rate in exchange_rates
-        ]
+        return exchange_data
 
     async def _get_or_generate_predictions(self, config: BacktestConfig, exchange_data: List[Dict]) -> List[Dict]:
         """予測データを取得または生成する"""
@@ -403,85 +534,63 @@ class BacktestService:
 
     async def _run_trading_simulation(self, exchange_data: List[Dict], prediction_data: List[Dict], initial_capital: Decimal) -> List[Dict]:
         """売買シミュレーションを実行する"""
-        capital = float(initial_capital)
-        position = 0  # USD保有量
-        trades = []
-        portfolio_value = []
-        
         prediction_dict = {p['prediction_date']: p for p in prediction_data}
         
-        for i, data_point in enumerate(exchange_data):
-            current_date = data_point['date']
-            current_rate = data_point['close']
-            
-            # ポートフォリオ価値を記録
-            total_value = capital + position * current_rate
-            portfolio_value.append({
-                'date': current_date,
-                'value': total_value,
-                'cash': capital,
-                'position': position
-            })
-            
-            # 予測に基づく売買判定
-            if current_date in prediction_dict:
-                prediction = prediction_dict[current_date]
-                signal = prediction['signal']
-                confidence = prediction['confidence']
-                
-                # 信頼度が低い場合はスキップ
-                if confidence < 0.6:
-                    continue
-                
-                # 買いシグナル
-                if signal == 'buy' and capital > current_rate * 1000:  # 最低1000USD取引
-                    trade_amount = min(capital * 0.2, capital)  # 20%または全額
-                    usd_amount = trade_amount / current_rate
-                    
-                    position += usd_amount
-                    capital -= trade_amount
-                    
-                    trades.append({
-                        'trade_date': current_date.isoformat(),
-                        'signal_type': signal,
-                        'entry_rate': current_rate,
-                        'position_size': usd_amount,
-                        'confidence': confidence,
-                        'market_volatility': self._calculate_volatility(exchange_data, i)
-                    })
-                
-                # 売りシグナル
-                elif signal == 'sell' and position > 0:
-                    sell_amount = position * 0.5  # 半分を売却
-                    capital += sell_amount * current_rate
-                    position -= sell_amount
-                    
-                    # 最後の取引を更新（利益計算）
-                    if trades:
-                        last_trade = trades[-1]
-                        if 'exit_rate' not in last_trade:
-                            last_trade['exit_rate'] = current_rate
-                            last_trade['profit_loss'] = sell_amount * (current_rate - last_trade['entry_rate'])
-                            last_trade['holding_period'] = (current_date - datetime.fromisoformat(last_trade['trade_date']).date()).days
-                    
-                    trades.append({
-                        'trade_date': current_date.isoformat(),
-                        'signal_type': signal,
-                        'entry_rate': current_rate,
-                        'exit_rate': current_rate,
-                        'position_size': sell_amount,
-                        'profit_loss': 0,  # 売りシグナルの場合
-                        'holding_period': 0,
-                        'confidence': confidence,
-                        'market_volatility': self._calculate_volatility(exchange_data, i)
-                    })
+        # バー単位の配列を作成（ループ本体はNumbaカーネルで実行）
+        n = len(exchange_data)
+        dates = [d['date'] for d in exchange_data]
+        close = np.fromiter((d['close'] for d in exchange_data), dtype=np.float64, count=n)
+        signal = np.zeros(n, dtype=np.int64)
+        confidence = np.zeros(n, dtype=np.float64)
+        for i, current_date in enumerate(dates):
+            prediction = prediction_dict.get(current_date)
+            if prediction is not None:
+                signal[i] = _SIGNAL_CODES.get(prediction['signal'], kernels.SIGNAL_NONE)
+                confidence[i] = prediction['confidence']
+        
+        (
+            cash, position, trade_bar, trade_side, trade_size, trade_exit_bar, trade_pnl,
+            final_capital, final_position
+        ) = kernels.simulate_trades(close, signal, confidence, float(initial_capital), 0.6)
+        equity = cash + position * close
+        volatility = self._rolling_volatility(close)
+        
+        portfolio_value = [
+            {
+                'date': dates[i],
+                'value': float(equity[i]),
+                'cash': float(cash[i]),
+                'position': float(position[i])
+            }
+            for i in range(n)
+        ]
+        
+        trades = []
+        for bar, side, size, exit_bar, pnl in zip(
+            trade_bar.tolist(), trade_side.tolist(), trade_size.tolist(),
+            trade_exit_bar.tolist(), trade_pnl.tolist()
+        ):
+            trade = {
+                'trade_date': dates[bar].isoformat(),
+                'signal_type': 'buy' if side == kernels.SIGNAL_BUY else 'sell',
+                'entry_rate': float(close[bar]),
+                'position_size': size,
+            }
+            # 決済済みの取引のみ決済情報を持つ
+            if exit_bar >= 0:
+                trade['exit_rate'] = float(close[exit_bar])
+                trade['profit_loss'] = pnl
+                trade['holding_period'] = (dates[exit_bar] - dates[bar]).days
+            trade['confidence'] = float(confidence[bar])
+            trade['market_volatility'] = float(volatility[bar])
+            trades.append(trade)
         
         return {
             'trades': trades,
             'portfolio_value': portfolio_value,
-            'final_capital': capital,
-            'final_position': position,
-            'final_value': capital + position * exchange_data[-1]['close'] if exchange_data else capital
+            'final_capital': float(final_capital),
+            'final_position': float(final_position),
+            'final_value': final_capital + final_position * exchange_data[-1]['close'] if exchange_data else final_capital
         }
 
     def _calculate_performance_metrics(self, simulation_results: Dict, initial_capital: Decimal) -> Dict:
@@ -489,7 +598,11 @@ class BacktestService:
         initial_value = float(initial_capital)
         final_value = simulation_results['final_value']
         trades = simulation_results['trades']
-        portfolio_values = [pv['value'] for pv in simulation_results['portfolio_value']]
+        portfolio_values = np.fromiter(
+            (pv['value'] for pv in simulation_results['portfolio_value']),
+            dtype=np.float64,
+            count=len(simulation_results['portfolio_value'])
+        )
         
         # 総リターン
         total_return = (final_value - initial_value) / initial_value
@@ -499,23 +612,14 @@ class BacktestService:
         annualized_return = (1 + total_return) ** (365 / days) - 1 if days > 0 else 0
         
         # ボラティリティ
-        returns = []
-        for i in range(1, len(portfolio_values)):
-            daily_return = (portfolio_values[i] - portfolio_values[i-1]) / portfolio_values[i-1]
-            returns.append(daily_return)
-        
-        volatility = self._calculate_std(returns) * (365 ** 0.5) if returns else 0
+        returns = kernels.simple_returns(portfolio_values)
+        volatility = float(kernels.welford_std(returns, 0)) * (365 ** 0.5) if len(returns) else 0
         
         # シャープレシオ（リスクフリーレート=0と仮定）
         sharpe_ratio = annualized_return / volatility if volatility > 0 else 0
         
         # 最大ドローダウン
-        max_value = 0
-        max_drawdown = 0
-        for value in portfolio_values:
-            max_value = max(max_value, value)
-            drawdown = (max_value - value) / max_value if max_value > 0 else 0
-            max_drawdown = max(max_drawdown, drawdown)
+        max_drawdown = float(kernels.max_drawdown_ratio(portfolio_values))
         
         # 取引統計
         profit_trades = [t for t in trades if t.get('profit_loss', 0) > 0]
@@ -561,17 +665,27 @@ class BacktestService:
         if current_index < window:
             return 0.02  # デフォルト値
         
-        prices = [d['close'] for d in exchange_data[current_index-window:current_index]]
-        returns = [(prices[i] - prices[i-1]) / prices[i-1] for i in range(1, len(prices))]
-        return self._calculate_std(returns)
+        prices = np.fromiter(
+            (d['close'] for d in exchange_data[current_index-window:current_index]),
+            dtype=np.float64,
+            count=window
+        )
+        return self._calculate_std(kernels.simple_returns(prices))
 
     def _calculate_std(self, values: List[float]) -> float:
         """標準偏差を計算する"""
-        if not values:
+        if len(values) == 0:
             return 0
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / len(values)
-        return variance ** 0.5
+        return float(kernels.welford_std(np.asarray(values, dtype=np.float64), 0))
+
+    def _rolling_volatility(self, close: np.ndarray, window: int = 20) -> np.ndarray:
+        """各バー時点のボラティリティ（直前window本の終値リターンの標準偏差）"""
+        volatility = np.full(len(close), 0.02)  # データ不足時のデフォルト値
+        if len(close) > window:
+            # バーiの値は close[i-window:i] のリターン（window-1本）の標準偏差
+            rolling = kernels.rolling_std(kernels.simple_returns(close), window - 1, 0)
+            volatility[window:] = rolling[window - 2:len(close) - 2]
+        return volatility
 
     async def _save_backtest_results(self, job_id: str, results: Dict, execution_time: int) -> None:
         """バックテスト結果を保存する"""
@@ -11,19 +11,19 @@ Forex Charts Service Layer
 """
 
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, NamedTuple
 from decimal import Decimal
 import json
 import logging
-import math
 from statistics import mean, stdev
 import asyncio
 
+import numpy as np
 from sqlalchemy import select, desc, and_, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import (
-    ExchangeRate, TechnicalIndicator
+    ExchangeRate, TechnicalIndicator, DataSourceType
 )
 from ..schemas.charts import (
     HistoricalChartResponse,
@@ -42,10 +42,47 @@ from ..schemas.charts import (
     ChartPeriod,
     TechnicalIndicatorType
 )
+from . import _indicator_kernels as kernels
 
 logger = logging.getLogger(__name__)
 
 
+# 営業日の価格データ取得SQL（asyncpg直接実行用）
+_CANDLE_SQL = """
+SELECT date, open_rate, high_rate, low_rate, close_rate, volume,
+       is_interpolated, is_holiday, source::text
+FROM exchange_rates
+WHERE date >= $1 AND date <= $2 AND EXTRACT(ISODOW FROM date) < 6
+ORDER BY date
+"""
+
+# DBのEnum名 → データソース表示値
+_SOURCE_VALUES = {member.name: member.value for member in DataSourceType}
+
+
+def _quantize(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    配列を表示精度に一括で丸める（round()と同一の結果）
+    
+    np.roundは10^n倍してから丸めるため、ちょうど中間付近の値でround()と
+    結果が異なることがある。該当する要素のみround()で丸め直す
+    """
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_half).tolist():
+        rounded[i] = round(float(values[i]), ndigits)
+    return rounded
+
+
+class OHLCArrays(NamedTuple):
+    """四本値の列バッファ（float64、指標カーネルへ直接渡す）"""
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+
+
 class ChartsService:
     """
     チャートサービスクラス
@@ -91,8 +128,8 @@ class ChartsService:
             end_date = date.today()
             start_date = end_date - timedelta(days=days)
             
-            # 価格データを取得
-            candlestick_data = await self._get_candlestick_data(start_date, end_date, timeframe)
+            # 価格データを取得（列バッファも同時に作成）
+            candlestick_data, ohlc = await self._get_candlestick_series(start_date, end_date, timeframe)
             
             if len(candlestick_data) < 5:
                 logger.warning("チャートデータが不足しています。サンプルデータを生成します。")
@@ -111,22 +148,22 @@ class ChartsService:
             
             if indicators:
                 if TechnicalIndicatorType.SMA in indicators or TechnicalIndicatorType.EMA in indicators:
-                    moving_averages = await self._calculate_moving_averages(candlestick_data)
+                    moving_averages = await self._calculate_moving_averages(candlestick_data, ohlc=ohlc)
                 
                 if TechnicalIndicatorType.RSI in indicators:
-                    rsi_data = await self._calculate_rsi(candlestick_data)
+                    rsi_data = await self._calculate_rsi(candlestick_data, ohlc=ohlc)
                 
                 if TechnicalIndicatorType.MACD in indicators:
-                    macd_data = await self._calculate_macd(candlestick_data)
+                    macd_data = await self._calculate_macd(candlestick_data, ohlc=ohlc)
                 
                 if TechnicalIndicatorType.BOLLINGER_BANDS in indicators:
-                    bollinger_bands = await self._calculate_bollinger_bands(candlestick_data)
+                    bollinger_bands = await self._calculate_bollinger_bands(candlestick_data, ohlc=ohlc)
                 
                 if TechnicalIndicatorType.STOCHASTIC in indicators:
-                    stochastic_data = await self._calculate_stochastic(candlestick_data)
+                    stochastic_data = await self._calculate_stochastic(candlestick_data, ohlc=ohlc)
                 
                 if TechnicalIndicatorType.ATR in indicators:
-                    atr_data = await self._calculate_atr(candlestick_data)
+                    atr_data = await self._calculate_atr(candlestick_data, ohlc=ohlc)
             
             # サポート・レジスタンスレベル
             support_resistance = []
@@ -189,61 +226,103 @@ class ChartsService:
     # 価格データ取得
     # ===================================================================
     
-    async def _get_candlestick_data(
+    async def _get_candlestick_series(
         self,
         start_date: date,
         end_date: date,
         timeframe: ChartTimeframe
-    ) -> List[CandlestickData]:
-        """データベースから価格データを取得してキャンドルスティックデータに変換"""
+    ) -> Tuple[List[CandlestickData], Optional[OHLCArrays]]:
+        """
+        価格データを取得し、キャンドルスティックデータと四本値の列バッファを返す
+        
+        行ごとのORMオブジェクトを生成せず、取得した列から直接numpy配列を構築する
+        """
         try:
-            query = (
-                select(ExchangeRate)
-                .where(
-                    and_(
-                        ExchangeRate.date >= start_date,
-                        ExchangeRate.date <= end_date
-                    )
-                )
-                .order_by(ExchangeRate.date)
-            )
-            
-            result = await self.db.execute(query)
-            rates = result.scalars().all()
-            
-            candlestick_data = []
-            
-            for rate in rates:
-                # 営業日チェック（土日をスキップ）
-                if rate.date.weekday() >= 5:
-                    continue
-                
-                candlestick = CandlestickData(
-                    timestamp=datetime.combine(rate.date, datetime.min.time()),
-                    date=rate.date,
-                    open_rate=float(rate.open_rate) if rate.open_rate else float(rate.close_rate),
-                    high_rate=float(rate.high_rate) if rate.high_rate else float(rate.close_rate),
-                    low_rate=float(rate.low_rate) if rate.low_rate else float(rate.close_rate),
-                    close_rate=float(rate.close_rate),
-                    volume=rate.volume,
-                    is_interpolated=rate.is_interpolated or False,
-                    is_holiday=rate.is_holiday or False,
-                    source=rate.source.value if rate.source else "unknown"
+            rows = await self._fetch_rate_rows(start_date, end_date)
+            n = len(rows)
+            
+            # 列バッファを構築（始値・高値・安値の欠損は終値で補完）
+            close = np.fromiter((row[4] for row in rows), dtype=np.float64, count=n)
+            open_ = np.fromiter((row[1] or row[4] for row in rows), dtype=np.float64, count=n)
+            high = np.fromiter((row[2] or row[4] for row in rows), dtype=np.float64, count=n)
+            low = np.fromiter((row[3] or row[4] for row in rows), dtype=np.float64, count=n)
+            
+            # データ整合性チェック
+            high = np.maximum(high, np.maximum(open_, close))
+            low = np.minimum(low, np.minimum(open_, close))
+            
+            candlestick_data = [
+                CandlestickData(
+                    timestamp=datetime.combine(row[0], datetime.min.time()),
+                    date=row[0],
+                    open_rate=o,
+                    high_rate=h,
+                    low_rate=l,
+                    close_rate=c,
+                    volume=row[5],
+                    is_interpolated=row[6] or False,
+                    is_holiday=row[7] or False,
+                    source=_SOURCE_VALUES.get(row[8], row[8]) if row[8] else "unknown"
                 )
-                
-                # データ整合性チェック
-                if candlestick.high_rate < max(candlestick.open_rate, candlestick.close_rate):
-                    candlestick.high_rate = max(candlestick.open_rate, candlestick.close_rate)
-                if candlestick.low_rate > min(candlestick.open_rate, candlestick.close_rate):
-                    candlestick.low_rate = min(candlestick.open_rate, candlestick.close_rate)
-                
-                candlestick_data.append(candlestick)
+                for row, o, h, l, c in zip(rows, open_.tolist(), high.tolist(), low.tolist(), close.tolist())
+            ]
             
-            return candlestick_data
+            return candlestick_data, OHLCArrays(open_, high, low, close)
             
         except Exception as e:
             logger.error(f"価格データ取得中にエラー: {str(e)}")
-            return []
+            return [], None
+    
+    async def _fetch_rate_rows(self, start_date: date, end_date: date) -> List[Tuple]:
+        """
+        営業日の価格データを列タプルで取得
+        
+        asyncpg接続であれば直接fetchし、SQLAlchemyの結果処理を省略する
+        """
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = getattr(raw_connection, "driver_connection", None)
+        
+        if driver_connection is not None and hasattr(driver_connection, "fetch"):
+            return await driver_connection.fetch(_CANDLE_SQL, start_date, end_date)
+        
+        # asyncpg以外のドライバーは列指定のselectで取得
+        query = (
+            select(
+                ExchangeRate.date,
+                ExchangeRate.open_rate,
+                ExchangeRate.high_rate,
+                ExchangeRate.low_rate,
+                ExchangeRate.close_rate,
+                ExchangeRate.volume,
+                ExchangeRate.is_interpolated,
+                ExchangeRate.is_holiday,
+                ExchangeRate.source
+            )
+            .where(
+                and_(
+                    ExchangeRate.date >= start_date,
+                    ExchangeRate.date <= end_date
+                )
+            )
+            .order_by(ExchangeRate.date)
+        )
+        result = await self.db.execute(query)
+        return [
+            (*row[:8], row[8].name if row[8] else None)
+            for row in result.all()
+            if row[0].weekday() < 5  # 土日をスキップ
+        ]
+    
+    def _to_ohlc_arrays(self, candlestick_data: List[CandlestickData]) -> OHLCArrays:
+        """キャンドルスティックデータを四本値の列バッファに変換"""
+        n = len(candlestick_data)
+        return OHLCArrays(
+            np.fromiter((c.open_rate for c in candlestick_data), dtype=np.float64, count=n),
+            np.fromiter((c.high_rate for c in candlestick_data), dtype=np.float64, count=n),
+            np.fromiter((c.low_rate for c in candlestick_data), dtype=np.float64, count=n),
+            np.fromiter((c.close_rate for c in candlestick_data), dtype=np.float64, count=n),
+        )
     
     # ===================================================================
     # テクニカル指標計算
@@ -251,91 +330,67 @@ class ChartsService:
     
     async def _calculate_moving_averages(
         self, 
-        candlestick_data: List[CandlestickData]
+        candlestick_data: List[CandlestickData],
+        ohlc: Optional[OHLCArrays] = None
     ) -> List[MovingAverageData]:
         """移動平均指標を計算"""
         try:
-            moving_averages = []
-            prices = [candle.close_rate for candle in candlestick_data]
+            close = (ohlc or self._to_ohlc_arrays(candlestick_data)).close
             
-            for i, candle in enumerate(candlestick_data):
-                ma_data = MovingAverageData(
+            # EMAは簡易実装として直近窓のSMAを使用
+            sma_5 = self._round_series(kernels.rolling_mean(close, 5), 4)
+            sma_25 = self._round_series(kernels.rolling_mean(close, 25), 4)
+            sma_75 = self._round_series(kernels.rolling_mean(close, 75), 4)
+            ema_12 = self._round_series(kernels.rolling_mean(close, 12), 4)
+            ema_26 = self._round_series(kernels.rolling_mean(close, 26), 4)
+            
+            return [
+                MovingAverageData(
                     timestamp=candle.timestamp,
-                    sma_5=self._calculate_sma(prices, i, 5),
-                    sma_25=self._calculate_sma(prices, i, 25),
-                    sma_75=self._calculate_sma(prices, i, 75),
-                    ema_12=self._calculate_ema(prices, i, 12),
-                    ema_26=self._calculate_ema(prices, i, 26)
+                    sma_5=sma_5[i],
+                    sma_25=sma_25[i],
+                    sma_75=sma_75[i],
+                    ema_12=ema_12[i],
+                    ema_26=ema_26[i]
                 )
-                moving_averages.append(ma_data)
-            
-            return moving_averages
+                for i, candle in enumerate(candlestick_data)
+            ]
             
         except Exception as e:
             logger.error(f"移動平均計算中にエラー: {str(e)}")
             return []
     
-    def _calculate_sma(self, prices: List[float], index: int, period: int) -> Optional[float]:
-        """単純移動平均を計算"""
-        if index < period - 1:
-            return None
-        
-        window = prices[index - period + 1:index + 1]
-        return round(sum(window) / len(window), 4)
-    
-    def _calculate_ema(self, prices: List[float], index: int, period: int) -> Optional[float]:
-        """指数移動平均を計算"""
-        if index < period - 1:
-            return None
-        
-        multiplier = 2 / (period + 1)
+    def _round_series(self, values: np.ndarray, ndigits: int) -> List[Optional[float]]:
+        """
+        配列を一括で丸めてリストに変換（NaNはNone）
         
-        if index == period - 1:
-            # 初回はSMAで初期化
-            window = prices[index - period + 1:index + 1]
-            return round(sum(window) / len(window), 4)
+        要素ごとのround()呼び出しを避け、表示精度への量子化を配列演算で行う
+        """
+        rounded = _quantize(values, ndigits)
+        nan_mask = np.isnan(rounded)
+        if not nan_mask.any():
+            return rounded.tolist()
         
-        # 前日のEMAが必要なため、簡易実装として直近窓のSMAを返す
-        window = prices[max(0, index - period + 1):index + 1]
-        return round(sum(window) / len(window), 4)
+        result = rounded.astype(object)
+        result[nan_mask] = None
+        return result.tolist()
     
     async def _calculate_rsi(
         self, 
         candlestick_data: List[CandlestickData],
-        period: int = 14
+        period: int = 14,
+        ohlc: Optional[OHLCArrays] = None
     ) -> List[RSIData]:
         """RSI指標を計算"""
         try:
-            rsi_data = []
-            prices = [candle.close_rate for candle in candlestick_data]
+            close = (ohlc or self._to_ohlc_arrays(candlestick_data)).close
+            rsi_series = kernels.rsi_series(close, period)
+            rsi_values = rsi_series.tolist()
+            rounded_rsi = self._round_series(rsi_series, 2)
             
-            for i, candle in enumerate(candlestick_data):
-                if i < period:
-                    continue
-                
-                # 価格変化を計算
-                gains = []
-                losses = []
-                
-                for j in range(i - period + 1, i + 1):
-                    if j > 0:
-                        change = prices[j] - prices[j - 1]
-                        if change > 0:
-                            gains.append(change)
-                            losses.append(0)
-                        else:
-                            gains.append(0)
-                            losses.append(-change)
-                
-                # RSI計算
-                avg_gain = sum(gains) / period
-                avg_loss = sum(losses) / period
-                
-                if avg_loss == 0:
-                    rsi_value = 100
-                else:
-                    rs = avg_gain / avg_loss
-                    rsi_value = 100 - (100 / (1 + rs))
+            rsi_data = []
+            for i in range(period, len(candlestick_data)):
+                rsi_value = rsi_values[i]
                 
                 # シグナル判定
                 if rsi_value < 30:
@@ -345,12 +400,11 @@ class ChartsService:
                 else:
                     signal = "neutral"
                 
-                rsi_item = RSIData(
-                    timestamp=candle.timestamp,
-                    rsi_14=round(rsi_value, 2),
+                rsi_data.append(RSIData(
+                    timestamp=candlestick_data[i].timestamp,
+                    rsi_14=rounded_rsi[i],
                     rsi_signal=signal
-                )
-                rsi_data.append(rsi_item)
+                ))
             
             return rsi_data
             
@@ -363,46 +417,40 @@ class ChartsService:
         candlestick_data: List[CandlestickData],
         fast_period: int = 12,
         slow_period: int = 26,
-        signal_period: int = 9
+        signal_period: int = 9,
+        ohlc: Optional[OHLCArrays] = None
     ) -> List[MACDData]:
         """MACD指標を計算"""
         try:
-            macd_data = []
-            prices = [candle.close_rate for candle in candlestick_data]
+            close = (ohlc or self._to_ohlc_arrays(candlestick_data)).close
+            start = slow_period - 1
+            if len(close) <= start:
+                return []
             
-            # 簡易EMA計算（実際の実装ではより正確なEMAを使用）
-            for i, candle in enumerate(candlestick_data):
-                if i < slow_period - 1:
-                    continue
-                
-                # 簡易的なEMA計算
-                ema_12 = self._calculate_ema(prices, i, fast_period)
-                ema_26 = self._calculate_ema(prices, i, slow_period)
-                
-                if ema_12 is None or ema_26 is None:
-                    continue
-                
-                macd_line = ema_12 - ema_26
-                
-                # シグナルライン（簡易実装）
-                if len(macd_data) < signal_period - 1:
-                    signal_line = macd_line
-                else:
-                    recent_macd = [item.macd for item in macd_data[-(signal_period-1):]]
-                    recent_macd.append(macd_line)
-                    signal_line = sum(recent_macd) / len(recent_macd)
-                
-                histogram = macd_line - signal_line
-                macd_signal = "bullish" if macd_line > signal_line else "bearish"
-                
-                macd_item = MACDData(
-                    timestamp=candle.timestamp,
-                    macd=round(macd_line, 4),
-                    signal=round(signal_line, 4),
-                    histogram=round(histogram, 4),
-                    macd_signal=macd_signal
+            # 簡易EMA（直近窓のSMA、4桁丸め）の差分
+            ema_fast = _quantize(kernels.rolling_mean(close, fast_period)[start:], 4)
+            ema_slow = _quantize(kernels.rolling_mean(close, slow_period)[start:], 4)
+            macd_lines = ema_fast - ema_slow
+            
+            # シグナルライン（簡易実装：直近signal_period本の平均）
+            rounded_macd = _quantize(macd_lines, 4)
+            signal_lines = kernels.trailing_signal(macd_lines, rounded_macd, signal_period)
+            
+            macd_values = self._round_series(macd_lines, 4)
+            signal_values = self._round_series(signal_lines, 4)
+            histograms = self._round_series(macd_lines - signal_lines, 4)
+            is_bullish = (macd_lines > signal_lines).tolist()
+            
+            macd_data = [
+                MACDData(
+                    timestamp=candlestick_data[start + offset].timestamp,
+                    macd=macd_values[offset],
+                    signal=signal_values[offset],
+                    histogram=histograms[offset],
+                    macd_signal="bullish" if is_bullish[offset] else "bearish"
                 )
-                macd_data.append(macd_item)
+                for offset in range(len(macd_values))
+            ]
             
             return macd_data
             
@@ -414,43 +462,34 @@ class ChartsService:
         self, 
         candlestick_data: List[CandlestickData],
         period: int = 20,
-        std_dev: float = 2.0
+        std_dev: float = 2.0,
+        ohlc: Optional[OHLCArrays] = None
     ) -> List[BollingerBandsData]:
         """ボリンジャーバンド指標を計算"""
         try:
-            bollinger_data = []
-            prices = [candle.close_rate for candle in candlestick_data]
-            
-            for i, candle in enumerate(candlestick_data):
-                if i < period - 1:
-                    continue
-                
-                # 中央線（SMA）
-                window = prices[i - period + 1:i + 1]
-                middle_band = sum(window) / len(window)
-                
-                # 標準偏差
-                variance = sum((price - middle_band) ** 2 for price in window) / len(window)
-                std_deviation = math.sqrt(variance)
-                
-                # 上下バンド
-                upper_band = middle_band + (std_dev * std_deviation)
-                lower_band = middle_band - (std_dev * std_deviation)
-                
-                band_width = upper_band - lower_band
-                squeeze_signal = band_width < middle_band * 0.02  # 2%以下でスクイーズ
-                
-                bb_item = BollingerBandsData(
-                    timestamp=candle.timestamp,
-                    upper_band=round(upper_band, 4),
-                    middle_band=round(middle_band, 4),
-                    lower_band=round(lower_band, 4),
-                    band_width=round(band_width, 4),
-                    squeeze_signal=squeeze_signal
+            close = (ohlc or self._to_ohlc_arrays(candlestick_data)).close
+            upper, middle, lower = (
+                band[period - 1:] for band in kernels.bollinger_series(close, period, std_dev)
+            )
+            band_width = upper - lower
+            
+            upper_bands = self._round_series(upper, 4)
+            middle_bands = self._round_series(middle, 4)
+            lower_bands = self._round_series(lower, 4)
+            band_widths = self._round_series(band_width, 4)
+            is_squeeze = (band_width < middle * 0.02).tolist()  # 2%以下でスクイーズ
+            
+            return [
+                BollingerBandsData(
+                    timestamp=candlestick_data[period - 1 + offset].timestamp,
+                    upper_band=upper_bands[offset],
+                    middle_band=middle_bands[offset],
+                    lower_band=lower_bands[offset],
+                    band_width=band_widths[offset],
+                    squeeze_signal=is_squeeze[offset]
                 )
-                bollinger_data.append(bb_item)
-            
-            return bollinger_data
+                for offset in range(len(upper_bands))
+            ]
             
         except Exception as e:
             logger.error(f"ボリンジャーバンド計算中にエラー: {str(e)}")
@@ -460,34 +499,27 @@ class ChartsService:
         self, 
         candlestick_data: List[CandlestickData],
         k_period: int = 14,
-        d_period: int = 3
+        d_period: int = 3,
+        ohlc: Optional[OHLCArrays] = None
     ) -> List[StochasticData]:
         """ストキャスティクス指標を計算"""
         try:
-            stochastic_data = []
+            ohlc = ohlc or self._to_ohlc_arrays(candlestick_data)
+            start = k_period - 1
+            if len(ohlc.close) <= start:
+                return []
             
-            for i, candle in enumerate(candlestick_data):
-                if i < k_period - 1:
-                    continue
-                
-                # %Kの計算
-                window = candlestick_data[i - k_period + 1:i + 1]
-                highest_high = max(c.high_rate for c in window)
-                lowest_low = min(c.low_rate for c in window)
-                
-                if highest_high == lowest_low:
-                    k_value = 50
-                else:
-                    k_value = ((candle.close_rate - lowest_low) / (highest_high - lowest_low)) * 100
-                
-                # %Dの計算（%Kの移動平均）
-                if len(stochastic_data) < d_period - 1:
-                    d_value = k_value
-                else:
-                    recent_k = [item.stoch_k for item in stochastic_data[-(d_period-1):]]
-                    recent_k.append(k_value)
-                    d_value = sum(recent_k) / len(recent_k)
-                
+            # %Kの計算
+            k_values = kernels.stochastic_k_series(ohlc.high, ohlc.low, ohlc.close, k_period)[start:]
+            
+            # %Dの計算（%Kの移動平均）
+            rounded_k = _quantize(k_values, 2)
+            d_values = kernels.trailing_signal(k_values, rounded_k, d_period)
+            stoch_k = rounded_k.tolist()
+            stoch_d = self._round_series(d_values, 2)
+            
+            stochastic_data = []
+            for offset, k_value in enumerate(k_values.tolist()):
                 # シグナル判定
                 if k_value < 20:
                     signal = "oversold"
@@ -496,13 +528,12 @@ class ChartsService:
                 else:
                     signal = "neutral"
                 
-                stoch_item = StochasticData(
-                    timestamp=candle.timestamp,
-                    stoch_k=round(k_value, 2),
-                    stoch_d=round(d_value, 2),
+                stochastic_data.append(StochasticData(
+                    timestamp=candlestick_data[start + offset].timestamp,
+                    stoch_k=stoch_k[offset],
+                    stoch_d=stoch_d[offset],
                     stoch_signal=signal
-                )
-                stochastic_data.append(stoch_item)
+                ))
             
             return stochastic_data
             
@@ -513,36 +544,24 @@ class ChartsService:
     async def _calculate_atr(
         self, 
         candlestick_data: List[CandlestickData],
-        period: int = 14
+        period: int = 14,
+        ohlc: Optional[OHLCArrays] = None
     ) -> List[ATRData]:
         """ATR（Average True Range）指標を計算"""
         try:
-            atr_data = []
-            true_ranges = []
+            ohlc = ohlc or self._to_ohlc_arrays(candlestick_data)
             
-            for i, candle in enumerate(candlestick_data):
-                if i == 0:
-                    true_range = candle.high_rate - candle.low_rate
-                else:
-                    prev_close = candlestick_data[i-1].close_rate
-                    true_range = max(
-                        candle.high_rate - candle.low_rate,
-                        abs(candle.high_rate - prev_close),
-                        abs(candle.low_rate - prev_close)
-                    )
-                
-                true_ranges.append(true_range)
-                
-                if i < period - 1:
-                    continue
-                
-                # ATRの計算
-                atr_value = sum(true_ranges[i - period + 1:i + 1]) / period
-                
+            true_ranges = kernels.true_range_series(ohlc.high, ohlc.low, ohlc.close)
+            atr_series = kernels.rolling_mean(true_ranges, period)
+            ratio_series = atr_series / kernels.expanding_rolling_mean(ohlc.close, 20)
+            volatility_ratios = ratio_series.tolist()
+            rounded_atr = self._round_series(atr_series, 4)
+            rounded_ratios = self._round_series(ratio_series, 4)
+            
+            atr_data = []
+            for i in range(period - 1, len(candlestick_data)):
                 # ボラティリティレジーム判定
-                prices = [c.close_rate for c in candlestick_data[max(0, i-19):i+1]]
-                avg_price = sum(prices) / len(prices)
-                volatility_ratio = atr_value / avg_price
+                volatility_ratio = volatility_ratios[i]
                 
                 if volatility_ratio > 0.02:
                     regime = "high"
@@ -551,13 +570,12 @@ class ChartsService:
                 else:
                     regime = "normal"
                 
-                atr_item = ATRData(
-                    timestamp=candle.timestamp,
-                    atr_14=round(atr_value, 4),
-                    volatility_20=round(volatility_ratio, 4),
+                atr_data.append(ATRData(
+                    timestamp=candlestick_data[i].timestamp,
+                    atr_14=rounded_atr[i],
+                    volatility_20=rounded_ratios[i],
                     volatility_regime=regime
-                )
-                atr_data.append(atr_item)
+                ))
             
             return atr_data
             
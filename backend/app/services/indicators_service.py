@@ -16,12 +16,15 @@ from decimal import Decimal
 import json
 import logging
 import math
-from statistics import mean, stdev
+from statistics import mean
 import asyncio
 
+import numpy as np
 from sqlalchemy import select, desc, and_, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.clock import now_cached
+from ..database import db_session
 from ..models import (
     ExchangeRate, TechnicalIndicator
 )
@@ -44,9 +47,29 @@ from ..schemas.indicators import (
     TrendDirection,
     EconomicIndicatorCategory
 )
+from . import _indicator_kernels as kernels
 
 logger = logging.getLogger(__name__)
 
+# シグナル・センチメントの方向（+1: 買い/強気, -1: 売り/弱気）
+_SIGNAL_DIRECTION = {
+    IndicatorSignal.STRONG_BUY: 1,
+    IndicatorSignal.BUY: 1,
+    IndicatorSignal.NEUTRAL: 0,
+    IndicatorSignal.SELL: -1,
+    IndicatorSignal.STRONG_SELL: -1,
+}
+_SENTIMENT_DIRECTION = {"bullish": 1, "neutral": 0, "bearish": -1}
+
+# テクニカル方向 + 経済センチメント方向 → 総合推奨
+_RECOMMENDATIONS = {
+    2: "BUY",
+    1: "CAUTIOUS_BUY",
+    0: "HOLD",
+    -1: "CAUTIOUS_SELL",
+    -2: "SELL",
+}
+
 
 class IndicatorsService:
     """
@@ -218,6 +241,69 @@ class IndicatorsService:
             logger.error(f"経済指標分析中にエラー: {str(e)}")
             return await self._generate_sample_economic_impact(target_date, include_calendar)
     
+    # ===================================================================
+    # 指標サマリー機能
+    # ===================================================================
+    
+    @classmethod
+    async def get_summary(cls) -> Dict[str, Any]:
+        """
+        テクニカル・経済指標の総合サマリーを取得
+        
+        テクニカル分析と経済指標分析はそれぞれ独立したセッションで並行実行するため、
+        所要時間は両者の合計ではなく長い方となる。
+        一方の分析が失敗した場合は、その側を中立として扱う
+        
+        Returns:
+            Dict[str, Any]: 総合シグナル・推奨・主要要因
+        """
+        technical, economic = await asyncio.gather(
+            cls._run_in_session("get_technical_indicators", include_volume=False),
+            cls._run_in_session("get_economic_impact", include_calendar=False),
+            return_exceptions=True
+        )
+        
+        technical_signal = IndicatorSignal.NEUTRAL
+        economic_sentiment = "neutral"
+        reliability_scores = []
+        key_factors: List[str] = []
+        risk_factors: List[str] = []
+        
+        if isinstance(technical, BaseException):
+            logger.error(f"サマリー用テクニカル分析中にエラー: {str(technical)}")
+        else:
+            technical_signal = technical.technical_summary.overall_signal
+            reliability_scores.append(technical.reliability_score)
+        
+        if isinstance(economic, BaseException):
+            logger.error(f"サマリー用経済指標分析中にエラー: {str(economic)}")
+        else:
+            economic_sentiment = economic.overall_economic_sentiment
+            reliability_scores.append(economic.reliability_score)
+            key_factors = economic.top_positive_factors[:3]
+            risk_factors = economic.key_risk_factors[:2]
+        
+        direction = (
+            _SIGNAL_DIRECTION[technical_signal]
+            + _SENTIMENT_DIRECTION.get(economic_sentiment, 0)
+        )
+        
+        return {
+            "technical_signal": technical_signal.value.upper(),
+            "economic_sentiment": economic_sentiment.upper(),
+            "overall_recommendation": _RECOMMENDATIONS[direction],
+            "confidence_level": round(mean(reliability_scores), 2) if reliability_scores else 0.0,
+            "key_factors": key_factors,
+            "risk_factors": risk_factors,
+            "last_updated": now_cached()
+        }
+    
+    @classmethod
+    async def _run_in_session(cls, method_name: str, **kwargs) -> Any:
+        """独立したDBセッション（同時実行数制限付き）でサービスメソッドを実行"""
+        async with db_session() as session:
+            return await getattr(cls(session), method_name)(**kwargs)
+    
     # ===================================================================
     # テクニカル指標計算メソッド
     # ===================================================================
@@ -229,7 +315,7 @@ class IndicatorsService:
     ) -> MovingAverageIndicator:
         """移動平均指標を計算"""
         try:
-            prices = [data["close_rate"] for data in historical_data]
+            prices, _, _ = self._to_price_arrays(historical_data)
             
             # 各期間の移動平均を計算
             sma_5 = self._calculate_sma(prices, len(prices)-1, 5) if len(prices) >= 5 else None
@@ -298,7 +384,7 @@ class IndicatorsService:
     ) -> OscillatorIndicator:
         """オシレーター指標を計算"""
         try:
-            prices = [data["close_rate"] for data in historical_data]
+            prices, _, _ = self._to_price_arrays(historical_data)
             
             # RSI計算
             rsi_14 = self._calculate_rsi(prices, 14) if len(prices) >= 15 else 50.0
@@ -354,7 +440,7 @@ class IndicatorsService:
     ) -> MomentumIndicator:
         """モメンタム指標を計算"""
         try:
-            prices = [data["close_rate"] for data in historical_data]
+            prices, _, _ = self._to_price_arrays(historical_data)
             
             # MACD計算
             macd, macd_signal_line, macd_histogram = self._calculate_macd(prices)
@@ -410,7 +496,7 @@ class IndicatorsService:
     ) -> VolatilityIndicator:
         """ボラティリティ指標を計算"""
         try:
-            prices = [data["close_rate"] for data in historical_data]
+            prices, _, _ = self._to_price_arrays(historical_data)
             
             # ボリンジャーバンド計算
             bb_upper, bb_middle, bb_lower, bb_width = self._calculate_bollinger_bands(prices)
@@ -420,13 +506,12 @@ class IndicatorsService:
             
             # ボラティリティ計算（20日）
             if len(prices) >= 21:
-                returns = [(prices[i] - prices[i-1]) / prices[i-1] for i in range(1, min(21, len(prices)))]
-                volatility_20 = stdev(returns) * math.sqrt(252)  # 年率換算
+                volatility_20 = float(kernels.annualized_return_volatility(prices, 21, 252))  # 年率換算
             else:
                 volatility_20 = 0.15
             
             # ボリンジャーバンドシグナル判定
-            current_price = prices[-1]
+            current_price = float(prices[-1])
             bb_signal = IndicatorSignal.NEUTRAL
             if current_price <= bb_lower:
                 bb_signal = IndicatorSignal.BUY
@@ -739,56 +824,19 @@ class IndicatorsService:
     # 計算ヘルパーメソッド
     # ===================================================================
     
-    def _calculate_sma(self, prices: List[float], index: int, period: int) -> Optional[float]:
+    def _calculate_sma(self, prices: np.ndarray, index: int, period: int) -> Optional[float]:
         """単純移動平均を計算"""
-        if index < period - 1 or len(prices) <= index:
-            return None
-        
-        window = prices[index - period + 1:index + 1]
-        return sum(window) / len(window) if window else None
+        value = kernels.sma_at(kernels.as_price_array(prices), index, period)
+        return None if math.isnan(value) else float(value)
     
-    def _calculate_ema_simple(self, prices: List[float], period: int) -> Optional[float]:
+    def _calculate_ema_simple(self, prices: np.ndarray, period: int) -> Optional[float]:
         """指数移動平均を計算（簡易版）"""
-        if len(prices) < period:
-            return None
-        
-        # 初期値はSMAで設定
-        multiplier = 2 / (period + 1)
-        ema = sum(prices[:period]) / period
-        
-        for price in prices[period:]:
-            ema = (price - ema) * multiplier + ema
-        
-        return ema
+        value = kernels.ema_last(kernels.as_price_array(prices), period)
+        return None if math.isnan(value) else float(value)
     
-    def _calculate_rsi(self, prices: List[float], period: int = 14) -> float:
+    def _calculate_rsi(self, prices: np.ndarray, period: int = 14) -> float:
         """RSIを計算"""
-        if len(prices) <= period:
-            return 50.0
-        
-        gains = []
-        losses = []
-        
-        for i in range(1, len(prices)):
-            change = prices[i] - prices[i-1]
-            if change > 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(-change)
-        
-        if len(gains) < period:
-            return 50.0
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        return float(kernels.rsi_last(kernels.as_price_array(prices), period))
     
     def _calculate_stochastic(
         self, 
@@ -796,88 +844,46 @@ class IndicatorsService:
         k_period: int = 14, 
         d_period: int = 3
     ) -> Tuple[float, float]:
-        """ストキャスティクスを計算"""
-        if len(historical_data) < k_period:
-            return 50.0, 50.0
-        
-        # 最新のK%を計算
-        recent_data = historical_data[-k_period:]
-        highest_high = max(data["high_rate"] for data in recent_data)
-        lowest_low = min(data["low_rate"] for data in recent_data)
-        current_close = historical_data[-1]["close_rate"]
-        
-        if highest_high == lowest_low:
-            stoch_k = 50.0
-        else:
-            stoch_k = ((current_close - lowest_low) / (highest_high - lowest_low)) * 100
-        
-        # D%は簡易的にK%として設定（本来はK%の移動平均）
-        stoch_d = stoch_k
-        
-        return stoch_k, stoch_d
+        """ストキャスティクスを計算（D%は簡易的にK%と同値）"""
+        close, high, low = self._to_price_arrays(historical_data)
+        stoch_k, stoch_d = kernels.stochastic_last(high, low, close, k_period)
+        return float(stoch_k), float(stoch_d)
     
-    def _calculate_macd(self, prices: List[float]) -> Tuple[float, float, float]:
+    def _calculate_macd(self, prices: np.ndarray) -> Tuple[float, float, float]:
         """MACDを計算"""
-        if len(prices) < 26:
-            return 0.0, 0.0, 0.0
-        
-        # 簡易EMA計算
-        ema_12 = self._calculate_ema_simple(prices, 12) or 0
-        ema_26 = self._calculate_ema_simple(prices, 26) or 0
-        
-        macd_line = ema_12 - ema_26
-        
-        # シグナルライン（簡易版）
-        macd_signal = macd_line * 0.9  # 簡易実装
-        macd_histogram = macd_line - macd_signal
-        
-        return macd_line, macd_signal, macd_histogram
+        macd_line, macd_signal, macd_histogram = kernels.macd_last(kernels.as_price_array(prices))
+        return float(macd_line), float(macd_signal), float(macd_histogram)
     
     def _calculate_bollinger_bands(
         self, 
-        prices: List[float], 
+        prices: np.ndarray, 
         period: int = 20, 
         std_multiplier: float = 2.0
     ) -> Tuple[float, float, float, float]:
         """ボリンジャーバンドを計算"""
         if len(prices) < period:
-            current_price = prices[-1] if prices else 150.0
+            current_price = float(prices[-1]) if len(prices) else 150.0
             return current_price + 2, current_price, current_price - 2, 4.0
         
-        recent_prices = prices[-period:]
-        middle_band = sum(recent_prices) / len(recent_prices)
-        
-        variance = sum((price - middle_band) ** 2 for price in recent_prices) / len(recent_prices)
-        std_dev = math.sqrt(variance)
-        
-        upper_band = middle_band + (std_multiplier * std_dev)
-        lower_band = middle_band - (std_multiplier * std_dev)
-        band_width = upper_band - lower_band
-        
-        return upper_band, middle_band, lower_band, band_width
+        upper_band, middle_band, lower_band, band_width = kernels.bollinger_last(
+            kernels.as_price_array(prices), period, std_multiplier
+        )
+        return float(upper_band), float(middle_band), float(lower_band), float(band_width)
     
     def _calculate_atr(self, historical_data: List[Dict[str, Any]], period: int = 14) -> float:
         """ATRを計算"""
-        if len(historical_data) < 2:
-            return 1.0
-        
-        true_ranges = []
-        
-        for i in range(1, len(historical_data)):
-            current = historical_data[i]
-            previous = historical_data[i-1]
-            
-            tr1 = current["high_rate"] - current["low_rate"]
-            tr2 = abs(current["high_rate"] - previous["close_rate"])
-            tr3 = abs(current["low_rate"] - previous["close_rate"])
-            
-            true_range = max(tr1, tr2, tr3)
-            true_ranges.append(true_range)
-        
-        if len(true_ranges) < period:
-            return sum(true_ranges) / len(true_ranges) if true_ranges else 1.0
-        
-        return sum(true_ranges[-period:]) / period
+        close, high, low = self._to_price_arrays(historical_data)
+        return float(kernels.atr_last(high, low, close, period))
+    
+    def _to_price_arrays(
+        self,
+        historical_data: List[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """過去データを終値・高値・安値のfloat64配列に変換"""
+        close = np.fromiter((d["close_rate"] for d in historical_data), dtype=np.float64, count=len(historical_data))
+        high = np.fromiter((d["high_rate"] for d in historical_data), dtype=np.float64, count=len(historical_data))
+        low = np.fromiter((d["low_rate"] for d in historical_data), dtype=np.float64, count=len(historical_data))
+        return close, high, low
     
     def _signal_to_score(self, signal: IndicatorSignal) -> float:
         """シグナルを数値スコアに変換"""
@@ -1066,8 +1072,15 @@ class IndicatorsService:
             end_date = analysis_date
             start_date = end_date - timedelta(days=days)
             
+            # ORMオブジェクトを生成せず、必要な列のみを取得
             query = (
-                select(ExchangeRate)
+                select(
+                    ExchangeRate.date,
+                    ExchangeRate.close_rate,
+                    ExchangeRate.high_rate,
+                    ExchangeRate.low_rate,
+                    ExchangeRate.volume
+                )
                 .where(
                     and_(
                         ExchangeRate.date >= start_date,
@@ -1078,17 +1091,16 @@ class IndicatorsService:
             )
             
             result = await self.db.execute(query)
-            rates = result.scalars().all()
             
             return [
                 {
-                    "date": rate.date,
-                    "close_rate": float(rate.close_rate),
-                    "high_rate": float(rate.high_rate) if rate.high_rate else float(rate.close_rate),
-                    "low_rate": float(rate.low_rate) if rate.low_rate else float(rate.close_rate),
-                    "volume": rate.volume or 0
+                    "date": rate_date,
+                    "close_rate": float(close_rate),
+                    "high_rate": float(high_rate) if high_rate else float(close_rate),
+                    "low_rate": float(low_rate) if low_rate else float(close_rate),
+                    "volume": volume or 0
                 }
-                for rate in rates
+                for rate_date, close_rate, high_rate, low_rate, volume in result.all()
             ]
         except Exception as e:
             logger.error(f"過去データ取得中にエラー: {str(e)}")
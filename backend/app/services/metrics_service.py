@@ -16,9 +16,10 @@ from decimal import Decimal
 import json
 import logging
 import math
-from statistics import mean, stdev
+from statistics import mean
 import asyncio
 
+import numpy as np
 from sqlalchemy import select, desc, and_, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -37,6 +38,7 @@ from ..schemas.metrics import (
     VolatilityRegime,
     TimeHorizon
 )
+from . import _risk_kernels as kernels
 
 logger = logging.getLogger(__name__)
 
@@ -155,33 +157,32 @@ class MetricsService:
     ) -> VolatilityMetrics:
         """ボラティリティ指標を計算"""
         try:
-            rates = [data["close_rate"] for data in historical_data]
+            rates = self._to_rate_array(historical_data)
             
             # 日次リターンを計算
-            returns = []
-            for i in range(1, len(rates)):
-                daily_return = (rates[i] - rates[i-1]) / rates[i-1]
-                returns.append(daily_return)
+            returns = kernels.simple_returns(rates)
             
             if len(returns) < 20:
                 raise ValueError("ボラティリティ計算に十分なデータがありません")
             
+            annualize = math.sqrt(252)
+            
             # 現在ボラティリティ（年率換算）
-            current_volatility = stdev(returns[-20:]) * math.sqrt(252)  # 直近20日
+            current_volatility = float(kernels.welford_std(returns[-20:], 1)) * annualize  # 直近20日
             
             # 期間別ボラティリティ
-            volatility_1w = stdev(returns[-5:]) * math.sqrt(252) if len(returns) >= 5 else current_volatility
-            volatility_1m = stdev(returns[-20:]) * math.sqrt(252) if len(returns) >= 20 else current_volatility
-            volatility_3m = stdev(returns[-60:]) * math.sqrt(252) if len(returns) >= 60 else current_volatility
+            volatility_1w = float(kernels.welford_std(returns[-5:], 1)) * annualize if len(returns) >= 5 else current_volatility
+            volatility_1m = float(kernels.welford_std(returns[-20:], 1)) * annualize if len(returns) >= 20 else current_volatility
+            volatility_3m = float(kernels.welford_std(returns[-60:], 1)) * annualize if len(returns) >= 60 else current_volatility
             
             # ボラティリティパーセンタイル（過去1年比較）
-            year_volatilities = []
+            year_volatilities = np.empty(0)
             if len(returns) >= 252:
-                for i in range(20, len(returns) - 20):
-                    vol_window = stdev(returns[i-20:i]) * math.sqrt(252)
-                    year_volatilities.append(vol_window)
+                # returns[i-20:i] (i = 20 .. len-21) の20日ローリング標準偏差
+                rolling = kernels.rolling_std(returns, 20, 1)
+                year_volatilities = rolling[19:len(returns) - 21] * annualize
                 
-                percentile = sum(1 for vol in year_volatilities if vol <= current_volatility) / len(year_volatilities) * 100
+                percentile = float(np.count_nonzero(year_volatilities <= current_volatility)) / len(year_volatilities) * 100
             else:
                 percentile = 50.0  # デフォルト値
             
@@ -199,7 +200,7 @@ class MetricsService:
             
             # ボラティリティのボラティリティ
             if len(year_volatilities) > 0:
-                volatility_of_volatility = stdev(year_volatilities)
+                volatility_of_volatility = float(kernels.welford_std(year_volatilities, 1))
             else:
                 volatility_of_volatility = current_volatility * 0.2
             
@@ -243,8 +244,7 @@ class MetricsService:
     ) -> List[ValueAtRisk]:
         """VaR指標を計算"""
         try:
-            rates = [data["close_rate"] for data in historical_data]
-            returns = [(rates[i] - rates[i-1]) / rates[i-1] for i in range(1, len(rates))]
+            returns = kernels.simple_returns(self._to_rate_array(historical_data))
             
             if len(returns) < 30:
                 raise ValueError("VaR計算に十分なデータがありません")
@@ -288,7 +288,7 @@ class MetricsService:
     
     async def _calculate_single_var(
         self,
-        returns: List[float],
+        returns: np.ndarray,
         current_rate: float,
         horizon_days: int,
         confidence_level: float
@@ -296,17 +296,17 @@ class MetricsService:
         """単一期間のVaRを計算"""
         
         # 期間調整済みリターン
-        horizon_returns = [r * math.sqrt(horizon_days) for r in returns]
+        horizon_returns = np.asarray(returns, dtype=np.float64) * math.sqrt(horizon_days)
         
-        # ヒストリカルVaR
-        sorted_returns = sorted(horizon_returns)
-        var_index = int((1 - confidence_level) * len(sorted_returns))
-        historical_var_return = sorted_returns[var_index] if var_index < len(sorted_returns) else sorted_returns[0]
+        # ヒストリカルVaR（全ソートせず分位点のみ選択）
+        historical_var_return, expected_shortfall_return = kernels.historical_var(
+            horizon_returns, confidence_level
+        )
         historical_var = abs(historical_var_return * current_rate)
         
         # パラメトリックVaR（正規分布仮定）
-        mean_return = mean(horizon_returns)
-        std_return = stdev(horizon_returns)
+        mean_return = float(horizon_returns.mean())
+        std_return = float(kernels.welford_std(horizon_returns, 1))
         
         # 信頼水準に対応するz値
         z_score = {0.90: 1.282, 0.95: 1.645, 0.99: 2.326}.get(confidence_level, 1.645)
@@ -317,8 +317,6 @@ class MetricsService:
         monte_carlo_var = (historical_var + parametric_var) / 2
         
         # Expected Shortfall (CVaR)
-        tail_returns = [r for r in sorted_returns if r <= historical_var_return]
-        expected_shortfall_return = mean(tail_returns) if tail_returns else historical_var_return
         expected_shortfall = abs(expected_shortfall_return * current_rate)
         
         # 時間軸の設定
@@ -350,50 +348,27 @@ class MetricsService:
     ) -> DrawdownMetrics:
         """ドローダウン指標を計算"""
         try:
-            rates = [data["close_rate"] for data in historical_data]
+            rates = self._to_rate_array(historical_data)
             
             if len(rates) < 30:
                 raise ValueError("ドローダウン計算に十分なデータがありません")
             
-            # 累積最大値を計算
-            cummax = []
-            current_max = rates[0]
-            for rate in rates:
-                if rate > current_max:
-                    current_max = rate
-                cummax.append(current_max)
-            
-            # ドローダウンを計算（パーセント）
-            drawdowns = [(rate - max_val) / max_val * 100 for rate, max_val in zip(rates, cummax)]
+            # 累積最大値からのドローダウン（パーセント）
+            drawdowns = kernels.drawdown_series(rates)
             
             # 現在のドローダウン
-            current_drawdown = drawdowns[-1]
+            current_drawdown = float(drawdowns[-1])
             
             # 期間別最大ドローダウン
-            max_drawdown_1m = min(drawdowns[-22:]) if len(drawdowns) >= 22 else min(drawdowns)
-            max_drawdown_3m = min(drawdowns[-66:]) if len(drawdowns) >= 66 else min(drawdowns)
-            max_drawdown_1y = min(drawdowns[-252:]) if len(drawdowns) >= 252 else min(drawdowns)
-            
-            # ドローダウン継続期間
-            current_drawdown_duration = 0
-            for i in range(len(drawdowns) - 1, -1, -1):
-                if drawdowns[i] < -0.1:  # 0.1%以上のドローダウン
-                    current_drawdown_duration += 1
-                else:
-                    break
-            
-            # 最大ドローダウン継続期間
-            max_duration = 0
-            current_duration = 0
-            for dd in drawdowns:
-                if dd < -0.1:
-                    current_duration += 1
-                    max_duration = max(max_duration, current_duration)
-                else:
-                    current_duration = 0
+            max_drawdown_1m = float(drawdowns[-22:].min())
+            max_drawdown_3m = float(drawdowns[-66:].min())
+            max_drawdown_1y = float(drawdowns[-252:].min())
+            
+            # ドローダウン継続期間（0.1%以上のドローダウン）
+            current_drawdown_duration, max_duration = kernels.drawdown_durations(drawdowns, -0.1)
             
             # 回復ファクター（簡易計算）
-            total_return = (rates[-1] - rates[0]) / rates[0] * 100 if rates[0] > 0 else 0
+            total_return = float((rates[-1] - rates[0]) / rates[0] * 100) if rates[0] > 0 else 0
             recovery_factor = total_return / abs(max_drawdown_1y) if max_drawdown_1y < -0.1 else 1.0
             
             return DrawdownMetrics(
@@ -401,8 +376,8 @@ class MetricsService:
                 max_drawdown_1m=round(max_drawdown_1m, 2),
                 max_drawdown_3m=round(max_drawdown_3m, 2),
                 max_drawdown_1y=round(max_drawdown_1y, 2),
-                current_drawdown_duration=current_drawdown_duration,
-                max_drawdown_duration=max_duration,
+                current_drawdown_duration=int(current_drawdown_duration),
+                max_drawdown_duration=int(max_duration),
                 recovery_factor=round(recovery_factor, 2)
             )
             
@@ -696,6 +671,14 @@ class MetricsService:
         except Exception:
             return 150.25
     
+    def _to_rate_array(self, historical_data: List[Dict[str, Any]]) -> np.ndarray:
+        """過去データの終値をfloat64配列に変換"""
+        return np.fromiter(
+            (data["close_rate"] for data in historical_data),
+            dtype=np.float64,
+            count=len(historical_data)
+        )
+    
     async def _get_historical_data_for_risk_analysis(self, days: int = 252) -> List[Dict[str, Any]]:
         """リスク分析用の過去データを取得"""
         try:
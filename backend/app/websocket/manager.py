@@ -1,58 +1,70 @@
 """
 WebSocket接続マネージャー
 """
-from typing import List, Dict
+from typing import Dict, Iterable, Set, Tuple
 from fastapi import WebSocket
-import json
+import orjson
 import asyncio
 from datetime import datetime
 import random
 
+
+def dumps_message(data) -> str:
+    """WebSocketテキストフレーム用にJSONシリアライズ（orjson）"""
+    return orjson.dumps(data).decode("utf-8")
+
+
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.subscriptions: Dict[str, List[WebSocket]] = {}
+        self.active_connections: Set[WebSocket] = set()
+        self.subscriptions: Dict[str, Set[WebSocket]] = {}
         
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
         
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
         # Remove from all subscriptions
-        for topic in self.subscriptions:
-            if websocket in self.subscriptions[topic]:
-                self.subscriptions[topic].remove(websocket)
+        for subscribers in self.subscriptions.values():
+            subscribers.discard(websocket)
     
     def subscribe(self, websocket: WebSocket, topic: str):
-        if topic not in self.subscriptions:
-            self.subscriptions[topic] = []
-        if websocket not in self.subscriptions[topic]:
-            self.subscriptions[topic].append(websocket)
+        self.subscriptions.setdefault(topic, set()).add(websocket)
+    
+    def subscribe_all(self, websocket: WebSocket, topics: Iterable[str]):
+        """複数トピックへまとめて登録"""
+        for topic in topics:
+            self.subscriptions.setdefault(topic, set()).add(websocket)
     
     def unsubscribe(self, websocket: WebSocket, topic: str):
-        if topic in self.subscriptions and websocket in self.subscriptions[topic]:
-            self.subscriptions[topic].remove(websocket)
+        if topic in self.subscriptions:
+            self.subscriptions[topic].discard(websocket)
     
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
     
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                # Connection might be closed
-                pass
+        await self._send_all(tuple(self.active_connections), message)
     
     async def broadcast_to_topic(self, topic: str, message: str):
         if topic in self.subscriptions:
-            for connection in self.subscriptions[topic]:
-                try:
-                    await connection.send_text(message)
-                except:
-                    # Connection might be closed
-                    pass
+            await self._send_all(tuple(self.subscriptions[topic]), message)
+    
+    async def _send_all(self, connections: Tuple[WebSocket, ...], message: str):
+        """
+        シリアライズ済みメッセージを全接続へ並行送信
+        
+        遅いクライアントが他への配信を待たせないよう並行に送り、
+        送信に失敗した接続（切断済み等）は登録から外す
+        """
+        results = await asyncio.gather(
+            *(connection.send_text(message) for connection in connections),
+            return_exceptions=True,
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(connection)
 
 manager = ConnectionManager()
 
@@ -82,7 +94,7 @@ async def generate_mock_price_data():
             }
             
             # 価格更新をブロードキャスト
-            await manager.broadcast_to_topic("rates", json.dumps(data))
+            await manager.broadcast_to_topic("rates", dumps_message(data))
         
         await asyncio.sleep(2)  # 2秒ごとに更新
 
@@ -107,7 +119,7 @@ async def generate_mock_signals():
             "reason": f"Technical analysis indicates {signal} opportunity"
         }
         
-        await manager.broadcast_to_topic("signals", json.dumps(data))
+        await manager.broadcast_to_topic("signals", dumps_message(data))
 
 async def generate_mock_alerts():
     """模擬アラートを生成"""
@@ -130,4 +142,4 @@ async def generate_mock_alerts():
             "timestamp": datetime.now().isoformat()
         }
         
-        await manager.broadcast_to_topic("alerts", json.dumps(data))
\ No newline at end of file
+        await manager.broadcast_to_topic("alerts", dumps_message(data))
\ No newline at end of file
@@ -0,0 +1,6 @@
+"""
+Core Tests
+==========
+
+認証・セキュリティ基盤（app.core）の単体テスト
+"""
@@ -0,0 +1,76 @@
+"""
+Test suite for AuthCache
+========================
+
+認証キャッシュ（LRU + TTL）の動作テスト
+"""
+
+import time
+
+from app.core.auth_cache import AuthCache, TTLCache
+
+
+def test_ttl_cache_hit_and_miss():
+    """キャッシュのヒット・ミス統計"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_expiry():
+    """TTL経過後はエントリが失効する"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_lru_eviction():
+    """maxsize超過時は最も古く使われたエントリを破棄"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_auth_cache_invalidate_user():
+    """ユーザー単位の無効化で全トークンが削除される"""
+    cache = AuthCache(maxsize=10, ttl=60)
+    cache.set("token-1", 1, "user-1")
+    cache.set("token-2", 1, "user-1")
+    cache.set("token-3", 2, "user-2")
+
+    assert cache.invalidate_user(1) == 2
+    assert cache.get("token-1") is None
+    assert cache.get("token-2") is None
+    assert cache.get("token-3") == "user-2"
+
+
+def test_auth_cache_respects_token_exp():
+    """有効期限切れのトークンはキャッシュしない"""
+    cache = AuthCache(maxsize=10, ttl=60)
+    cache.set("expired", 1, "user-1", exp=time.time() - 1)
+    assert cache.get("expired") is None
+
+
+def test_cached_user_snapshot_excludes_password_hash():
+    """スナップショットは参照属性のみを保持しパスワードハッシュを含まない"""
+    from types import SimpleNamespace
+
+    from app.core.auth_cache import CachedUser
+
+    user = SimpleNamespace(
+        id=1, username="alice", email="alice@example.com", full_name=None, role="user",
+        is_active=True, last_login_at=None, updated_at=None, hashed_password="secret-hash",
+    )
+    cached = CachedUser.from_user(user)
+
+    assert cached.id == 1 and cached.username == "alice"
+    assert not hasattr(cached, "hashed_password")
@@ -0,0 +1,167 @@
+"""
+Test suite for JWT decode cache
+===============================
+
+トークンデコード結果キャッシュの動作テスト
+"""
+
+import asyncio
+import hashlib
+import hmac
+from datetime import timedelta
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.core import auth
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    auth._TOKEN_CACHE.clear()
+    yield
+    auth._TOKEN_CACHE.clear()
+
+
+def test_decode_caches_valid_payload(monkeypatch):
+    """2回目以降は署名検証を行わずキャッシュから返す"""
+    token = auth.create_access_token({"sub": "1"})
+    calls = []
+    original = auth._decode_access_token_uncached
+    monkeypatch.setattr(auth, "_decode_access_token_uncached", lambda t: calls.append(1) or original(t))
+
+    first = auth.decode_access_token(token)
+    first["sub"] = "tampered"
+    second = auth.decode_access_token(token)
+
+    assert second["sub"] == "1"
+    assert len(calls) == 1
+
+
+def test_decode_caches_invalid_token(monkeypatch):
+    """無効なトークンも再検証せず同じ401を返す"""
+    token = jwt.encode({"sub": "1"}, "wrong-secret", algorithm=auth.ALGORITHM)
+    calls = []
+    original = auth._decode_access_token_uncached
+    monkeypatch.setattr(auth, "_decode_access_token_uncached", lambda t: calls.append(1) or original(t))
+
+    for _ in range(3):
+        with pytest.raises(HTTPException) as exc_info:
+            auth.decode_access_token(token)
+        assert exc_info.value.status_code == 401
+
+    assert len(calls) == 1
+
+
+def test_decode_expired_token():
+    """期限切れトークンは有効期限切れの詳細で拒否する"""
+    token = auth.create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(HTTPException) as exc_info:
+        auth.decode_access_token(token)
+    assert exc_info.value.detail == "トークンの有効期限が切れています"
+
+
+@pytest.mark.parametrize("claims", [
+    {"nbf": 4102444800},
+    {"iat": 4102444800},
+    {"aud": "other-service"},
+    {"nbf": "soon"},
+])
+def test_registered_claims_are_validated_like_pyjwt(claims):
+    """未来のnbf/iat、audience未設定時のaud、数値でないクレームは無効トークンとして拒否する"""
+    token = auth.create_access_token({"sub": "1", **claims})
+    with pytest.raises(jwt.PyJWTError):
+        jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+    with pytest.raises(HTTPException) as exc_info:
+        auth.decode_access_token(token)
+    assert exc_info.value.detail == auth._INVALID_TOKEN_DETAIL
+
+
+def test_past_nbf_and_iat_are_accepted():
+    """過去のnbf/iatを持つトークンは受け付ける"""
+    token = auth.create_access_token({"sub": "1", "nbf": 946684800, "iat": 946684800})
+    assert auth.decode_access_token(token)["sub"] == "1"
+
+
+def test_legacy_bcrypt_hash_is_upgraded():
+    """bcryptハッシュは検証成功時にArgon2idの再ハッシュ値を返す"""
+    if "argon2" not in auth.pwd_context.schemes():
+        pytest.skip("argon2-cffi未導入")
+    legacy = auth.pwd_context.handler("bcrypt").using(rounds=4).hash("secret")
+
+    verified, new_hash = auth.verify_and_update_password("secret", legacy)
+    assert verified
+    assert new_hash.startswith("$argon2id$")
+    assert auth.verify_and_update_password("secret", new_hash) == (True, None)
+    assert auth.verify_and_update_password("wrong", legacy) == (False, None)
+
+
+def test_argon2_fast_path_matches_passlib():
+    """Argon2idハッシュの直接検証がpasslibの判定と一致すること"""
+    if auth._ARGON2_HASHER is None:
+        pytest.skip("argon2-cffi未導入")
+    current = auth.get_password_hash("secret")
+    weaker = auth.pwd_context.handler("argon2").using(memory_cost=8 * 1024).hash("secret")
+
+    for hashed in (current, weaker):
+        for password in ("secret", "wrong"):
+            verified, new_hash = auth.verify_and_update_password(password, hashed)
+            expected_verified, expected_new_hash = auth.pwd_context.verify_and_update(password, hashed)
+            assert verified == expected_verified
+            assert (new_hash is None) == (expected_new_hash is None)
+    assert auth.verify_and_update_password("secret", "$argon2id$broken") == (False, None)
+
+
+def test_hash_pool_sheds_load_when_saturated(monkeypatch):
+    """同時実行数が上限に達している場合は503で即時に拒否する"""
+    monkeypatch.setattr(auth, "_pending_hashes", auth.MAX_PENDING_HASHES)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(auth.verify_password_async("secret", "hash"))
+
+    assert exc_info.value.status_code == 503
+    assert auth._pending_hashes == auth.MAX_PENDING_HASHES
+
+
+def test_token_interoperates_with_pyjwt():
+    """生成したトークンがPyJWTの標準APIで検証でき、その逆も成り立つこと"""
+    token = auth.create_access_token({"sub": "1", "role": "user"})
+    payload = jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+    assert payload["sub"] == "1"
+    assert isinstance(payload["exp"], int)
+
+    foreign = jwt.encode({"sub": "2", "exp": payload["exp"]}, auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+    assert auth.decode_access_token(foreign)["sub"] == "2"
+
+    unsigned = jwt.encode({"sub": "3"}, None, algorithm="none")
+    with pytest.raises(HTTPException):
+        auth.decode_access_token(unsigned)
+
+
+@pytest.mark.parametrize("token", ["", "not-a-token", "a.b.c", "eyJhbGciOiJIUzI1NiJ9.bm90IGpzb24.sig"])
+def test_malformed_tokens_are_rejected(token):
+    """形式不正なトークンは例外を漏らさず401で拒否する"""
+    with pytest.raises(HTTPException) as exc_info:
+        auth.decode_access_token(token)
+    assert exc_info.value.detail == "無効なトークンです"
+
+
+def test_non_json_payload_with_valid_signature_is_rejected():
+    """正しく署名されていてもペイロードがJSONオブジェクトでなければ拒否する"""
+    for payload in (b"not json", b"[1, 2]"):
+        token = auth._JWS.encode(payload, auth._SIGNING_KEY, algorithm=auth.ALGORITHM)
+        with pytest.raises(HTTPException):
+            auth.decode_access_token(token)
+
+
+@pytest.mark.parametrize("key", [b"short-key", b"k" * 64, b"long-key" * 20])
+def test_precomputed_hs256_matches_hmac(key):
+    """事前計算したパッド状態による署名が標準のHMAC-SHA256と一致すること"""
+    algorithm = auth._PrecomputedHS256(key)
+    for msg in (b"", b"header.payload", b"x" * 500):
+        expected = hmac.new(key, msg, hashlib.sha256).digest()
+        assert algorithm.sign(msg, key) == expected
+        assert algorithm.verify(msg, key, expected)
+        assert not algorithm.verify(msg, key, b"\0" * 32)
+    assert algorithm.sign(b"msg", b"other") == hmac.new(b"other", b"msg", hashlib.sha256).digest()
@@ -0,0 +1,22 @@
+"""
+キャッシュ付き現在時刻のテスト
+"""
+
+from datetime import datetime
+
+from app.core import clock
+
+
+def test_now_cached_reuses_value_within_refresh_interval(monkeypatch):
+    """更新間隔内は同一オブジェクトを返し、経過後に更新されること"""
+    ticks = iter([100.0, 100.5, 101.2])
+    monkeypatch.setattr(clock.time, "monotonic", lambda: next(ticks))
+    monkeypatch.setattr(clock, "_cached_now", None)
+
+    first = clock.now_cached()
+    second = clock.now_cached()
+    third = clock.now_cached()
+
+    assert isinstance(first, datetime)
+    assert second is first
+    assert third is not first
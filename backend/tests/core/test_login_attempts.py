@@ -0,0 +1,40 @@
+"""
+ログイン失敗カウンターのテスト（Redis・DB不要）
+"""
+
+import asyncio
+
+from app.core.login_attempts import LoginAttemptCounter
+
+
+def test_increment_and_reset_per_user():
+    """ユーザー単位で失敗回数を数え、リセットで0に戻ること"""
+    async def scenario():
+        counter = LoginAttemptCounter(redis_url=None)
+        counts = [await counter.increment(1) for _ in range(3)]
+        other = await counter.increment(2)
+        await counter.reset(1)
+        return counts, other, await counter.increment(1)
+
+    counts, other, after_reset = asyncio.run(scenario())
+
+    assert counts == [1, 2, 3]
+    assert other == 1
+    assert after_reset == 1
+
+
+def test_window_is_fixed_from_first_failure(monkeypatch):
+    """失敗を重ねても有効期限は初回失敗から延長されないこと"""
+    now = [1000.0]
+    monkeypatch.setattr("app.core.auth_cache.time.monotonic", lambda: now[0])
+    monkeypatch.setattr("app.core.login_attempts.time.monotonic", lambda: now[0])
+
+    async def scenario():
+        counter = LoginAttemptCounter(redis_url=None, window=10)
+        await counter.increment(1)
+        now[0] += 8
+        second = await counter.increment(1)
+        now[0] += 3
+        return second, await counter.increment(1)
+
+    assert asyncio.run(scenario()) == (2, 1)
@@ -0,0 +1,110 @@
+"""
+レスポンスキャッシュミドルウェアのテスト（Redis・DB不要）
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session
+
+from app.core.response_cache import (
+    ResponseCacheMiddleware,
+    ResponseCacheStore,
+    build_cache_key,
+    response_cache,
+)
+from app.models import ActiveAlert
+
+
+def _make_client():
+    """呼び出し回数を数える最小アプリ"""
+    calls = {"count": 0}
+    app = FastAPI()
+    store = ResponseCacheStore(redis_url=None, ttl=15)
+    app.add_middleware(ResponseCacheMiddleware, store=store, paths=frozenset({"/cached", "/error"}))
+
+    @app.get("/cached")
+    async def cached(q: str = ""):
+        calls["count"] += 1
+        return {"q": q, "count": calls["count"]}
+
+    @app.get("/uncached")
+    async def uncached():
+        calls["count"] += 1
+        return {"count": calls["count"]}
+
+    @app.get("/error", status_code=503)
+    async def error():
+        calls["count"] += 1
+        return {"count": calls["count"]}
+
+    return TestClient(app), store, calls
+
+
+def test_cache_key_ignores_query_order():
+    """クエリパラメータの順序に依存しないこと"""
+    assert build_cache_key("/a", b"x=1&y=2", 0) == build_cache_key("/a", b"y=2&x=1", 0)
+    assert build_cache_key("/a", b"x=1", 0) != build_cache_key("/a", b"x=1", 1)
+
+
+def test_repeated_get_is_served_from_cache():
+    """2回目以降は同一バイト列を返しハンドラーを呼ばないこと"""
+    client, _, calls = _make_client()
+
+    first = client.get("/cached?q=a")
+    second = client.get("/cached?q=a")
+
+    assert first.json() == second.json() == {"q": "a", "count": 1}
+    assert second.headers["x-cache"] == "HIT"
+    assert calls["count"] == 1
+
+    assert client.get("/cached?q=b").json()["count"] == 2
+
+
+def test_non_whitelisted_and_error_responses_are_not_cached():
+    """対象外パスと200以外のレスポンスはキャッシュしないこと"""
+    client, _, calls = _make_client()
+
+    client.get("/uncached")
+    client.get("/uncached")
+    client.get("/error")
+    client.get("/error")
+
+    assert calls["count"] == 4
+
+
+def test_touch_invalidates_cached_responses():
+    """データバージョン更新で再計算されること"""
+    client, store, calls = _make_client()
+
+    client.get("/cached")
+    store.touch()
+    response = client.get("/cached")
+
+    assert response.json()["count"] == 2
+    assert "x-cache" not in response.headers
+
+
+def test_alert_writes_advance_data_version():
+    """アラートの追加と一括の確認済み更新のコミットでデータバージョンが進むこと"""
+    engine = create_engine("sqlite://")
+    ActiveAlert.__table__.create(engine)
+
+    with Session(engine) as session:
+        version = response_cache._version
+        session.add(ActiveAlert(id=1, alert_setting_id=1, title="t", message="m"))
+        session.commit()
+        assert response_cache._version == version + 1
+
+        session.execute(
+            update(ActiveAlert).where(ActiveAlert.id == 1).values(is_acknowledged=True)
+        )
+        session.commit()
+        assert response_cache._version == version + 2
+
+        session.execute(
+            update(ActiveAlert).where(ActiveAlert.id == 1).values(is_acknowledged=False)
+        )
+        session.rollback()
+        session.commit()
+        assert response_cache._version == version + 2
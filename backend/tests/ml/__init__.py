@@ -0,0 +1,6 @@
+"""
+ML Tests
+========
+
+特徴量生成・予測モデル（app.ml）の単体テスト
+"""
@@ -0,0 +1,56 @@
+"""
+Test suite for ensemble kernels
+===============================
+
+アンサンブルの加重平均・集計カーネルの検証（DB不要）
+"""
+
+import numpy as np
+import pytest
+
+from app.ml import _ensemble_kernels as kernels
+
+
+def test_weighted_average_bounds_matches_numpy():
+    """予測値・下限・上限の加重平均がNumPyの式と一致すること（float32入力を含む）"""
+    rng = np.random.default_rng(5)
+    lstm = rng.normal(size=(3, 64)).astype(np.float32)
+    xgb = rng.normal(size=(3, 64))
+
+    pred, lower, upper = kernels.weighted_average_bounds(
+        lstm[0], xgb[0], lstm[1], xgb[1], lstm[2], xgb[2], 0.3, 0.7
+    )
+
+    for actual, a, b in zip((pred, lower, upper), lstm, xgb):
+        np.testing.assert_allclose(actual, 0.3 * a.astype(np.float64) + 0.7 * b, rtol=1e-12)
+    np.testing.assert_allclose(
+        kernels.weighted_average(lstm[0], xgb[0], 0.3, 0.7),
+        0.3 * lstm[0].astype(np.float64) + 0.7 * xgb[0],
+        rtol=1e-12,
+    )
+
+
+def test_weighted_average_rejects_length_mismatch():
+    """長さの異なる予測は結合しないこと"""
+    with pytest.raises(ValueError):
+        kernels.weighted_average(np.zeros(3), np.zeros(2), 0.5, 0.5)
+
+
+def test_weighted_fields_matches_numpy():
+    """各項目の重み付き合計が行列積と一致すること"""
+    rng = np.random.default_rng(3)
+    fields = rng.normal(150.0, 1.0, size=(5, 3))
+    weights = np.array([0.4, 0.3, 0.3])
+
+    np.testing.assert_allclose(kernels.weighted_fields(fields, weights), fields @ weights, rtol=1e-12)
+
+
+def test_summary_stats_matches_numpy():
+    """平均・母標準偏差・最小値・最大値がNumPyと一致すること"""
+    values = np.array([150.036, 150.2247, 150.119])
+
+    avg, std, low, high = kernels.summary_stats(values)
+
+    assert avg == pytest.approx(values.mean(), rel=1e-12)
+    assert std == pytest.approx(values.std(), rel=1e-9)
+    assert (low, high) == (values.min(), values.max())
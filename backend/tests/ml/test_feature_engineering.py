@@ -0,0 +1,98 @@
+"""
+Test suite for FeatureEngineer
+==============================
+
+特徴量生成・シーケンス準備の数値検証（DB不要）
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.feature_engineering import FeatureEngineer
+
+
+@pytest.fixture
+def ohlc_frame():
+    """再現可能なランダムウォークのOHLCデータ"""
+    rng = np.random.default_rng(7)
+    n = 400
+    close = 150.0 + np.cumsum(rng.normal(0, 0.5, n))
+    open_ = close + rng.normal(0, 0.2, n)
+    return pd.DataFrame({
+        "date": pd.date_range("2023-01-02", periods=n, freq="D"),
+        "open_rate": open_,
+        "high_rate": np.maximum(open_, close) + np.abs(rng.normal(0, 0.3, n)),
+        "low_rate": np.minimum(open_, close) - np.abs(rng.normal(0, 0.3, n)),
+        "close_rate": close,
+    })
+
+
+def test_prepare_sequences_matches_reference_windows(ohlc_frame):
+    """各シーケンスが正規化済み特徴量の連続区間と一致すること"""
+    engineer = FeatureEngineer()
+    features = engineer.create_features(ohlc_frame).dropna().reset_index(drop=True)
+
+    X, y = engineer.prepare_sequences(features, sequence_length=30, prediction_horizon=5)
+
+    normalized = (features[engineer.feature_names] - engineer.feature_means) / (engineer.feature_stds + 1e-10)
+    prices = features["close_rate"].to_numpy()
+    assert X.shape == (len(features) - 30 - 5 + 1, 30, len(engineer.feature_names))
+    assert X.dtype == np.float32
+    # シーケンスは正規化済み配列を複製しないビュー
+    assert np.shares_memory(X[0], X[1])
+    for i in (0, 17, len(X) - 1):
+        np.testing.assert_allclose(X[i], normalized.iloc[i:i + 30].to_numpy(), rtol=1e-5, atol=1e-5)
+        assert y[i] == pytest.approx((prices[i + 34] - prices[i + 29]) / prices[i + 29])
+
+
+def test_prepare_sequences_aligns_target_after_warmup_rows(ohlc_frame):
+    """指標のウォームアップ行を除外した後の行を基準に目的変数を計算すること"""
+    engineer = FeatureEngineer()
+    features = engineer.create_features(ohlc_frame)
+
+    _, y = engineer.prepare_sequences(features, sequence_length=30, prediction_horizon=1)
+
+    prices = features.dropna()["close_rate"].to_numpy()
+    np.testing.assert_allclose(y[:5], (prices[30:35] - prices[29:34]) / prices[29:34])
+
+
+def test_prepare_sequences_short_input_is_empty(ohlc_frame):
+    """シーケンス長に満たないデータでは空配列を返すこと"""
+    engineer = FeatureEngineer()
+    features = engineer.create_features(ohlc_frame).dropna().iloc[:20]
+
+    X, y = engineer.prepare_sequences(features, sequence_length=30)
+
+    assert X.shape == (0, 30, len(engineer.feature_names))
+    assert y.shape == (0,)
+
+
+def test_create_features_stores_single_precision_features(ohlc_frame):
+    """生成した特徴量は単精度で保持し、元のOHLC列のdtypeは変えないこと"""
+    engineer = FeatureEngineer()
+    features = engineer.create_features(ohlc_frame)
+
+    assert features["close_rate"].dtype == np.float64
+    assert features["rsi"].dtype == np.float32
+    assert features["rolling_std_20"].dtype == np.float32
+
+    X, _ = engineer.prepare_tabular_data(features)
+    assert (X.dtypes == np.float32).all()
+
+
+@pytest.mark.parametrize("bootstrap_rows,max_rows", [(1, None), (120, 80)])
+def test_incremental_features_match_batch(ohlc_frame, bootstrap_rows, max_rows):
+    """1本ずつ追加した特徴量が全期間の一括計算と一致すること（欠損値・古い行の破棄を含む）"""
+    ohlc_frame.loc[[10, 150], "close_rate"] = np.nan
+    engineer = FeatureEngineer()
+    engineer.start_incremental(ohlc_frame.iloc[:bootstrap_rows], max_rows=max_rows)
+
+    for i in range(bootstrap_rows, len(ohlc_frame)):
+        online = engineer.create_features_incremental(ohlc_frame.iloc[i].to_dict())
+
+    expected = FeatureEngineer().create_features(ohlc_frame).iloc[-len(online):]
+    assert len(online) == (max_rows or len(ohlc_frame))
+    assert list(online.columns) == list(expected.columns)
+    assert list(online.dtypes) == list(expected.dtypes)
+    pd.testing.assert_frame_equal(online, expected, check_exact=False, rtol=1e-5, atol=1e-6)
@@ -0,0 +1,80 @@
+"""
+Test suite for feature kernels
+==============================
+
+特徴量カーネルがpandasの集計と一致することの検証（DB不要）
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml import _feature_kernels as kernels
+
+
+@pytest.fixture
+def series_with_gaps():
+    """欠損値を含む再現可能なランダムウォーク"""
+    rng = np.random.default_rng(3)
+    values = 150.0 + np.cumsum(rng.normal(0, 0.5, 300))
+    values[[40, 41, 200]] = np.nan
+    return values
+
+
+def _assert_matches(actual, expected):
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected.to_numpy()))
+    np.testing.assert_allclose(actual, expected.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("window", [1, 3, 20, 50])
+def test_rolling_statistics_match_pandas(series_with_gaps, window):
+    """ローリング平均・標準偏差・最大・最小がpandasと一致すること（窓内の欠損を含む）"""
+    rolling = pd.Series(series_with_gaps).rolling(window=window)
+    _assert_matches(kernels.rolling_mean(series_with_gaps, window), rolling.mean())
+    _assert_matches(kernels.rolling_std(series_with_gaps, window), rolling.std())
+    _assert_matches(kernels.rolling_max(series_with_gaps, window), rolling.max())
+    _assert_matches(kernels.rolling_min(series_with_gaps, window), rolling.min())
+
+    fused = kernels.rolling_window_stats(series_with_gaps, window)
+    for row, expected in enumerate((rolling.mean(), rolling.std(), rolling.max(), rolling.min())):
+        _assert_matches(fused[row], expected)
+
+
+@pytest.mark.parametrize("span", [2, 9, 26])
+def test_ewm_mean_matches_pandas(series_with_gaps, span):
+    """指数加重移動平均がewm(adjust=False)と一致すること"""
+    values = np.concatenate([[np.nan], series_with_gaps])
+    expected = pd.Series(values).ewm(span=span, adjust=False).mean()
+    _assert_matches(kernels.ewm_mean(values, span), expected)
+
+
+def test_wilder_rsi_matches_reference_recursion(series_with_gaps):
+    """RSIがWilderの平滑化（単純平均で初期化）と一致すること"""
+    period = 14
+    delta = np.nan_to_num(np.diff(series_with_gaps))
+    gains, losses = np.maximum(delta, 0), np.maximum(-delta, 0)
+
+    expected = np.full(len(series_with_gaps), np.nan)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    expected[period] = 100 - 100 / (1 + avg_gain / (avg_loss + 1e-10))
+    for i in range(period, len(delta)):
+        avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+        expected[i + 1] = 100 - 100 / (1 + avg_gain / (avg_loss + 1e-10))
+
+    _assert_matches(kernels.wilder_rsi(series_with_gaps, period), pd.Series(expected))
+    assert np.isnan(kernels.wilder_rsi(series_with_gaps[:period], period)).all()
+
+
+def test_atr_matches_pandas_definition(series_with_gaps):
+    """ATRが従来のpandas実装と一致すること"""
+    close = pd.Series(series_with_gaps)
+    high, low = close + 0.5, close - 0.5
+
+    true_range = pd.concat(
+        [high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1
+    ).max(axis=1)
+    _assert_matches(
+        kernels.average_true_range(high.to_numpy(), low.to_numpy(), close.to_numpy(), 14),
+        true_range.rolling(window=14).mean(),
+    )
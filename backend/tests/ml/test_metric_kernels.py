@@ -0,0 +1,34 @@
+"""
+Test suite for metric kernels
+=============================
+
+評価メトリクスカーネルの検証（DB不要）
+"""
+
+import numpy as np
+import pytest
+
+from app.ml import _metric_kernels as kernels
+
+
+def test_regression_metrics_matches_numpy():
+    """MSE・MAE・MAPE・方向精度がNumPyの式と一致すること（0の実績値・float32入力を含む）"""
+    rng = np.random.default_rng(11)
+    y_true = rng.normal(size=256).astype(np.float32)
+    y_true[[3, 40]] = 0.0
+    y_pred = rng.normal(size=256).astype(np.float32)
+
+    mse, mae, mape, direction = kernels.regression_metrics(y_true, y_pred, mape_floor=1e-7)
+
+    actual = y_true.astype(np.float64)
+    errors = actual - y_pred.astype(np.float64)
+    assert mse == pytest.approx(np.mean(errors ** 2), rel=1e-12)
+    assert mae == pytest.approx(np.mean(np.abs(errors)), rel=1e-12)
+    assert mape == pytest.approx(100 * np.mean(np.abs(errors) / np.maximum(np.abs(actual), 1e-7)), rel=1e-12)
+    assert direction == np.mean((y_pred > 0) == (y_true > 0))
+
+
+def test_regression_metrics_rejects_length_mismatch():
+    """長さの異なる実績値と予測値は評価しないこと"""
+    with pytest.raises(ValueError):
+        kernels.regression_metrics(np.zeros(3), np.zeros(2))
@@ -0,0 +1,48 @@
+"""
+Test suite for compiled XGBoost inference
+=========================================
+
+コンパイル済みモデルの一時ディレクトリの後始末の検証（xgboost・treelite・tl2cgen導入時のみ）
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("xgboost")
+pytest.importorskip("tl2cgen")
+
+from app.ml.xgboost_model import NATIVE_PREDICTOR_AVAILABLE, XGBoostForexPredictor
+
+pytestmark = pytest.mark.skipif(not NATIVE_PREDICTOR_AVAILABLE, reason="treelite/tl2cgen not installed")
+
+
+def _trained_predictor() -> XGBoostForexPredictor:
+    """小さなデータで学習したモデル"""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 4)), columns=[f"f{i}" for i in range(4)])
+    y = X["f0"] * 0.5 + rng.normal(scale=0.1, size=200)
+    predictor = XGBoostForexPredictor(n_estimators=10, max_depth=3)
+    predictor.build_model()
+    predictor.model.fit(X, y)
+    return predictor
+
+
+def test_recompile_and_close_remove_temporary_directories():
+    """再コンパイルで以前の一時ディレクトリを、close()で現在の一時ディレクトリを削除すること"""
+    predictor = _trained_predictor()
+
+    assert predictor.compile_native_predictor()
+    first_dir = os.path.dirname(predictor.native_library_path)
+    assert predictor.compile_native_predictor()
+    second_dir = os.path.dirname(predictor.native_library_path)
+
+    assert not os.path.exists(first_dir)
+    assert os.path.exists(second_dir)
+
+    predictor.close()
+
+    assert not os.path.exists(second_dir)
+    assert predictor.native_predictor is None
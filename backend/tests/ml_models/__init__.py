@@ -0,0 +1,6 @@
+"""
+ML Models Tests
+===============
+
+統計予測モデル（app.ml_models）の単体テスト
+"""
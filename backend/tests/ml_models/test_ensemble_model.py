@@ -0,0 +1,148 @@
+"""
+Test suite for EnsembleModel
+============================
+
+アンサンブル選択による重み付けと、サブモデル失敗時の統合の検証（DB不要）
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.ml_models.ensemble_model import (
+    ENSEMBLE_SELECTION_SIZE,
+    EnsembleModel,
+    _greedy_ensemble_selection,
+)
+
+
+class _StubPredictor:
+    """現在レートに固定のオフセットを加えて予測するサブモデル"""
+
+    def __init__(self, offset: float, fail: bool = False):
+        self.offset = offset
+        self.fail = fail
+
+    def predict(self, target_days, current_rate, recent_data=None):
+        if self.fail:
+            raise RuntimeError("prediction failed")
+        rate = current_rate + self.offset
+        return {
+            "predicted_rate": rate,
+            "confidence_interval": {"lower": rate - 1.0, "upper": rate + 1.0},
+            "volatility": {"predicted": 0.15},
+            "prediction_strength": 0.5,
+        }
+
+
+def _make_model(weights, offsets, failing=()):
+    """スタブのサブモデルと指定の重みで学習済みとしたアンサンブル"""
+    model = EnsembleModel()
+    model.sub_models = {
+        name: _StubPredictor(offset, fail=name in failing) for name, offset in offsets.items()
+    }
+    model.model_weights = dict(weights)
+    model._update_normalized_weights()
+    model.is_trained = True
+    return model
+
+
+_OFFSETS = {"trend_following": 1.0, "mean_reversion": -1.0, "volatility_adjusted": 3.0}
+
+
+def test_greedy_selection_picks_best_model_every_round():
+    """実測値に一致するモデルがあれば毎回そのモデルを選ぶこと"""
+    targets = np.linspace(150.0, 151.0, 30)
+    predictions = np.stack([targets + 2.0, targets, targets - 0.5])
+
+    counts = _greedy_ensemble_selection(predictions, targets, 20)
+
+    np.testing.assert_array_equal(counts, [0, 20, 0])
+
+
+def test_greedy_selection_balances_opposite_biases():
+    """逆向きに偏ったモデルは交互に選ばれ、平均で偏りを打ち消すこと"""
+    targets = np.linspace(150.0, 151.0, 30)
+    predictions = np.stack([targets + 1.0, targets - 1.0])
+
+    counts = _greedy_ensemble_selection(predictions, targets, 20)
+
+    np.testing.assert_array_equal(counts, [10, 10])
+
+
+def test_optimize_weights_can_select_a_single_model():
+    """検証誤差が最小のモデルだけが選ばれると、その重みが1.0になること"""
+    model = EnsembleModel()
+    model.sub_models = {
+        "trend_following": _StubPredictor(2.0),
+        "mean_reversion": _StubPredictor(0.0),
+        "volatility_adjusted": _StubPredictor(-3.0),
+    }
+    start = date(2024, 1, 1)
+    historical_data = [
+        {"date": start + timedelta(days=i), "close_rate": 150.0 + 0.01 * i} for i in range(60)
+    ]
+
+    result = model._optimize_ensemble_weights(historical_data)
+
+    assert result["method"] == "greedy_ensemble_selection"
+    assert result["ensemble_size"] == ENSEMBLE_SELECTION_SIZE
+    assert model.model_weights == {
+        "trend_following": 0.0, "mean_reversion": 1.0, "volatility_adjusted": 0.0
+    }
+
+
+def test_single_weighted_model_passes_through():
+    """重みのあるサブモデルが1つなら、その予測がそのまま使われること"""
+    model = _make_model(
+        {"trend_following": 1.0, "mean_reversion": 0.0, "volatility_adjusted": 0.0}, _OFFSETS
+    )
+
+    result = model.predict(5, 150.0)
+
+    assert result["predicted_rate"] == 151.0
+    assert result["confidence_interval"]["lower"] == 150.0
+    assert result["confidence_interval"]["upper"] == 152.0
+
+
+def test_failed_single_weighted_model_falls_back_to_equal_weights():
+    """唯一の重み付きモデルが失敗したら、残りのモデルを等しい重みで統合すること"""
+    model = _make_model(
+        {"trend_following": 1.0, "mean_reversion": 0.0, "volatility_adjusted": 0.0},
+        _OFFSETS,
+        failing=("trend_following",),
+    )
+
+    result = model.predict(5, 150.0)
+
+    assert result["predicted_rate"] == pytest.approx(151.0)
+    assert result["confidence_interval"]["lower"] == pytest.approx(150.0)
+    assert result["confidence_interval"]["upper"] == pytest.approx(152.0)
+    assert result["volatility"]["predicted"] == pytest.approx(0.15)
+    assert set(result["sub_predictions"]) == {"mean_reversion", "volatility_adjusted"}
+
+
+def test_failed_model_weight_is_renormalized_over_survivors():
+    """失敗したモデルを除いた重みで正規化し直すこと"""
+    model = _make_model(
+        {"trend_following": 0.4, "mean_reversion": 0.3, "volatility_adjusted": 0.3},
+        _OFFSETS,
+        failing=("volatility_adjusted",),
+    )
+
+    result = model.predict(5, 150.0)
+
+    expected = 150.0 + (0.4 * 1.0 + 0.3 * -1.0) / 0.7
+    assert result["predicted_rate"] == pytest.approx(round(expected, 4))
+
+
+def test_cached_sub_model_info_is_not_shared_with_callers():
+    """キャッシュしたサブモデル情報を呼び出し側が変更しても、次の呼び出しに影響しないこと"""
+    model = EnsembleModel()
+
+    first = model.get_model_info(include_sub_models=True)
+    first["sub_models"]["trend_following"]["parameters"]["short_ma_period"] = -1
+    second = model.get_model_info(include_sub_models=True)
+
+    assert second["sub_models"]["trend_following"]["parameters"]["short_ma_period"] != -1
@@ -11,6 +11,7 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 import asyncio
+import json
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -168,6 +169,45 @@ async def test_get_trades_not_found(async_session: AsyncSession) -> None:
     assert result is None
 
 
+@pytest.mark.asyncio
+async def test_stream_trades_matches_get_trades(async_session: AsyncSession) -> None:
+    """ストリーミング出力がget_tradesと同じJSONになることのテスト"""
+    service = BacktestService(async_session)
+    
+    trades = [
+        {
+            "trade_date": f"2020-01-{i % 28 + 1:02d}T00:00:00",
+            "signal_type": "buy" if i % 2 else "sell",
+            "entry_rate": 150 + i / 100,
+            "exit_rate": 151.0,
+            "position_size": 1000,
+            "profit_loss": (i % 7 - 3) * 100.5,
+            "holding_period": i % 5,
+            "confidence": 0.7,
+            "market_volatility": 0.01
+        }
+        for i in range(250)
+    ]
+    async_session.add(BacktestResult(
+        job_id="test-job-stream",
+        start_date=date(2020, 1, 1),
+        end_date=date(2020, 12, 31),
+        initial_capital=Decimal("1000000"),
+        model_type=PredictionModel.ENSEMBLE,
+        status=BacktestStatus.COMPLETED,
+        trade_log=json.dumps(trades)
+    ))
+    await async_session.commit()
+    
+    for page, page_size in [(1, 230), (3, 100), (9, 100)]:
+        expected = await service.get_trades("test-job-stream", page, page_size)
+        chunks = await service.stream_trades("test-job-stream", page, page_size)
+        body = b"".join([chunk async for chunk in chunks])
+        assert json.loads(body) == json.loads(expected.model_dump_json())
+    
+    assert await service.stream_trades("non-existent-job-id", 1, 100) is None
+
+
 @pytest.mark.asyncio
 async def test_validate_data_availability_insufficient_data(async_session: AsyncSession) -> None:
     """データ不足時のバリデーションテスト"""
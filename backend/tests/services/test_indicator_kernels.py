@@ -0,0 +1,79 @@
+"""
+Test suite for indicator kernels
+================================
+
+テクニカル指標カーネルの数値検証（DB不要）
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from app.services import _indicator_kernels as kernels
+
+
+@pytest.fixture
+def price_series():
+    """再現可能なランダムウォーク価格列"""
+    rng = np.random.default_rng(42)
+    close = 150.0 + np.cumsum(rng.normal(0, 0.5, 200))
+    high = close + np.abs(rng.normal(0, 0.3, 200))
+    low = close - np.abs(rng.normal(0, 0.3, 200))
+    return close, high, low
+
+
+def test_sma_and_ema(price_series):
+    """移動平均がNumPy実装と一致すること"""
+    close, _, _ = price_series
+    assert kernels.sma_at(close, 199, 25) == pytest.approx(close[-25:].mean())
+    assert math.isnan(kernels.sma_at(close, 3, 25))
+    assert math.isnan(kernels.ema_last(close[:10], 12))
+
+
+def test_bollinger_uses_population_std(price_series):
+    """ボリンジャーバンドの標準偏差がnp.std（母分散）と一致すること"""
+    close, _, _ = price_series
+    upper, middle, lower, width = kernels.bollinger_last(close, 20, 2.0)
+    assert middle == pytest.approx(close[-20:].mean())
+    assert upper - middle == pytest.approx(2.0 * close[-20:].std())
+    assert width == pytest.approx(upper - lower)
+
+
+def test_rsi_bounds(price_series):
+    """RSIが0〜100の範囲に収まり、単調増加では100になること"""
+    close, _, _ = price_series
+    assert 0.0 <= kernels.rsi_last(close, 14) <= 100.0
+    assert kernels.rsi_last(np.arange(1.0, 30.0), 14) == 100.0
+    assert kernels.rsi_last(close[:10], 14) == 50.0
+
+
+def test_atr_matches_true_range(price_series):
+    """ATRが直近14本のTrue Range平均と一致すること"""
+    close, high, low = price_series
+    tr = np.maximum.reduce([
+        high[1:] - low[1:],
+        np.abs(high[1:] - close[:-1]),
+        np.abs(low[1:] - close[:-1]),
+    ])
+    assert kernels.atr_last(high, low, close, 14) == pytest.approx(tr[-14:].mean())
+
+
+def test_series_kernels_match_point_kernels(price_series):
+    """時系列カーネルの各バーの値が単点カーネルと一致すること"""
+    close, high, low = price_series
+    sma = kernels.rolling_mean(close, 25)
+    rsi = kernels.rsi_series(close, 14)
+    stoch = kernels.stochastic_k_series(high, low, close, 14)
+    assert np.isnan(sma[:24]).all() and np.isnan(rsi[:14]).all()
+    for i in (24, 100, 199):
+        assert sma[i] == pytest.approx(kernels.sma_at(close, i, 25))
+        assert rsi[i] == pytest.approx(kernels.rsi_last(close[:i + 1], 14))
+        assert stoch[i] == pytest.approx(kernels.stochastic_last(high[:i + 1], low[:i + 1], close[:i + 1], 14)[0])
+
+
+def test_expanding_mean_and_trailing_signal():
+    """先頭バーの扱い（利用可能な本数で平均、シグナルは当該値）"""
+    values = np.array([1.0, 2.0, 3.0, 4.0])
+    assert list(kernels.expanding_rolling_mean(values, 2)) == [1.0, 1.5, 2.5, 3.5]
+    assert list(kernels.trailing_signal(values, values, 3)) == [1.0, 2.0, 2.0, 3.0]
@@ -0,0 +1,70 @@
+"""
+Test suite for risk kernels
+===========================
+
+バックテスト・リスク指標カーネルの数値検証（DB不要）
+"""
+
+import numpy as np
+import pytest
+
+from app.services import _risk_kernels as kernels
+
+
+@pytest.fixture
+def returns():
+    """再現可能な日次リターン系列"""
+    return np.random.default_rng(7).normal(0, 0.01, 500)
+
+
+def test_rolling_std_matches_numpy(returns):
+    """スライディングWelford法がnp.stdと一致すること"""
+    rolling = kernels.rolling_std(returns, 20, 1)
+    assert np.isnan(rolling[:19]).all()
+    for j in (19, 100, 499):
+        assert rolling[j] == pytest.approx(returns[j - 19:j + 1].std(ddof=1), rel=1e-9)
+
+
+@pytest.mark.parametrize("k", [0, 1, 25, 250, 499])
+def test_quickselect_matches_sort(returns, k):
+    """クイックセレクトがソート結果のk番目と一致し、入力を変更しないこと"""
+    original = returns.copy()
+    assert kernels.quickselect(returns, k) == np.sort(returns)[k]
+    assert np.array_equal(returns, original)
+
+
+def test_historical_var_and_expected_shortfall(returns):
+    """VaRが下位5%分位点、ESがそれ以下の平均であること"""
+    var_return, es_return = kernels.historical_var(returns, 0.95)
+    sorted_returns = np.sort(returns)
+    assert var_return == sorted_returns[int(0.05 * len(returns))]
+    assert es_return == pytest.approx(sorted_returns[sorted_returns <= var_return].mean())
+
+
+def test_drawdown_series_and_durations():
+    """ドローダウン系列と継続期間"""
+    values = np.array([100.0, 110.0, 99.0, 105.0, 111.0, 100.0, 100.0])
+    drawdowns = kernels.drawdown_series(values)
+    assert drawdowns[2] == pytest.approx(-10.0)
+    assert drawdowns[4] == 0.0
+    assert kernels.drawdown_durations(drawdowns, -0.1) == (2, 2)
+    assert kernels.max_drawdown_ratio(values) == pytest.approx(0.1)
+
+
+def test_simulate_trades_buy_then_sell():
+    """買い→売りで直前の買い取引が決済されること"""
+    close = np.array([100.0, 100.0, 110.0])
+    signal = np.array([kernels.SIGNAL_BUY, kernels.SIGNAL_NONE, kernels.SIGNAL_SELL], dtype=np.int64)
+    confidence = np.array([0.9, 0.0, 0.9])
+
+    (cash, position, trade_bar, trade_side, trade_size, trade_exit_bar, trade_pnl,
+     final_capital, final_position) = kernels.simulate_trades(close, signal, confidence, 1_000_000.0, 0.6)
+
+    assert list(trade_bar) == [0, 2]
+    assert list(trade_side) == [kernels.SIGNAL_BUY, kernels.SIGNAL_SELL]
+    assert trade_size[0] == pytest.approx(2000.0)
+    assert trade_exit_bar[0] == 2
+    assert trade_pnl[0] == pytest.approx(1000.0 * 10.0)
+    assert position[1] == pytest.approx(2000.0)
+    assert final_position == pytest.approx(1000.0)
+    assert final_capital == pytest.approx(800_000.0 + 110_000.0)
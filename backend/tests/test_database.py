@@ -0,0 +1,57 @@
+"""
+Database Dependency Tests
+
+get_db のセマフォ制御のテスト（DB不要）
+- ルートと認証依存が同じセッションを共有し、1リクエストで枠を1つだけ使うこと
+"""
+
+import asyncio
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from app import database
+from app.core.dependencies import get_current_user_optional
+from app.database import get_async_db, get_db
+
+
+class _FakeSession:
+    """AsyncSessionLocal の代わりに使う接続なしのセッション"""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _make_app() -> FastAPI:
+    """get_db とオプショナル認証の両方に依存する最小アプリ"""
+    app = FastAPI()
+
+    @app.get("/shared")
+    async def shared(
+        db=Depends(get_db),
+        legacy_db=Depends(get_async_db),
+        user=Depends(get_current_user_optional),
+    ):
+        return {"same_session": db is legacy_db, "user": user}
+
+    return app
+
+
+def test_request_uses_single_semaphore_slot(monkeypatch):
+    """同時セッション上限1でも認証依存付きのリクエストが完了すること"""
+    monkeypatch.setattr(database, "AsyncSessionLocal", _FakeSession)
+
+    async def request() -> httpx.Response:
+        monkeypatch.setattr(database, "_db_semaphore", asyncio.Semaphore(1))
+        transport = httpx.ASGITransport(app=_make_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.wait_for(client.get("/shared"), timeout=5)
+
+    response = asyncio.run(request())
+
+    assert response.status_code == 200
+    assert response.json() == {"same_session": True, "user": None}
+    assert database.get_db_semaphore()._value == 1
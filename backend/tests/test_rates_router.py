@@ -0,0 +1,56 @@
+"""
+Rates API Router Tests
+
+/api/rates/current のルーターテスト（DB不要）
+- 同期Sessionを使うサービスには get_sync_db のセッションが渡されること
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.database import get_sync_db
+from app.models import DataSourceType, ExchangeRate
+from app.routers.rates import router
+
+
+def _make_client(session: Session) -> TestClient:
+    """同期セッションを差し替えた最小アプリ"""
+    app = FastAPI()
+    app.include_router(router, prefix="/api/rates")
+
+    def override_get_sync_db():
+        yield session
+
+    app.dependency_overrides[get_sync_db] = override_get_sync_db
+    return TestClient(app)
+
+
+def test_current_rate_reads_from_sync_session():
+    """DBの最新レートが返り、モックデータにフォールバックしないこと"""
+    latest = ExchangeRate(
+        date=date.today(),
+        open_rate=Decimal("149.80"),
+        high_rate=Decimal("150.40"),
+        low_rate=Decimal("149.60"),
+        close_rate=Decimal("150.12"),
+        volume=200000,
+        source=DataSourceType.YAHOO_FINANCE,
+        updated_at=datetime.now(),
+    )
+    previous = ExchangeRate(date=date.today(), close_rate=Decimal("149.12"))
+    session = MagicMock(spec=Session)
+    session.execute.return_value.scalar_one_or_none.side_effect = [latest, previous]
+
+    response = _make_client(session).get("/api/rates/current")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["rate"] == 150.12
+    assert body["change_24h"] == 1.0
+    assert body["source"] == DataSourceType.YAHOO_FINANCE.value
+    assert session.execute.call_count == 2